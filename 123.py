@@ -7,15 +7,9 @@ import os
 import platform
 
 
-# Import your existing workout modules (make sure these imports match your project)
-from lunges import run_lunges
-from pushups import run_pushups
-from squats import run_squats
-from crunches import run_crunches
-from sidelyinglegraises import run_sidelying_leg_raises as run_side_lying_leg_raises
-from plank import run_plank
-from yoga_pose_classifier import run_yoga_pose
-from ninjastar import run_orbit_game
+# Exercise modules (and with them mediapipe/cv2) are imported only when a workout starts
+from exercise_registry import find_exercise, run_exercise
+from history_store import default_store, show_history
 
 st.markdown("""
 <style>
@@ -105,20 +99,6 @@ SCHEDULES = {
     }
 }
 
-# Map exercise names to functions (and specify how to call)
-EXERCISE_MAP = {
-    "Squats": ("reps", run_squats),
-    "Pushups": ("reps", run_pushups),
-    "Lunges": ("reps", run_lunges),
-    "Crunches": ("reps", run_crunches),
-    "Side-lying leg raises": ("reps", run_side_lying_leg_raises),
-    "Plank": ("time_seconds", run_plank),
-    # Yoga poses: mark as time_seconds_pose and call run_yoga_pose directly
-    "Tree Pose": ("time_seconds_pose", lambda **kwargs: run_yoga_pose(**kwargs)),
-    "Warrior Pose": ("time_seconds_pose", lambda **kwargs: run_yoga_pose(**kwargs)),
-    "Chair Pose": ("time_seconds_pose", lambda **kwargs: run_yoga_pose(**kwargs))
-}
-
 # -------------------- Helpers --------------------
 def go_to(page):
     st.session_state.page = page
@@ -225,7 +205,7 @@ def ensure_session_state():
         "current_target_type": None,
         "daily_completed": [],
         "daily_calories": 0,
-        "history": []
+        "last_result": None
     }
     for k, v in defaults.items():
         if k not in st.session_state:
@@ -468,6 +448,7 @@ elif st.session_state.page == "run_schedule":
     if not queue:
         st.success(f"All exercises done for {st.session_state.schedule_day} ({st.session_state.schedule_level}).")
         st.write(f"Total calories today: {st.session_state.get('daily_calories', 0):.2f} cal")
+        default_store().flush()  # the day's workouts, in one transaction
         level = st.session_state.schedule_level
         if level == "Beginner":
             if st.button("Do Intermediate/Medium Exercise of this day"):
@@ -580,22 +561,11 @@ elif st.session_state.page == "workout":
     error_message=None
     try:
         ex = st.session_state.exercise
-        if ex == "Lunges":
-            result = run_lunges(user_weight=st.session_state.weight, video_path=st.session_state.video_path, target_reps=st.session_state.target_reps)
-        elif ex == "Pushups":
-            result = run_pushups(user_weight=st.session_state.weight, video_path=st.session_state.video_path, target_reps=st.session_state.target_reps)
-        elif ex == "Squats":
-            result = run_squats(user_weight=st.session_state.weight, video_path=st.session_state.video_path, target_reps=st.session_state.target_reps)
-        elif ex == "Crunches":
-            result = run_crunches(user_weight=st.session_state.weight, video_path=st.session_state.video_path, target_reps=st.session_state.target_reps)    
-        elif ex == "Side-Lying Leg Raises":
-            result = run_side_lying_leg_raises(user_weight=st.session_state.weight, video_path=st.session_state.video_path, target_reps=st.session_state.target_reps)
-        elif ex == "Plank":
-            result = run_plank(user_weight=st.session_state.weight, video_path=st.session_state.video_path, target_seconds=st.session_state.hold_time)
-        elif ex == "Yoga":
-            result = run_yoga_pose(user_weight=st.session_state.weight, video_path=st.session_state.video_path, target_time=st.session_state.hold_time, pose_name=st.session_state.yoga_pose)
+        target = st.session_state.hold_time if ex in ("Plank", "Yoga") else st.session_state.target_reps
+        result = run_exercise(ex, user_weight=st.session_state.weight, video_path=st.session_state.video_path,
+                              target=target, pose_name=st.session_state.yoga_pose)
     except ImportError as e:
-        error_message = f"Import error - check if yoga_pose_classifier.py exists: {e}"
+        error_message = f"Import error - check that the tracker for {st.session_state.exercise} and its dependencies are installed: {e}"
         st.error(error_message) 
     except Exception as e:
         st.error(f"Error running workout: {e}")
@@ -613,7 +583,8 @@ elif st.session_state.page == "workout":
     if isinstance(result, dict):
         result.update(result_meta)
     st.session_state.results.append(result)
-    st.session_state.history.append(result)
+    st.session_state.last_result = result
+    default_store().add(result)
     go_to("result_manual")
 
 # WORKOUT RUN FOR SCHEDULED ITEM
@@ -649,56 +620,14 @@ elif st.session_state.page == "workout_scheduled_run":
     result = None
     try:
         ex_key = st.session_state.current_exercise_for_run
-        kwargs = {
-            "user_weight": st.session_state.weight,
-            "video_path": st.session_state.video_path
-        }
+        exercise = find_exercise(ex_key)
+        if exercise is None:
+            raise ValueError(f"Exercise '{ex_key}' is not supported")
         val = st.session_state.current_target_value
-        typ = st.session_state.current_target_type
-
-        # find best match key in EXERCISE_MAP
-        found_key = None
-        for k in EXERCISE_MAP.keys():
-            if k.lower() == ex_key.lower():
-                found_key = k
-                break
-        if not found_key:
-            for k in EXERCISE_MAP.keys():
-                if k.lower() in ex_key.lower() or ex_key.lower() in k.lower():
-                    found_key = k
-                    break
-
-        if not found_key:
-            raise ValueError(f"Exercise '{ex_key}' not supported by EXERCISE_MAP")
-
-        call_type, func = EXERCISE_MAP[found_key]
-
-        if call_type == "reps":
-            if val is None:
-                val = st.session_state.get("target_reps", 10)
-            kwargs["target_reps"] = val
-            result = func(**kwargs)
-        elif call_type == "time_seconds":
-            if val is None:
-                val = st.session_state.get("hold_time", 30)
-            kwargs["target_seconds"] = val
-            result = func(**kwargs)
-        elif call_type == "time_seconds_pose":
-            if val is None:  # fallback if parsing failed
-              val = 30
-            pose_name = found_key
-            result = run_yoga_pose(user_weight=st.session_state.weight,
-                           video_path=st.session_state.video_path,
-                           target_time=val,
-                           pose_name=pose_name)
-    
-        # elif call_type == "time_seconds_pose":
-        #     if val is None:
-        #         val = st.session_state.get("hold_time", 30)
-        #     pose_name = found_key
-        #     result = run_yoga_pose(user_weight=st.session_state.weight, video_path=st.session_state.video_path, target_time=val, pose_name=pose_name)
-        else:
-            result = func(user_weight=st.session_state.weight, video_path=st.session_state.video_path)
+        if val is None:  # fallback if parsing failed
+            val = st.session_state.get("target_reps" if exercise.target == "reps" else "hold_time")
+        result = run_exercise(exercise.name, user_weight=st.session_state.weight,
+                              video_path=st.session_state.video_path, target=val)
     except Exception as e:
         st.error(f"Error running scheduled workout: {e}")
         result = {"status": "Failed", "error": str(e)}
@@ -715,7 +644,8 @@ elif st.session_state.page == "workout_scheduled_run":
     if isinstance(result, dict):
         result.update(metadata)
     st.session_state.results.append(result)
-    st.session_state.history.append(result)
+    st.session_state.last_result = result
+    default_store().add(result)
 
     # update daily accumulators
     calories = result.get("calories", 0) if isinstance(result, dict) else 0
@@ -727,7 +657,7 @@ elif st.session_state.page == "workout_scheduled_run":
 
 # SCHEDULED RESULT PAGE (custom result for scheduled flows)
 elif st.session_state.page == "scheduled_result":
-    res = st.session_state.history[-1] if st.session_state.history else {}
+    res = st.session_state.last_result or {}
     st.markdown("<h1 style='color:black;'>✅ Exercise Completed (Scheduled)</h1>", unsafe_allow_html=True)
     st.write(f"**DAY:** {st.session_state.schedule_day}  |  **PLAN:** {st.session_state.schedule_level}")
     ex_name = res.get("exercise", st.session_state.current_exercise_for_run)
@@ -774,7 +704,8 @@ elif st.session_state.page == "scheduled_result":
 
 # MANUAL RESULT PAGE
 elif st.session_state.page == "result_manual":
-    result = st.session_state.history[-1] if st.session_state.history else {}
+    result = st.session_state.last_result or {}
+    default_store().flush()
     st.markdown("<h1 style='color:black;'>✅ Workout Completed (Manual)</h1>", unsafe_allow_html=True)
     if isinstance(result, dict) and result.get("status") == "Success":
         st.success("Great job! You completed your workout.")
@@ -795,33 +726,7 @@ elif st.session_state.page == "result_manual":
 # RESULT HISTORY
 elif st.session_state.page == "result_history":
     st.title("📚 Workout History")
-    history = st.session_state.get("history", [])
-    if not history:
-        st.info("No workouts yet.")
-    else:
-        for i, item in enumerate(history[::-1], 1):  # reverse order to show latest first
-            # Determine if manual or scheduled
-            mode = item.get("mode", "Manual")
-            day = item.get("day", "-")
-            level = item.get("level", "-")
-            ex_name = item.get("exercise", "-")
-            reps = item.get("reps", "-")
-            time_sec = item.get("time", "-")
-            calories = item.get("calories", 0)
-            timestamp = item.get("timestamp", "-")
-            
-            st.markdown(f"<h3 style='color:black;'>Session {i} — {ex_name}</h3>", unsafe_allow_html=True)
-            st.markdown(f"""
-            <ul style='color:black;'>
-                <li><b>Mode:</b> {mode}</li>
-                <li><b>Day:</b> {day}</li>
-                <li><b>Plan:</b> {level}</li>
-                <li><b>Repetitions:</b> {reps}</li>
-                <li><b>Time:</b> {time_sec} seconds</li>
-                <li><b>Calories Burned:</b> {calories} cal</li>
-            </ul>
-            """, unsafe_allow_html=True)
-            st.divider()
+    show_history(default_store())
 
     if st.button("Back"):
         go_to("welcome")
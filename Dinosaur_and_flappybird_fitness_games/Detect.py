@@ -1,80 +0,0 @@
-import cv2
-import mediapipe as mp
-import time
-import math
-
-
-class Detect():
-    def __init__(self, mode=False, upBody=False, smooth=True, detectionCon=True, trackCon=True):
-        self.mode = mode
-        self.upBody = upBody
-        self.smooth = smooth
-        self.detectionCon = detectionCon
-        self.trackCon = trackCon
-
-        self.mpDraw = mp.solutions.drawing_utils
-        self.mpPose = mp.solutions.pose
-        self.pose = self.mpPose.Pose(
-            self.mode, self.upBody, self.smooth, self.detectionCon, self.trackCon)
-
-    def findPose(self, img, draw=True):
-
-        imgRGB = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-        self.results = self.pose.process(imgRGB)
-        if self.results.pose_landmarks:
-            if draw:
-                self.mpDraw.draw_landmarks(
-                    img, self.results.pose_landmarks, self.mpPose.POSE_CONNECTIONS)
-        return img
-
-    def findPosition(self, img, draw=True):
-        self.lmList = []
-        if self.results.pose_landmarks:
-            for id, lm in enumerate(self.results.pose_landmarks.landmark):
-                h, w, c = img.shape
-                # print(id,lm)
-                cx, cy = int(lm.x*w), int(lm.y*h)
-                self.lmList.append([id, cx, cy])
-                if draw:
-                    cv2.circle(img, (cx, cy), 10, (255, 0, 0), cv2.FILLED)
-        return self.lmList
-
-    ########################### Angle #########################
-    def findAngle(self, img, p1, p2, p3, draw=True):
-
-        ### Get point #####
-        x1, y1 = self.lmList[p1][1:]
-        # _, x1, y1 = self.lmList[p1][1]   ######   Another way  ######
-        x2, y2 = self.lmList[p2][1:]
-        x3, y3 = self.lmList[p3][1:]
-
-        # Calculate angle
-        angle = math.degrees(
-            abs(math.atan2(y2-y1, x2-x1) - math.atan2(y2-y3, x2-x3)))
-
-        if draw:
-            cv2.line(img, (x1, y1), (x2, y2), (255, 255, 255), 3)
-            cv2.line(img, (x2, y2), (x3, y3), (255, 255, 255), 3)
-
-            cv2.circle(img, (x1, y1), 10, (255, 0, 0), cv2.FILLED)
-            cv2.circle(img, (x1, y1), 15, (255, 0, 0), 2)
-
-            cv2.circle(img, (x2, y2), 10, (255, 0, 0), cv2.FILLED)
-            cv2.circle(img, (x2, y2), 15, (255, 0, 0), 2)
-
-            cv2.circle(img, (x3, y3), 10, (255, 0, 0), cv2.FILLED)
-            cv2.circle(img, (x3, y3), 15, (255, 0, 0), 2)
-            
-        return angle
-
-    def findDir(self, img, p1, draw=True):
-        x1, y1 = self.lmList[p1][1:]
-
-        cv2.circle(img, (x1, y1), 10, (255, 0, 0), cv2.FILLED)
-        cv2.circle(img, (x1, y1), 15, (255, 0, 0), 2)
-
-        return x1, y1
-
-
-
-
@@ -2,7 +2,6 @@ from numpy import angle
 import time
 import numpy as np
 import cv2
-from Detect import Detect
 
 import os
 os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = 'hide'
@@ -10,21 +9,29 @@ import sys
 import pygame
 import random
 
+# Shared pose helpers live in the project root
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import gestures
+
 angle=np.angle
-def play_dinosaur_game():
-    # Init Webcam    
-    wCam, hCam = 1280, 720
-    cap = cv2.VideoCapture(0)
-    cap.set(3, wCam)
-    cap.set(4, hCam)
-    print("Make sure the webcam can see your face")
 
-    headY = 0
-    headDir = ""
+# Game time per physics step. Speeds and gravity below are per step and were tuned
+# for the old 120 frames a second, so the game plays as it did, whatever the frame rate
+STEP = 1 / 120
+# At most this much game time is simulated per rendered frame, so a stall does not snowball
+MAX_FRAME_TIME = 0.25
 
-    detector = Detect()
-    count = 0
-    dir = 0
+
+def play_dinosaur_game():
+    # Webcam and pose detection run elsewhere; the game only polls their events.
+    # Squat (left knee bends past 80 degrees) to act: whether the head last moved
+    # up or down says jump or duck. A squat counts once the knee straightens again.
+    print("Make sure the webcam can see your face and legs")
+    feed = gestures.open_feed([gestures.SQUAT, gestures.HEAD_UP, gestures.HEAD_DOWN], frames=True,
+                             width=1280, height=720)
+    shown = 0
+    head_dir = None
+    squats = 0
 
     # Initialize pygame
     pygame.mixer.pre_init(frequency=44100, size=-16, channels=2, buffer=256)
@@ -128,94 +135,137 @@ def play_dinosaur_game():
     except FileNotFoundError:
         with open(os.path.join(script_dir, 'data', 'score.txt'), 'w') as f:
             f.write("0")
-    
-    while True:
-        success, img = cap.read()
-        img = detector.findPose(img, False)
-        lmList = detector.findPosition(img, False)
-
-        if len(lmList) != 0:
-            # Left arm
-            angleLeft = detector.findAngle(img, 23, 25, 27)
-            # Right arm
-            angleRight =  detector.findAngle(img, 24, 26, 28)
-            
-            perLeft = np.interp(angleLeft, (80, 140), (0, 100))
-            # perRight = np.interp(angleRight, (80, 140), (0, 100))
 
-            headYCurrent = detector.findDir(img, 0)[1]
-            
-            if(headY == 0):
-                headY = headYCurrent
+    def step():
+        """Advance the world by one STEP."""
+        nonlocal floor_x_pos, cloud_list, obstical_rect_list, dinosaur_jump_speed, has_jumped, first_jump
+        nonlocal dinosaur_surface, dinosaur_rect, floor_speed, game_active, first_ground_hit
+        nonlocal walk_index, shift, screen_index, first_game
+
+        # Clouds
+        if game_active:
+            cloud_list = move_clouds(cloud_list)
+
+        # Floor
+        floor_x_pos -= floor_speed
+        if floor_x_pos <= -1200:
+            floor_x_pos = 0
+
+        # Cactus
+        obstical_rect_list = move_cactus(obstical_rect_list, floor_speed)
+
+        # Dinosaur
+        dinosaur_rect.bottom -= dinosaur_jump_speed
+        if dino_on_ground(dinosaur_rect):
+            has_jumped = False
+            dinosaur_rect.bottom = 285
+            dinosaur_jump_speed = 0
+        else:
+            has_jumped = True
+            if game_active or first_game:
+                dinosaur_jump_speed -= 0.3
+                if first_game and dinosaur_rect.bottom < 210:
+                    first_jump = False
             else:
-                if (headYCurrent > headY and headYCurrent - headY > 50):
-                    headY = headYCurrent
-                    headDir = "Down"
-
-                elif (headYCurrent < headY and  headY - headYCurrent > 50):
-                    headY = headYCurrent
-                    headDir = "Up"
-
-
-            # Check (count)
-            if perLeft == 100:
-                if dir == 0:
-                    count += 0.5
-                    dir = 1
-            if perLeft == 0:
-                if dir == 1:
-                    if (headDir == "Down" and game_active):
-                        count += 0.5
-                        dir = 0
-                        print("Down")
-                        crouching = True
-
-                    elif (headDir == "Up" and game_active):
-                        print("Jump")
-                        if not(has_jumped):
-                            dinosaur_jump_speed = 12
-                            jump_sound.play()
-                            crouching = False
-                        count += 0.5
-                        dir = 0
-
-                    elif headDir == "Up" and not(game_active) and not(first_game):
-                        print("Jump")
-                        dinosaur_rect = dinosaur_surface.get_rect(midbottom = (80, 285))
-                        if score > high_score:
-                            high_score = score
-                        obstical_index_list.clear()
-                        obstical_rect_list.clear()
-                        obstical_surface_list.clear()
-                        floor_speed = 4
-                        dinosaur_jump_speed = 0
-                        score = 0
-                        crouching = False
-                        jump_sound.play()
-                        game_active = True
-                        count += 0.5
-                        dir = 0
+                dinosaur_jump_speed = 0
+        if game_active == False:
+            dinosaur_surface = death_image
+            dinosaur_rect = dinosaur_surface.get_rect(midbottom = (83, dinosaur_rect.bottom))
 
-                    elif headDir == "Up" and not(game_active) and first_game:
-                        print("Jump")
-                        dinosaur_jump_speed = 12
-                        jump_sound.play()
-                        crouching = False
-                        count += 0.5
-                        dir = 0
+        # Collision detection and changes
+        if check_collision(dinosaur_rect, obstical_rect_list):
+            floor_speed = 0
+            if game_active:
+                death_sound.play()
+                # If there is a new high score, save it to score.txt
+                temp_high_score = max(high_score, score)
+                with open(os.path.join(script_dir, 'data', 'score.txt'), 'w') as f:
+                    f.write(str(temp_high_score))
+            game_active = False
 
+        # First Game: the intro run-up
+        if first_game and not(game_active):
+            if first_ground_hit == False:
+                dinosaur_surface = stand_image
+                dinosaur_rect = dinosaur_surface.get_rect(midbottom = (38, dinosaur_rect.bottom))
+            if not first_jump:
+                screen_index += 5
+                if dino_on_ground(dinosaur_rect) or first_ground_hit:
+                    first_ground_hit = True
+                    floor_speed = 4
+                    if walk_index != 0:
+                        walk_index = 0
+                    else:
+                        walk_index = 1
+                    dinosaur_surface = dinosaur_list[walk_index]
+                    dinosaur_rect = dinosaur_surface.get_rect(midbottom = (shift, dinosaur_rect.bottom))
+                    if shift < 83:
+                        shift += 1
+                    if screen_index == 1200:
+                        first_game = False
+                        game_active = True
 
-            # Count
-            cv2.rectangle(img, (25, 125), (125, 25), (0, 255, 0), cv2.FILLED)
-            cv2.putText(img, str(int(count-0.5)), (50, 100),
-                        cv2.FONT_HERSHEY_COMPLEX, 2, (255, 0, 0), 2)
+    previous_time = time.perf_counter()
+    lag = 0.0
+    before = None  # (floor x, dinosaur bottom, cactus x's) before the last step
+    while True:
+        if not feed.running:
+            print(f"Gesture feed stopped: {feed.error}" if feed.error else "Camera closed")
+            break
+
+        # Gestures, applied in the order they were made
+        for gesture, stamp, started, lost in feed.poll():
+            if gesture != gestures.SQUAT:
+                if started:
+                    head_dir = gesture
+                continue
+            if not started:
+                squats += not lost
+                continue
+            acted = False
+            if head_dir == gestures.HEAD_DOWN and game_active:
+                crouching = True
+                acted = True
+
+            elif head_dir == gestures.HEAD_UP and game_active:
+                if not(has_jumped):
+                    dinosaur_jump_speed = 12
+                    jump_sound.play()
+                    crouching = False
+                    acted = True
+
+            elif head_dir == gestures.HEAD_UP and not(game_active) and not(first_game):
+                dinosaur_rect = dinosaur_surface.get_rect(midbottom = (80, 285))
+                if score > high_score:
+                    high_score = score
+                obstical_index_list.clear()
+                obstical_rect_list.clear()
+                obstical_surface_list.clear()
+                floor_speed = 4
+                dinosaur_jump_speed = 0
+                score = 0
+                crouching = False
+                jump_sound.play()
+                game_active = True
+                before = None  # everything jumped back; nothing to draw in between
+                acted = True
+
+            elif head_dir == gestures.HEAD_UP and not(game_active) and first_game:
+                dinosaur_jump_speed = 12
+                jump_sound.play()
+                crouching = False
+                acted = True
+            if acted:
+                # From the camera frame the gesture finished in to the game reacting
+                feed.timer.add("latency", time.time() - stamp)
 
-        
         # Event loop
         for event in pygame.event.get():
 
             # Quit if window is closed
             if event.type == pygame.QUIT:
+                feed.close()
+                report_latency(feed.timer)
                 pygame.quit()
                 sys.exit(0)
 
@@ -258,100 +308,69 @@ def play_dinosaur_game():
                 if score % 150 == 0 and score < 900:
                     pygame.time.set_timer(CACTUSSPAWN, 1000 - score // 3)
 
-        screen.fill((255, 255, 255))
+        # Physics in fixed steps, however long the last frame took
+        now = time.perf_counter()
+        lag += min(now - previous_time, MAX_FRAME_TIME)
+        previous_time = now
+        while lag >= STEP:
+            before = (floor_x_pos, dinosaur_rect.bottom, [rect.x for rect in obstical_rect_list])
+            step()
+            lag -= STEP
+
+        # Draw between the last two steps, so motion stays smooth when frames and steps do not line up
+        alpha = lag / STEP
+        draw_floor_x, dino_offset, cactus_offsets = floor_x_pos, 0, None
+        if before is not None:
+            if abs(before[0] - floor_x_pos) < 600:  # not across the wrap back to 0
+                draw_floor_x = floor_x_pos + (before[0] - floor_x_pos) * (1 - alpha)
+            dino_offset = round((before[1] - dinosaur_rect.bottom) * (1 - alpha))
+            if len(before[2]) == len(obstical_rect_list):
+                cactus_offsets = [round((x - rect.x) * (1 - alpha)) for x, rect in zip(before[2], obstical_rect_list)]
 
-        # Clouds
-        if game_active:
-            cloud_list = move_clouds(cloud_list)
+        screen.fill((255, 255, 255))
         draw_clouds(cloud_list, cloud_surface, screen)
-
-        # Floor
-        floor_x_pos -= floor_speed
-        draw_floor(floor_x_pos, floor_surface)
-        if floor_x_pos <= -1200:
-            floor_x_pos = 0
-
-        # Cactus
-        obstical_rect_list = move_cactus(obstical_rect_list, floor_speed)
-        draw_cactus(obstical_surface_list, obstical_rect_list, obstical_index_list)
+        draw_floor(draw_floor_x, floor_surface)
+        if cactus_offsets:
+            draw_cactus(obstical_surface_list, [rect.move(dx, 0) for dx, rect in zip(cactus_offsets, obstical_rect_list)],
+                        obstical_index_list)
+        else:
+            draw_cactus(obstical_surface_list, obstical_rect_list, obstical_index_list)
         if game_active:
             obstical_surface_list, obstical_index_list = animate_bird(obstical_index_list, obstical_surface_list, obstical_type_list)
-        
-        # Dinosaur
-        dinosaur_rect.bottom -= dinosaur_jump_speed
-        if dino_on_ground(dinosaur_rect):
-            has_jumped = False
-            dinosaur_rect.bottom = 285
-            dinosaur_jump_speed = 0
-        else:
-            has_jumped = True
-            if game_active or first_game:
-                dinosaur_jump_speed -= 0.3
-                if first_game and dinosaur_rect.bottom < 210:
-                    first_jump = False
-            else:
-                dinosaur_jump_speed = 0
-        if game_active == False:
-            dinosaur_surface = death_image
-            dinosaur_rect = dinosaur_surface.get_rect(midbottom = (83, dinosaur_rect.bottom))
-        if not(first_game):
-            screen.blit(dinosaur_surface, dinosaur_rect)
-
-        # Collision detection and changes
-        if check_collision(dinosaur_rect, obstical_rect_list):
-            floor_speed = 0
-            if game_active:
-                death_sound.play()
-            game_active = False
-
-            # If there is a new high score, save it to score.txt
-            temp_high_score = max(high_score, score)
-            with open(os.path.join(script_dir, 'data', 'score.txt'), 'w') as f:
-                f.write(str(temp_high_score))
-            
+        screen.blit(dinosaur_surface, dinosaur_rect.move(0, dino_offset))
         if game_active == False:
              game_over_display(screen, game_over_font, game_over_button, first_game)   
 
         # Score
         display_score(score, high_score, score_font, screen)
 
-        # First Game
+        # First Game: white out what the intro has not reached yet
         if first_game and not(game_active):
-            if first_ground_hit == False:
-                dinosaur_surface = stand_image
-                dinosaur_rect = dinosaur_surface.get_rect(midbottom = (38, dinosaur_rect.bottom))
-                screen.blit(dinosaur_surface, dinosaur_rect)
-            if first_jump:
-                pygame.draw.rect(screen, (255, 255, 255), (screen_index, 0, 1220, 300))
-            else:
-                screen_index += 5
-                pygame.draw.rect(screen, (255, 255, 255), (screen_index, 0, 1220, 300))
-                if dino_on_ground(dinosaur_rect) or first_ground_hit:
-                    first_ground_hit = True
-                    floor_speed = 4
-                    if walk_index != 0:
-                        walk_index = 0
-                    else:
-                        walk_index = 1
-                    dinosaur_surface = dinosaur_list[walk_index]
-                    dinosaur_rect = dinosaur_surface.get_rect(midbottom = (shift, dinosaur_rect.bottom))
-                    if shift < 83:
-                        shift += 1
-                    if screen_index == 1200:
-                        first_game = False
-                        game_active = True
-                    screen.blit(dinosaur_surface, dinosaur_rect)
+            pygame.draw.rect(screen, (255, 255, 255), (screen_index, 0, 1220, 300))
         pygame.display.update()
         clock.tick(120)
 
-        # cv2.namedWindow("Image", cv2.WINDOW_NORMAL)
-        # cv2.resizeWindow("Image", 640, 480)  # Set desired size
-        cv2.moveWindow("Image", 0, 0)        # top-left
-        # pygame window will be somewhere else
-        cv2.imshow("Image", img)
-        # key = cv2.waitKey(1)
-        # if key == ord("q"):
-        #     break
+        frames, img = feed.latest()
+        if img is not None and frames != shown:
+            shown = frames
+            # Squat count
+            cv2.rectangle(img, (25, 125), (125, 25), (0, 255, 0), cv2.FILLED)
+            cv2.putText(img, str(squats), (50, 100), cv2.FONT_HERSHEY_COMPLEX, 2, (255, 0, 0), 2)
+            cv2.imshow("Image", img)
+            cv2.moveWindow("Image", 0, 0)        # top-left
+            # pygame window will be somewhere else
+
+    feed.close()
+    report_latency(feed.timer)
+    pygame.quit()
+
+
+def report_latency(timer):
+    """Print how long gestures took to reach the game, and the pose pipeline's own timings."""
+    summary = timer.summary()
+    for stage, stats in summary["stages"].items():
+        print(f"{stage:<10} n={stats['count']:<6} p50 {stats['p50']:7.1f} ms  p90 {stats['p90']:7.1f} ms  max {stats['max']:7.1f} ms")
+
 
 def draw_floor(floor_x_pos, floor_surface):
     screen.blit(floor_surface, (floor_x_pos, 275))
@@ -5,23 +5,27 @@ import random
 import cv2
 import numpy as np
 import time
-import PoseModule as pm
+from collections import deque
+
+# Shared pose helpers live in the project root
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import gestures
 
 # For numpy.angle
 angle = np.angle
 os.environ['SDL_VIDEO_WINDOW_POS'] = "50,50"  # x=50, y=50
 
-wCam, hCam = 1280, 720
+# Game time per physics step; gravity, pipe and floor speeds are per step (tuned for the old 120 fps)
+STEP = 1 / 120
+# A flap is applied as of the camera frame it was seen in, up to this long ago
+MAX_COMPENSATION = 0.15
 
-def play_flappy_bird():
-    cap = cv2.VideoCapture(0)
-    cap.set(3, wCam)
-    cap.set(4, hCam)
 
-    detector = pm.poseDetector()
-    count = 0
-    dir = 0
-    pastTime = 0
+def play_flappy_bird():
+    # Webcam and pose detection run elsewhere and send flaps with their capture time:
+    # raising both arms out to the side is a flap, and so is bringing them back down
+    feed = gestures.open_feed([gestures.FLAP], frames=True)
+    shown = 0
 
     # -------------------------------
     # Helper to get absolute asset path
@@ -153,100 +157,135 @@ def play_flappy_bird():
             high_score = score
         return high_score
 
+    def step():
+        """Advance the game by one STEP."""
+        nonlocal bird_movement, game_active, pipe_list, score, score_sound_countdown, floor_x_pos
+        if game_active:
+            bird_movement += gravity
+            bird_rect.centery += bird_movement
+            game_active = check_collision(pipe_list)
+            pipe_list = move_pipe(pipe_list)
+            score += 0.01
+            score_sound_countdown -= 1
+            if score_sound_countdown <= 0:
+                score_sound.play()
+                score_sound_countdown = 100
+            history.append((sim_time, bird_rect.centery, bird_movement))
+        floor_x_pos -= 1
+        if floor_x_pos <= -432:
+            floor_x_pos = 0
+
+    def flap(captured=None):
+        """
+        Flap, or restart after a game over. A flap seen in a camera frame
+        ``captured`` (wall-clock time) is replayed from the bird's state at
+        that moment, so the pose pipeline's delay does not cost height.
+        """
+        nonlocal bird_movement, game_active, score
+        if not game_active:
+            game_active = True
+            pipe_list.clear()
+            bird_rect.center = (100, 384)
+            bird_movement = 0
+            score = 0
+            history.clear()
+            return 0.0
+        flap_sound.play()
+        replay = 0
+        if captured is not None and 0 < sim_time - captured <= MAX_COMPENSATION:
+            # Steps taken after the capture, if the state just before it is still in the history
+            replay = sum(1 for stamp, _, _ in history if stamp > captured)
+            if replay < len(history):
+                for _ in range(replay):
+                    history.pop()
+                _, bird_rect.centery, _ = history[-1]
+            else:
+                replay = 0
+        bird_movement = -8
+        for _ in range(replay):  # the steps since the capture, again, with the flap in them
+            bird_movement += gravity
+            bird_rect.centery += bird_movement
+            history.append((history[-1][0] + STEP, bird_rect.centery, bird_movement))
+        if replay:
+            game_active = check_collision(pipe_list)
+        return replay * STEP
+
+    # (game time, bird centre y, bird speed) after each recent step, for flap compensation
+    history = deque(maxlen=int(MAX_COMPENSATION / STEP) + 2)
+    # The simulation runs on the wall clock, like the camera's capture times
+    sim_time = time.time()
+
     # -------------------------------
     # Main game loop
     # -------------------------------
     while True:
-        success, img = cap.read()
-        img = detector.findPose(img, False)
-        lmList = detector.findPosition(img, False)
-
-        # Pose detection for jumps
-        if len(lmList) != 0:
-            angleRight = detector.findAngle(img, 14, 12, 24)
-            angleLeft = detector.findAngle(img, 13, 11, 23)
-            perRight = np.interp(angleRight, (30, 80), (0, 100))
-            perLeft = np.interp(angleLeft, (30, 80), (0, 100))
-
-            if (perRight == 100) and (perLeft == 100) and dir == 0:
-                count += 0.5
-                dir = 1
-            if (perRight == 0) and (perLeft == 0) and dir == 1:
-                count += 0.5
-                dir = 0
-
-            cv2.rectangle(img, (25, 125), (125, 25), (0, 255, 0), cv2.FILLED)
-            cv2.putText(img, str(int(count-0.5)), (50, 100),
-                        cv2.FONT_HERSHEY_COMPLEX, 2, (255, 0, 0), 2)
-        # cv2.namedWindow("Image",img)
-        # cv2.moveWindow("Image", 500, 50)  # x=500, y=50
-
-        cv2.imshow("Image", img)
-        key = cv2.waitKey(1)
-        if key == ord("q"):
+        if not feed.running:
+            print(f"Gesture feed stopped: {feed.error}" if feed.error else "Camera closed")
             break
 
+        frames, img = feed.latest()
+        if img is not None and frames != shown:
+            shown = frames
+            cv2.imshow("Image", img)
+            key = cv2.waitKey(1)
+            if key == ord("q"):
+                break
+
+        for _, captured, _, lost in feed.poll():
+            if lost:  # arms "lowered" only because the pose went out of view
+                continue
+            compensated = flap(captured)
+            feed.timer.add("latency", time.time() - captured)
+            feed.timer.add("compensated", compensated)
+
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
+                feed.close()
+                report_latency(feed.timer)
                 pygame.quit()
                 sys.exit()
-            if count != 0:
-                if game_active:
-                    bird_movement = -8
-                    flap_sound.play()
-                    count = 0
-                elif not game_active:
-                    game_active = True
-                    pipe_list.clear()
-                    bird_rect.center = (100, 384)
-                    bird_movement = 0
-                    score = 0
-                    count = 0
             if event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_SPACE:
-                    if game_active:
-                        bird_movement = -8
-                        flap_sound.play()
-                    else:
-                        game_active = True
-                        pipe_list.clear()
-                        bird_rect.center = (100,384)
-                        bird_movement = 0
-                        score = 0
+                    flap()
             if event.type == spawnpipe:
                 pipe_list.extend(create_pipe())
             if event.type == birdflap:
                 bird_index = (bird_index + 1) % 3
                 bird, bird_rect = bird_animation()
 
+        # Physics in fixed steps up to now, whatever the frame rate (at most 0.25 s of catching up)
+        now = time.time()
+        sim_time = max(sim_time, now - 0.25)
+        while sim_time + STEP <= now:
+            sim_time += STEP
+            step()
+
         screen.blit(bg, (0, 0))
         if game_active:
-            bird_movement += gravity
             rotated_bird = rotate_bird(bird)
-            bird_rect.centery += bird_movement
             screen.blit(rotated_bird, bird_rect)
-            game_active = check_collision(pipe_list)
-            pipe_list = move_pipe(pipe_list)
             draw_pipe(pipe_list)
-            score += 0.01
             score_display('main game')
-            score_sound_countdown -= 1
-            if score_sound_countdown <= 0:
-                score_sound.play()
-                score_sound_countdown = 100
         else:
             screen.blit(game_over_surface, game_over_rect)
             high_score = update_score(score, high_score)
             score_display('game_over')
 
-        floor_x_pos -= 1
         draw_floor()
-        if floor_x_pos <= -432:
-            floor_x_pos = 0
 
         pygame.display.update()
         clock.tick(120)
 
+    feed.close()
+    report_latency(feed.timer)
+    pygame.quit()
+
+
+def report_latency(timer):
+    """Print how long flaps took to reach the game, how much of that was made up, and the pose pipeline's timings."""
+    for stage, stats in timer.summary()["stages"].items():
+        print(f"{stage:<11} n={stats['count']:<6} p50 {stats['p50']:7.1f} ms  p90 {stats['p90']:7.1f} ms  max {stats['max']:7.1f} ms")
+
 if __name__ == "__main__":
     play_flappy_bird()
     
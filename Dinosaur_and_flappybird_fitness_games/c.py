@@ -1,18 +1,18 @@
+import os
+import sys
 import cv2
 import mediapipe as mp
-import numpy as np
 import time
 
+# Shared pose helpers live in the project root
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from landmarks import LEFT_SHOULDER, LEFT_HIP, LEFT_KNEE, joint_table, joint_angles, landmarks_to_array
+
 mp_pose = mp.solutions.pose
 pose = mp_pose.Pose()
 mp_drawing = mp.solutions.drawing_utils
 
-def calculate_angle(a, b, c):
-    a, b, c = np.array(a), np.array(b), np.array(c)
-    radians = np.arctan2(c[1] - b[1], c[0] - b[0]) - \
-              np.arctan2(a[1] - b[1], a[0] - b[0])
-    angle = np.abs(radians * 180.0 / np.pi)
-    return angle if angle <= 180 else 360 - angle
+HIP_JOINT = joint_table((LEFT_SHOULDER, LEFT_HIP, LEFT_KNEE))
 
 cap = cv2.VideoCapture(r"C:\Users\O Lakshmi reddy\Downloads\WhatsApp Video 2025-07-07 at 5.03.42 PM.mp4")
 
@@ -31,18 +31,10 @@ while cap.isOpened():
     image = cv2.cvtColor(image, cv2.COLOR_RGB2BGR)
 
     try:
-        landmarks = results.pose_landmarks.landmark
-
-        # Get coordinates
-        shoulder = [landmarks[mp_pose.PoseLandmark.LEFT_SHOULDER.value].x,
-                    landmarks[mp_pose.PoseLandmark.LEFT_SHOULDER.value].y]
-        hip = [landmarks[mp_pose.PoseLandmark.LEFT_HIP.value].x,
-               landmarks[mp_pose.PoseLandmark.LEFT_HIP.value].y]
-        knee = [landmarks[mp_pose.PoseLandmark.LEFT_KNEE.value].x,
-                landmarks[mp_pose.PoseLandmark.LEFT_KNEE.value].y]
+        points = landmarks_to_array(results.pose_landmarks.landmark)
 
         # Calculate angle
-        angle = calculate_angle(shoulder, hip, knee)
+        angle = joint_angles(points, HIP_JOINT)[0]
 
         # Visualize angle
         cv2.putText(image, f'Angle: {int(angle)}',
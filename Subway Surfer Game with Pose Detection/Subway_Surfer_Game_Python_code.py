@@ -654,14 +654,20 @@ pyautogui.click(x=1300, y=800, button='right')
 # Now we will run the cell below and click [here](https://poki.com/en/g/subway-surfers) to play the game in our browser using our body gestures and movements.
 
 # %%
-# Initialize the VideoCapture object to read from the webcam.
-camera_video = cv2.VideoCapture(0)
-camera_video.set(3,1280)
-camera_video.set(4,960)
+# The pose pipeline and the checks above (hands joined, left/right, jump/crouch) are shared with the
+# other games: gestures.py in the project root runs them once and publishes START, LEAN_LEFT/LEAN_RIGHT
+# and JUMP/DUCK events. The standing height checkJumpCrouch() needed as MID_Y is recalibrated at every START.
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import gestures
+
+# Subscribe to the gestures that control the game (the webcam pipeline runs here, so its frames can be shown).
+feed = gestures.open_feed([gestures.START, gestures.LEAN_LEFT, gestures.LEAN_RIGHT, gestures.JUMP, gestures.DUCK], frames=True)
 
 # Create named window for resizing purposes.
 cv2.namedWindow('Subway Surfers with Pose Detection', cv2.WINDOW_NORMAL)
- 
+
 # Initialize a variable to store the time of the previous frame.
 time1 = 0
 
@@ -672,176 +678,74 @@ game_started = False
 # At Start the character is at center so the index is 1 and it can move left (value 0) and right (value 2).
 x_pos_index = 1
 
-# Initialize a variable to store the index of the current vertical posture of the person.
-# At Start the person is standing so the index is 1 and he can crouch (value 0) and jump (value 2).
-y_pos_index = 1
-
-# Declate a variable to store the intial y-coordinate of the mid-point of both shoulders of the person.
-MID_Y = None
-
-# Initialize a counter to store count of the number of consecutive frames with person's hands joined.
-counter = 0
-
-# Initialize the number of consecutive frames on which we want to check if person hands joined before starting the game.
-num_of_frames = 10
-
-# Iterate until the webcam is accessed successfully.
-while camera_video.isOpened():
-    
-    # Read a frame.
-    ok, frame = camera_video.read()
-    
-    # Check if frame is not read properly then continue to the next iteration to read the next frame.
-    if not ok:
-        continue
+# Iterate until the webcam stops.
+while feed.running:
     
-    # Flip the frame horizontally for natural (selfie-view) visualization.
-    frame = cv2.flip(frame, 1)
-    
-    # Get the height and width of the frame of the webcam video.
-    frame_height, frame_width, _ = frame.shape
-    
-    # Perform the pose detection on the frame.
-    frame, results = detectPose(frame, pose_video, draw=game_started)
-    
-    # Check if the pose landmarks in the frame are detected.
-    if results.pose_landmarks:
-        
-        # Check if the game has started
-        if game_started:
-            
-            # Commands to control the horizontal movements of the character.
-            #--------------------------------------------------------------------------------------------------------------
-            
-            # Get horizontal position of the person in the frame.
-            frame, horizontal_position = checkLeftRight(frame, results, draw=True)
-            
-            # Check if the person has moved to left from center or to center from right.
-            if (horizontal_position=='Left' and x_pos_index!=0) or (horizontal_position=='Center' and x_pos_index==2):
-                
-                # Press the left arrow key.
-                pyautogui.press('left')
-                
-                # Update the horizontal position index of the character.
-                x_pos_index -= 1               
-
-            # Check if the person has moved to Right from center or to center from left.
-            elif (horizontal_position=='Right' and x_pos_index!=2) or (horizontal_position=='Center' and x_pos_index==0):
-                
-                # Press the right arrow key.
-                pyautogui.press('right')
-                
-                # Update the horizontal position index of the character.
-                x_pos_index += 1
-            
-            #--------------------------------------------------------------------------------------------------------------
-        
-        # Otherwise if the game has not started    
-        else:
-            
-            # Write the text representing the way to start the game on the frame. 
-            cv2.putText(frame, 'JOIN BOTH HANDS TO START THE GAME.', (5, frame_height - 10), cv2.FONT_HERSHEY_PLAIN,
-                        2, (0, 255, 0), 3)
+    # Gestures since the last iteration, in the order they were made.
+    for gesture, _, started, _ in feed.poll():
         
         # Command to Start or resume the game.
         #------------------------------------------------------------------------------------------------------------------
-        
-        # Check if the left and right hands are joined.
-        if checkHandsJoined(frame, results)[1] == 'Hands Joined':
-
-            # Increment the count of consecutive frames with +ve condition.
-            counter += 1
-
-            # Check if the counter is equal to the required number of consecutive frames.  
-            if counter == num_of_frames:
-
-                # Command to Start the game first time.
-                #----------------------------------------------------------------------------------------------------------
-                
-                # Check if the game has not started yet.
-                if not(game_started):
-
-                    # Update the value of the variable that stores the game state.
-                    game_started = True
-
-                    # Retreive the y-coordinate of the left shoulder landmark.
-                    left_y = int(results.pose_landmarks.landmark[mp_pose.PoseLandmark.RIGHT_SHOULDER].y * frame_height)
-
-                    # Retreive the y-coordinate of the right shoulder landmark.
-                    right_y = int(results.pose_landmarks.landmark[mp_pose.PoseLandmark.LEFT_SHOULDER].y * frame_height)
-
-                    # Calculate the intial y-coordinate of the mid-point of both shoulders of the person.
-                    MID_Y = abs(right_y + left_y) // 2
-
-                    # Move to 1300, 800, then click the left mouse button to start the game.
-                    pyautogui.click(x=1300, y=800, button='left')
-                
-                #----------------------------------------------------------------------------------------------------------
-
-                # Command to resume the game after death of the character.
-                #----------------------------------------------------------------------------------------------------------
-                
-                # Otherwise if the game has started.
-                else:
-
-                    # Press the space key.
-                    pyautogui.press('space')
+        if gesture == gestures.START and started:
+            
+            # Check if the game has not started yet.
+            if not(game_started):
                 
-                #----------------------------------------------------------------------------------------------------------
+                # Update the value of the variable that stores the game state.
+                game_started = True
                 
-                # Update the counter value to zero.
-                counter = 0
-
-        # Otherwise if the left and right hands are not joined.        
-        else:
-
-            # Update the counter value to zero.
-            counter = 0
+                # Move to 1300, 800, then click the left mouse button to start the game.
+                pyautogui.click(x=1300, y=800, button='left')
             
-        #------------------------------------------------------------------------------------------------------------------
-
+            # Otherwise resume the game after death of the character.
+            else:
+                
+                # Press the space key.
+                pyautogui.press('space')
+        
         # Commands to control the vertical movements of the character.
         #------------------------------------------------------------------------------------------------------------------
-        
-        # Check if the intial y-coordinate of the mid-point of both shoulders of the person has a value.
-        if MID_Y:
-            
-            # Get posture (jumping, crouching or standing) of the person in the frame. 
-            frame, posture = checkJumpCrouch(frame, results, MID_Y, draw=True)
+        elif gesture == gestures.JUMP and started and game_started:
             
-            # Check if the person has jumped.
-            if posture == 'Jumping' and y_pos_index == 1:
-
-                # Press the up arrow key
-                pyautogui.press('up')
-                
-                # Update the veritcal position index of  the character.
-                y_pos_index += 1 
-
-            # Check if the person has crouched.
-            elif posture == 'Crouching' and y_pos_index == 1:
-
-                # Press the down arrow key
-                pyautogui.press('down')
-                
-                # Update the veritcal position index of the character.
-                y_pos_index -= 1
+            # Press the up arrow key
+            pyautogui.press('up')
+        
+        elif gesture == gestures.DUCK and started and game_started:
             
-            # Check if the person has stood.
-            elif posture == 'Standing' and y_pos_index   != 1:
-                
-                # Update the veritcal position index of the character.
-                y_pos_index = 1
+            # Press the down arrow key
+            pyautogui.press('down')
+    
+    # Commands to control the horizontal movements of the character.
+    #----------------------------------------------------------------------------------------------------------------------
+    if game_started:
         
-        #------------------------------------------------------------------------------------------------------------------
+        # Lane the person is standing in: left (0), center (1) or right (2).
+        target_index = 0 if gestures.LEAN_LEFT in feed.held else 2 if gestures.LEAN_RIGHT in feed.held else 1
+        
+        # Move the character one lane at a time until it is in the same lane.
+        if target_index < x_pos_index:
+            pyautogui.press('left')
+            x_pos_index -= 1
+        elif target_index > x_pos_index:
+            pyautogui.press('right')
+            x_pos_index += 1
+    
+    # Get the newest frame of the webcam, with the landmarks and the active gestures drawn on it.
+    _, frame = feed.latest()
+    
+    # Check if no frame has been processed yet.
+    if frame is None:
+        cv2.waitKey(10)
+        continue
     
+    # The pipeline keeps this frame as its latest one, so draw on a copy.
+    frame = frame.copy()
+    
+    # Write the text representing the way to start the game on the frame. 
+    if not(game_started):
+        cv2.putText(frame, 'JOIN BOTH HANDS TO START THE GAME.', (5, frame.shape[0] - 10), cv2.FONT_HERSHEY_PLAIN,
+                    2, (0, 255, 0), 3)
     
-    # Otherwise if the pose landmarks in the frame are not detected.       
-    else:
-
-        # Update the counter value to zero.
-        counter = 0
-        
     # Calculate the frames updates in one second
     #----------------------------------------------------------------------------------------------------------------------
     
@@ -855,7 +759,7 @@ while camera_video.isOpened():
         frames_per_second = 1.0 / (time2 - time1)
         
         # Write the calculated number of frames per second on the frame. 
-        cv2.putText(frame, 'FPS: {}'.format(int(frames_per_second)), (10, 30),cv2.FONT_HERSHEY_PLAIN, 2, (0, 255, 0), 3)
+        cv2.putText(frame, 'FPS: {}'.format(int(frames_per_second)), (10, 70),cv2.FONT_HERSHEY_PLAIN, 2, (0, 255, 0), 3)
     
     # Update the previous frame time to this frame time.
     # As this frame will become previous frame in next iteration.
@@ -873,8 +777,8 @@ while camera_video.isOpened():
     if(k == 27):
         break
 
-# Release the VideoCapture Object and close the windows.                  
-camera_video.release()
+# Stop the gesture pipeline and close the windows.                  
+feed.close()
 cv2.destroyAllWindows()
 
 # %% [markdown]
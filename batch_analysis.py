@@ -0,0 +1,109 @@
+"""
+Score recorded workout videos without the Streamlit UI.
+
+Each job is EXERCISE=VIDEO; jobs are spread over a process pool with one
+pose engine per worker, and every result is printed as one JSON line in the
+same shape the run_* trackers return to the app:
+
+    python batch_analysis.py pushups="Sample Videos/pushups.mp4" \\
+        plank="Sample Videos/planksample.mp4" lunges="Sample Videos/_plunges.mp4" --weight 70
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+
+import cv2
+
+import pose_engine
+from exercise_registry import EXERCISES, find_exercise, run_exercise
+from tracker_ui import HeadlessUI
+
+
+def _alnum(name):
+    return "".join(ch for ch in name.lower() if ch.isalnum())
+
+
+def normalize_exercise(name):
+    """The registry's Exercise for names like "Side-lying leg raises", "sidelyinglegraises" or "Push-ups"."""
+    exercise = next((e for e in EXERCISES if _alnum(e.name) == _alnum(name)), None) or find_exercise(name)
+    if exercise is None:
+        raise ValueError(f"Unknown exercise '{name}'. Choose from: {', '.join(e.name for e in EXERCISES)}")
+    return exercise
+
+
+def analyse_video(job):
+    """
+    Run one tracker headlessly. ``job`` is a dict with exercise, video, weight and
+    optional target / pose; returns the tracker's result dict plus the video path.
+    """
+    ui = HeadlessUI()
+    try:
+        exercise = normalize_exercise(job["exercise"])
+        target = job.get("target")
+        if target is not None:
+            target = int(target) if exercise.target == "reps" else float(target)
+        result = run_exercise(exercise.name, user_weight=job.get("weight", 60), video_path=job["video"],
+                              target=target, pose_name=exercise.pose or job.get("pose") or "Tree Pose", ui=ui)
+    except Exception as e:
+        result = {"status": "Failed", "error": str(e)}
+    if ui.errors and "error" not in result:
+        result["error"] = "; ".join(ui.errors)
+    result["video"] = job["video"]
+    return result
+
+
+def _init_worker():
+    # MediaPipe already spreads one frame over several threads; keep OpenCV from oversubscribing the cores
+    cv2.setNumThreads(1)
+    pose_engine.warm_up()
+
+
+def analyse_videos(jobs, workers=None):
+    """Yield a result dict for every job, in job order, using a pool of ``workers`` processes."""
+    jobs = list(jobs)
+    if not jobs:
+        return
+    workers = min(workers or os.cpu_count() or 1, len(jobs))
+    with multiprocessing.Pool(workers, initializer=_init_worker) as pool:
+        yield from pool.imap(analyse_video, jobs)
+
+
+def parse_job(spec, weight, target, pose):
+    exercise, sep, video = spec.partition("=")
+    if not sep or not video:
+        raise argparse.ArgumentTypeError(f"Expected EXERCISE=VIDEO, got '{spec}'")
+    return {"exercise": normalize_exercise(exercise).name, "video": video,
+            "weight": weight, "target": target, "pose": pose}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score recorded workout videos in parallel.")
+    parser.add_argument("jobs", nargs="+", metavar="EXERCISE=VIDEO",
+                        help=f"exercise ({', '.join(e.name for e in EXERCISES)}) and the video to score")
+    parser.add_argument("--weight", type=float, default=60, help="user weight in kg (default: 60)")
+    parser.add_argument("--target", type=float, default=None,
+                        help="target reps, or hold seconds for plank/yoga (default: the tracker's own)")
+    parser.add_argument("--pose", default="Tree Pose", help="yoga pose name (default: Tree Pose)")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("-o", "--output", default=None, help="write JSON lines here instead of stdout")
+    args = parser.parse_intermixed_args(argv)
+
+    try:
+        jobs = [parse_job(spec, args.weight, args.target, args.pose) for spec in args.jobs]
+    except (argparse.ArgumentTypeError, ValueError) as e:
+        parser.error(str(e))
+
+    out = open(args.output, "w") if args.output else sys.stdout
+    try:
+        for result in analyse_videos(jobs, args.workers):
+            out.write(json.dumps(result) + "\n")
+            out.flush()
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+
+if __name__ == "__main__":
+    main()
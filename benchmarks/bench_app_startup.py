@@ -0,0 +1,108 @@
+"""
+Measure how long the Streamlit app takes to show its menu pages.
+
+Each page is rendered with Streamlit's AppTest in a fresh Python process: the
+first run is the cold start (every import the script does at the top), the
+following runs are reruns, which is what Streamlit does on every click. The
+heavy modules (mediapipe, cv2, pygame) that were loaded are listed too.
+
+Pass --baseline-rev to render the same pages with final.py as it was at an
+earlier commit and see the difference:
+
+    python benchmarks/bench_app_startup.py
+    python benchmarks/bench_app_startup.py --baseline-rev HEAD~1
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+PAGES = ["welcome", "schedule_select", "result_history"]
+HEAVY = ["mediapipe", "cv2", "pygame", "numpy"]
+
+
+def measure(app, page, reruns):
+    """Runs in the child process: render ``page`` once cold and ``reruns`` more times."""
+    sys.path.insert(0, ROOT)
+    os.chdir(ROOT)
+    start = time.perf_counter()
+    from streamlit.testing.v1 import AppTest
+    streamlit_import = time.perf_counter() - start
+
+    at = AppTest.from_file(app, default_timeout=120)
+    at.session_state["page"] = page
+    start = time.perf_counter()
+    at.run()
+    cold = time.perf_counter() - start
+    times = []
+    for _ in range(reruns):
+        start = time.perf_counter()
+        at.run()
+        times.append(time.perf_counter() - start)
+    return {
+        "page": page,
+        "streamlit_import_ms": streamlit_import * 1000,
+        "cold_ms": cold * 1000,
+        "rerun_ms": statistics.median(times) * 1000 if times else None,
+        "heavy_modules": [name for name in HEAVY if name in sys.modules],
+        "errors": [str(e.value) for e in at.exception],
+    }
+
+
+def run_child(app, page, reruns):
+    out = subprocess.run([sys.executable, __file__, "--child", app, page, str(reruns)],
+                         capture_output=True, text=True, cwd=ROOT)
+    lines = [line for line in out.stdout.splitlines() if line.startswith("{")]
+    if not lines:
+        raise RuntimeError(f"{page}: {out.stderr[-2000:]}")
+    return json.loads(lines[-1])
+
+
+def report(label, results):
+    print(label)
+    for r in results:
+        print(f"  {r['page']:<16} cold {r['cold_ms']:8.1f} ms   rerun {r['rerun_ms']:7.1f} ms   "
+              f"loaded: {', '.join(r['heavy_modules']) or '-'}" + (f"   ERROR {r['errors']}" if r["errors"] else ""))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--app", default=os.path.join(ROOT, "final.py"))
+    parser.add_argument("--pages", nargs="+", default=PAGES)
+    parser.add_argument("--reruns", type=int, default=5)
+    parser.add_argument("--baseline-rev", help="git revision whose final.py to compare against")
+    parser.add_argument("-o", "--output", help="write results as JSON")
+    parser.add_argument("--child", nargs=3, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        app, page, reruns = args.child
+        print(json.dumps(measure(app, page, int(reruns))))
+        return
+
+    results = {"current": [run_child(args.app, page, args.reruns) for page in args.pages]}
+    report(os.path.relpath(args.app, ROOT), results["current"])
+    if args.baseline_rev:
+        source = subprocess.run(["git", "show", f"{args.baseline_rev}:final.py"],
+                                capture_output=True, text=True, check=True, cwd=ROOT).stdout
+        with tempfile.TemporaryDirectory() as tmp:
+            baseline = os.path.join(tmp, "final.py")
+            with open(baseline, "w", encoding="utf-8") as f:
+                f.write(source)
+            results["baseline"] = [run_child(baseline, page, args.reruns) for page in args.pages]
+        report(f"final.py at {args.baseline_rev}", results["baseline"])
+        for now, then in zip(results["current"], results["baseline"]):
+            print(f"  {now['page']:<16} cold start {then['cold_ms'] - now['cold_ms']:+8.1f} ms saved, "
+                  f"rerun {then['rerun_ms'] - now['rerun_ms']:+7.1f} ms saved")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Measure what sharing the camera through camera_broker saves when several
+processes want the same pose stream.
+
+A sample video stands in for the webcam. "separate" runs each consumer as
+before the broker: its own PoseStream on the source, decoding and running
+MediaPipe itself. "broker" starts one camera_broker with landmarks and has
+every consumer read camera index --device from it. Each consumer is a fresh
+Python process reading --frames frames; the CPU time it used per frame is
+reported along with its frame rate, plus the cost of taking a frame from
+shared memory with and without a copy:
+
+    python benchmarks/bench_camera_broker.py
+    python benchmarks/bench_camera_broker.py --consumers 3 --frames 200
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+SAMPLES = os.path.join(ROOT, "Sample Videos")
+
+
+def consume(source, frames):
+    """Runs in the child process."""
+    sys.path.insert(0, ROOT)
+    from pose_stream import PoseStream
+
+    stream = PoseStream(source, use_cache=False, adaptive=False)
+    read = found = 0
+    started, cpu = time.perf_counter(), time.process_time()
+    for frame in stream:
+        read += 1
+        found += frame.points is not None
+        if read >= frames:
+            break
+    elapsed, cpu = time.perf_counter() - started, time.process_time() - cpu
+    result = {"frames": read, "found": found, "fps": read / elapsed, "cpu_ms_per_frame": cpu / read * 1000,
+              "shared_landmarks": stream.shared_landmarks}
+    stream.release()
+    return result
+
+
+def read_costs(device, repeat=200):
+    """Microseconds to take the newest frame from the broker as a view and as a copy."""
+    sys.path.insert(0, ROOT)
+    import camera_broker
+
+    client = camera_broker.connect(device)
+    costs = {}
+    for copy in (False, True):
+        started = time.perf_counter()
+        for _ in range(repeat):
+            client.latest(copy=copy)
+        costs["copy_us" if copy else "view_us"] = (time.perf_counter() - started) / repeat * 1e6
+    client.close()
+    return costs
+
+
+def run_consumers(source, consumers, frames):
+    children = [subprocess.Popen([sys.executable, __file__, "--child", json.dumps(source), str(frames)],
+                                 stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, cwd=ROOT)
+                for _ in range(consumers)]
+    results = []
+    for child in children:
+        out, err = child.communicate()
+        lines = [line for line in out.splitlines() if line.startswith("{")]
+        if not lines:
+            raise RuntimeError(f"consumer failed: {err[-2000:]}")
+        results.append(json.loads(lines[-1]))
+    return results
+
+
+def report(label, results):
+    for i, r in enumerate(results):
+        print(f"{label:<9} consumer {i}: {r['fps']:5.1f} fps, {r['cpu_ms_per_frame']:6.2f} ms CPU per frame, "
+              f"pose in {r['found']}/{r['frames']} frames" + (" (broker landmarks)" if r["shared_landmarks"] else ""))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--video", default=os.path.join(SAMPLES, "_plunges.mp4"))
+    parser.add_argument("--device", type=int, default=9, help="camera index the broker serves the video as")
+    parser.add_argument("--consumers", type=int, default=2)
+    parser.add_argument("--frames", type=int, default=150)
+    parser.add_argument("--child", nargs=2, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        source, frames = args.child
+        print(json.dumps(consume(json.loads(source), int(frames))))
+        return
+
+    report("separate", run_consumers(args.video, args.consumers, args.frames))
+
+    sys.path.insert(0, ROOT)
+    import camera_broker
+
+    broker = subprocess.Popen([sys.executable, os.path.join(ROOT, "camera_broker.py"), "--source", args.video,
+                               "--device", str(args.device), "--landmarks"],
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, cwd=ROOT)
+    try:
+        deadline = time.monotonic() + 30
+        while not camera_broker.running(args.device):
+            if time.monotonic() > deadline or broker.poll() is not None:
+                raise RuntimeError("camera broker did not start")
+            time.sleep(0.1)
+        report("broker", run_consumers(args.device, args.consumers, args.frames))
+        costs = read_costs(args.device)
+        print(f"taking a frame from shared memory: {costs['view_us']:.1f} us zero-copy, {costs['copy_us']:.1f} us copied")
+    finally:
+        broker.terminate()
+        broker.wait()
+
+
+if __name__ == "__main__":
+    main()
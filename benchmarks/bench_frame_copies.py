@@ -0,0 +1,123 @@
+"""
+Measure the per-frame copies made between reading a frame and handing it to MediaPipe.
+
+Frames from a sample clip go through the old preparation path (cv2.flip and
+cv2.cvtColor each returning a new array, optionally a resize) and through the
+current one (flip in place, RgbBuffer converting into the same array every
+frame). For each path it reports the time per frame (the median and the
+fastest of ``--repeat`` timed passes, which alternate between the paths and
+follow an untimed warm-up pass) and the bytes allocated per frame as seen
+by tracemalloc; numpy allocations are traced, so every new full-size frame
+shows up:
+
+    python benchmarks/bench_frame_copies.py
+    python benchmarks/bench_frame_copies.py --clip planksample.mp4 --max-width 640
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+
+import cv2
+
+from pose_stream import RgbBuffer
+
+SAMPLES = os.path.join(ROOT, "Sample Videos")
+
+
+def read_frames(path, limit):
+    cap = cv2.VideoCapture(path)
+    frames = []
+    while len(frames) < limit:
+        ok, frame = cap.read()
+        if not ok:
+            break
+        frames.append(frame)
+    cap.release()
+    return frames
+
+
+def old_path(frame, flip, max_width):
+    if flip:
+        frame = cv2.flip(frame, 1)
+    source = frame
+    h, w = source.shape[:2]
+    if max_width and w > max_width:
+        source = cv2.resize(source, (max_width, h * max_width // w), interpolation=cv2.INTER_AREA)
+    rgb = cv2.cvtColor(source, cv2.COLOR_BGR2RGB)
+    rgb.flags.writeable = False
+    return rgb
+
+
+def new_path(buffer):
+    def prepare(frame, flip, max_width):
+        if flip:
+            cv2.flip(frame, 1, dst=frame)
+        return buffer.convert(frame, max_width)
+    return prepare
+
+
+def measure_allocations(prepare, frames, flip, max_width):
+    # Fresh copies so flipping in place does not change the input of the next run
+    frames = [f.copy() for f in frames]
+    prepare(frames[0].copy(), flip, max_width)  # first-call allocations are not per-frame cost
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    allocated = 0
+    for frame in frames:
+        start = tracemalloc.get_traced_memory()[0]
+        prepare(frame, flip, max_width)
+        allocated += max(tracemalloc.get_traced_memory()[1] - start, 0)
+        tracemalloc.reset_peak()
+    tracemalloc.stop()
+    return allocated / len(frames)
+
+
+def measure_times(paths, frames, flip, max_width, repeat):
+    """ms per frame for each of ``paths`` over ``repeat`` passes, alternating so drift hits them alike."""
+    timings = {name: [] for name in paths}
+    for run in range(repeat + 1):
+        for name, prepare in paths.items():
+            copies = [f.copy() for f in frames]
+            started = time.perf_counter()
+            for frame in copies:
+                prepare(frame, flip, max_width)
+            if run:  # the first pass only warms caches and the allocator
+                timings[name].append(1000 * (time.perf_counter() - started) / len(frames))
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clip", default="pushups.mp4", help="clip in 'Sample Videos'")
+    parser.add_argument("--frames", type=int, default=120)
+    parser.add_argument("--max-width", type=int, default=None, help="downscale like the adaptive scheduler")
+    parser.add_argument("--no-flip", action="store_true", help="skip the webcam mirror")
+    parser.add_argument("--repeat", type=int, default=7, help="timed passes over the frames (default: 7)")
+    args = parser.parse_args()
+
+    frames = read_frames(os.path.join(SAMPLES, args.clip), args.frames)
+    if not frames:
+        sys.exit(f"could not read {args.clip}")
+    flip = not args.no_flip
+    h, w = frames[0].shape[:2]
+    print(f"{args.clip}: {len(frames)} frames, {w}x{h}, flip={flip}, max_width={args.max_width}, "
+          f"median of {args.repeat} passes")
+
+    buffer = RgbBuffer()
+    paths = {"old": old_path, "new": new_path(buffer)}
+    allocated = {name: measure_allocations(prepare, frames, flip, args.max_width) for name, prepare in paths.items()}
+    timings = measure_times(paths, frames, flip, args.max_width, args.repeat)
+    for name in paths:
+        print(f"{name:>4}: {statistics.median(timings[name]):7.3f} ms/frame (best {min(timings[name]):.3f})  "
+              f"{allocated[name] / 1e6:7.2f} MB allocated/frame")
+    print(f"RgbBuffer allocations over the run: {buffer.allocations}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""
+Benchmark the exercise trackers on the clips in 'Sample Videos'.
+
+Every tracker runs headlessly through a stand-in for the Streamlit UI that
+draws and encodes frames exactly as the app does, with the landmark
+cache switched off so each run decodes the video and runs MediaPipe. For
+every case it reports per-stage latency percentiles (decode, wait, convert,
+inference, logic, draw, display), throughput and the counted result against
+the expected one, and writes everything to a JSON file so runs from two
+commits can be compared:
+
+    python benchmarks/bench_trackers.py -o before.json
+    python benchmarks/bench_trackers.py -o after.json --baseline before.json
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+
+import cv2
+import mediapipe as mp
+
+import landmark_cache
+import pose_engine
+from batch_analysis import normalize_exercise
+from exercise_registry import load
+from tracker_ui import DisplaySink, HeadlessUI
+
+SAMPLES = os.path.join(ROOT, "Sample Videos")
+
+# (exercise, clip, tracker kwargs, expected result fields). The expected reps
+# were counted by hand from the clips; trackers with no clip of their own run
+# on the closest movement for throughput only.
+CASES = [
+    ("pushups", "pushups.mp4", {"target_reps": 100}, {"reps": 4}),
+    ("lunges", "_plunges.mp4", {"target_reps": 100}, {"reps": 4}),
+    ("plank", "planksample.mp4", {"target_time": 600}, {"duration_sec": 15}),
+    ("yoga", "Chair pose.jpg", {"pose_name": "Chair Pose", "target_time": 0}, {"success": True}),
+    ("squats", "_plunges.mp4", {"target_reps": 100}, {}),
+    ("crunches", "pushups.mp4", {"target_reps": 100}, {}),
+    ("sidelyinglegraises", "_plunges.mp4", {"target_reps": 100}, {}),
+]
+
+
+class BenchUI(HeadlessUI):
+    """HeadlessUI that draws and encodes frames through the app's DisplaySink, minus the page itself."""
+
+    def __init__(self, encode=True):
+        super().__init__()
+        self.encode = encode
+        self.sink = DisplaySink(lambda data, caption: None)
+
+    def wants_frame(self):
+        return self.sink.due()
+
+    def show(self, image, caption=None):
+        if self.encode:
+            self.sink.push(image, caption)
+        self.timer.lap("display")
+
+
+def _matches(expected, result):
+    for key, value in expected.items():
+        counted = result.get(key)
+        if isinstance(value, bool) or not isinstance(counted, (int, float)):
+            if counted != value:
+                return False
+        elif int(counted) != value:
+            return False
+    return True
+
+
+def run_case(exercise, clip, kwargs, expected, repeat=1, encode=True, roi=False):
+    func = load(normalize_exercise(exercise))
+    ui = BenchUI(encode)
+    results = []
+    started = time.perf_counter()
+    for _ in range(repeat):
+        results.append(func(user_weight=70, video_path=os.path.join(SAMPLES, clip), ui=ui, roi=roi, **kwargs))
+    wall = time.perf_counter() - started
+
+    # Every frame that reached the tracker ran inference, including the last one a tracker breaks on
+    frames = ui.timer.count("inference")
+    result = results[-1]
+    return {
+        "exercise": exercise,
+        "video": clip,
+        "repeat": repeat,
+        "frames": frames,
+        "seconds": round(wall, 3),
+        "fps": round(frames / wall, 2) if wall else None,
+        "expected": expected,
+        "counted": {key: result.get(key) for key in expected} or result,
+        "correct": _matches(expected, result) if expected else None,
+        "consistent": all(r == result for r in results),
+        "timing": ui.timer.summary(),
+        "frames_shown": ui.sink.shown,
+        "errors": ui.errors,
+    }
+
+
+def _commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_report(report, baseline=None):
+    before = {(c["exercise"], c["video"]): c for c in baseline["cases"]} if baseline else {}
+    print(f"{'exercise':<20}{'frames':>7}{'fps':>8}{'infer p50':>11}{'infer p99':>11}"
+          f"{'display p50':>13}  result")
+    for case in report["cases"]:
+        stages = case["timing"]["stages"]
+        infer = stages.get("inference", {})
+        display = stages.get("display", {})
+        verdict = {True: "ok", False: "WRONG", None: "-"}[case["correct"]]
+        line = (f"{case['exercise']:<20}{case['frames']:>7}{case['fps']:>8}"
+                f"{infer.get('p50', 0):>11}{infer.get('p99', 0):>11}{display.get('p50', 0):>13}"
+                f"  {verdict} {case['counted'] if case['expected'] else ''}")
+        old = before.get((case["exercise"], case["video"]))
+        if old and old["fps"]:
+            line += f"  fps {100 * (case['fps'] - old['fps']) / old['fps']:+.1f}% vs {baseline['commit']}"
+        print(line)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the exercise trackers on the sample videos.")
+    parser.add_argument("--only", nargs="+", choices=sorted(case[0] for case in CASES), help="benchmark only these exercises")
+    parser.add_argument("--repeat", type=int, default=1, help="passes over each clip (default: 1)")
+    parser.add_argument("--no-display", action="store_true", help="skip the JPEG encoding in show()")
+    parser.add_argument("--roi", action="store_true", help="crop inference to the region around the body")
+    parser.add_argument("--baseline", help="earlier JSON output to compare throughput against")
+    parser.add_argument("-o", "--output", default="bench_results.json",
+                        help="where to write the JSON results (default: bench_results.json)")
+    args = parser.parse_args(argv)
+
+    landmark_cache.enabled = False
+    # Load both confidence settings the trackers use so model start-up is not timed
+    pose_engine.warm_up(min_detection_confidence=0.5, min_tracking_confidence=0.5)
+    pose_engine.warm_up(min_detection_confidence=0.7, min_tracking_confidence=0.7)
+
+    report = {
+        "commit": _commit(),
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "opencv": cv2.__version__,
+        "mediapipe": mp.__version__,
+        "cpus": os.cpu_count(),
+        "display_encode": not args.no_display,
+        "roi": args.roi,
+        "cases": [run_case(exercise, clip, kwargs, expected, args.repeat, not args.no_display, args.roi)
+                  for exercise, clip, kwargs, expected in CASES
+                  if not args.only or exercise in args.only],
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    print_report(report, baseline)
+    print(f"\nWrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Measure drawing the camera feed into a pygame window, the way the Orbit game does.
+
+Frames from a sample clip are shown in a panel of the game window through
+the old path (cv2.resize and cv2.cvtColor returning new arrays, then
+pygame.surfarray.make_surface building a new Surface per frame) and through
+VideoPanel, once writing into the Surface's BufferProxy and once with the
+Surface wrapping the resized BGR array. For each it reports the mean time
+to show a new camera frame, the time to draw it again on a game frame with
+no new camera frame (the old path rebuilt the Surface every time), the
+numpy bytes allocated per new frame as seen by tracemalloc (new Surfaces
+are allocated by SDL and are not counted), and whether the window ends up
+with the same pixels as the old path:
+
+    python benchmarks/bench_video_panel.py
+    python benchmarks/bench_video_panel.py --clip planksample.mp4 --panel 500x700
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import cv2
+import numpy as np
+import pygame
+
+from video_panel import VideoPanel
+
+SAMPLES = os.path.join(ROOT, "Sample Videos")
+
+
+def read_frames(path, limit):
+    cap = cv2.VideoCapture(path)
+    frames = []
+    while len(frames) < limit:
+        ok, frame = cap.read()
+        if not ok:
+            break
+        frames.append(frame)
+    cap.release()
+    return frames
+
+
+def old_path(size):
+    def show(frame, screen):
+        cam_small = cv2.resize(frame, size)
+        cam_rgb = cv2.cvtColor(cam_small, cv2.COLOR_BGR2RGB)
+        cam_surface = pygame.surfarray.make_surface(cam_rgb.swapaxes(0, 1))
+        screen.blit(cam_surface, (0, 0))
+    return show, show
+
+
+def panel_path(size, buffer_proxy=True):
+    panel = VideoPanel(size)
+    if not buffer_proxy:
+        # What a display format cv2 cannot write gets: the Surface wraps the resized BGR array
+        panel.code = None
+        panel.surface = pygame.image.frombuffer(panel.scaled, size, "BGR")
+
+    def show(frame, screen):
+        panel.update(frame)
+        panel.blit(screen, (0, 0))
+
+    def redraw(frame, screen):
+        panel.blit(screen, (0, 0))
+    return show, redraw
+
+
+def measure(paths, frames, screen):
+    show, redraw = paths
+    show(frames[0], screen)  # first-call allocations are not per-frame cost
+    tracemalloc.start()
+    allocated = 0
+    for frame in frames:
+        tracemalloc.reset_peak()
+        start = tracemalloc.get_traced_memory()[0]
+        show(frame, screen)
+        allocated += max(tracemalloc.get_traced_memory()[1] - start, 0)
+    tracemalloc.stop()
+
+    started = time.perf_counter()
+    for frame in frames:
+        show(frame, screen)
+    elapsed = time.perf_counter() - started
+    pixels = pygame.surfarray.array3d(screen)
+
+    started = time.perf_counter()
+    for _ in frames:
+        redraw(frames[-1], screen)
+    redrawn = time.perf_counter() - started
+    return {"ms_per_frame": 1000 * elapsed / len(frames), "redraw_ms": 1000 * redrawn / len(frames),
+            "bytes_per_frame": allocated / len(frames), "pixels": pixels}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clip", default="pushups.mp4", help="clip in 'Sample Videos'")
+    parser.add_argument("--frames", type=int, default=120)
+    parser.add_argument("--panel", default="500x700", help="panel size, WIDTHxHEIGHT (the Orbit game's left half)")
+    args = parser.parse_args()
+
+    size = tuple(int(n) for n in args.panel.split("x"))
+    frames = read_frames(os.path.join(SAMPLES, args.clip), args.frames)
+    if not frames:
+        sys.exit(f"could not read {args.clip}")
+    h, w = frames[0].shape[:2]
+    print(f"{args.clip}: {len(frames)} frames, {w}x{h}, panel {size[0]}x{size[1]}")
+
+    pygame.init()
+    screen = pygame.display.set_mode((size[0] * 2, size[1]))
+    results = {
+        "make_surface": measure(old_path(size), frames, screen),
+        "buffer": measure(panel_path(size), frames, screen),
+        "wrapped": measure(panel_path(size, buffer_proxy=False), frames, screen),
+    }
+    expected = results["make_surface"]["pixels"]
+    for name, r in results.items():
+        same = "same pixels" if np.array_equal(r["pixels"], expected) else "PIXELS DIFFER"
+        print(f"{name:>12}: {r['ms_per_frame']:7.3f} ms/new frame  {r['redraw_ms']:7.3f} ms/redraw  "
+              f"{r['bytes_per_frame'] / 1e6:7.2f} MB allocated/frame  {same}")
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
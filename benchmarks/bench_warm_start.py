@@ -0,0 +1,87 @@
+"""
+Measure the time from pressing Start to the first tracked frame, with and without warm_start.
+
+Each case runs in a fresh Python process. "cold" imports the tracker and
+opens a PoseStream straight away, as the app did when Start was pressed;
+"warm" first runs warm_start.start() and waits for it to finish (the user
+choosing an exercise), then does the same. The time reported is from Start
+until the stream yields its first frame with landmarks:
+
+    python benchmarks/bench_warm_start.py
+    python benchmarks/bench_warm_start.py --camera 0 --exercise Squats
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+SAMPLES = os.path.join(ROOT, "Sample Videos")
+
+
+def first_frame(exercise_name, source, warm):
+    """Runs in the child process."""
+    sys.path.insert(0, ROOT)
+    import importlib
+    import warm_start
+    from exercise_registry import find_exercise
+
+    exercise = find_exercise(exercise_name)
+    warm_up = None
+    if warm:
+        started = time.perf_counter()
+        warm_start.start(exercise.name, source)
+        warm_start.wait()
+        warm_up = time.perf_counter() - started
+
+    started = time.perf_counter()
+    importlib.import_module(exercise.module)
+    from pose_stream import PoseStream
+    stream = PoseStream(source, use_cache=False, min_detection_confidence=exercise.confidence,
+                        min_tracking_confidence=exercise.confidence)
+    for frame in stream:
+        if frame.points is not None:
+            break
+    elapsed = time.perf_counter() - started
+    stream.release()
+    return {"warm": warm, "warm_up_ms": warm_up and warm_up * 1000, "first_frame_ms": elapsed * 1000,
+            "status": warm_start.status}
+
+
+def run_child(exercise, source, warm):
+    out = subprocess.run([sys.executable, __file__, "--child", exercise, json.dumps(source), str(int(warm))],
+                         capture_output=True, text=True, cwd=ROOT)
+    lines = [line for line in out.stdout.splitlines() if line.startswith("{")]
+    if not lines:
+        raise RuntimeError(out.stderr[-2000:])
+    return json.loads(lines[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--exercise", default="Pushups")
+    parser.add_argument("--video", default=os.path.join(SAMPLES, "pushups.mp4"))
+    parser.add_argument("--camera", type=int, default=None, help="use this webcam instead of --video")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--child", nargs=3, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        exercise, source, warm = args.child
+        print(json.dumps(first_frame(exercise, json.loads(source), warm == "1")))
+        return
+
+    source = args.camera if args.camera is not None else args.video
+    for warm in (False, True):
+        runs = [run_child(args.exercise, source, warm) for _ in range(args.repeat)]
+        best = min(run["first_frame_ms"] for run in runs)
+        line = f"{'warm' if warm else 'cold'}: first tracked frame after {best:7.1f} ms (best of {args.repeat})"
+        if warm:
+            line += f", warm-up itself took {min(run['warm_up_ms'] for run in runs):.0f} ms in the background"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
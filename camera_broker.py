@@ -0,0 +1,419 @@
+"""
+One process owns the webcam; the app, the games and anything else read its
+frames from shared memory instead of opening the device themselves.
+
+The broker writes each frame into a ring of slots in a SharedMemory segment
+named after the camera index, optionally with the landmarks of a Pose it
+runs, so readers do not run MediaPipe again. Nothing is locked: every slot
+has a sequence counter that is odd while the broker writes it, and a reader
+checks it before and after reading to know the slot was not being
+rewritten (a seqlock). Readers can take a frame without copying it at all;
+it stays valid until the broker comes round to the same slot again.
+
+PoseStream reads a running broker's camera like a FrameGrabber (see
+BrokerCapture) and uses its landmarks when the Pose settings match:
+
+    python camera_broker.py                 # camera 0, frames only
+    python camera_broker.py --landmarks     # frames and landmarks
+    python camera_broker.py --source "Sample Videos/pushups.mp4" --device 0 --landmarks
+
+ensure_running() starts a broker in the background, which exits once nobody
+has read from it for ``idle_exit`` seconds.
+"""
+import argparse
+import os
+import signal
+import subprocess
+import sys
+import time
+from collections import namedtuple
+from contextlib import nullcontext
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+from landmarks import NUM_LANDMARKS
+
+MAGIC = 0x47554743414D  # "GUGCAM"
+SLOTS = 4
+# Readers count a broker as gone once it has not written a frame for this long
+STALE_AFTER = 2.0
+
+# Header words (int64, floats stored through a float64 view of the same words)
+_MAGIC, _WIDTH, _HEIGHT, _SLOTS, _LATEST, _PID, _LANDMARKS, _CLOSED = range(8)
+_COMPLEXITY, _DETECTION, _TRACKING, _HEARTBEAT, _LAST_READ = range(8, 13)
+HEADER_WORDS = 16
+# Slot words, followed by the landmarks (float32) and the BGR pixels
+_SEQ, _NUMBER, _TIMESTAMP, _FOUND = range(4)
+SLOT_WORDS = 8
+POINTS_BYTES = NUM_LANDMARKS * 4 * 4
+
+# number: frames published before this one; timestamp: wall-clock capture time;
+# image: BGR frame (a view into shared memory unless copied); points: (33, 4) landmarks,
+# None when no pose was found or the broker does not run a Pose
+BrokerFrame = namedtuple("BrokerFrame", "number timestamp image points")
+
+
+def segment_name(device):
+    return f"getupgo_camera_{device}"
+
+
+def _slot_size(width, height):
+    size = SLOT_WORDS * 8 + POINTS_BYTES + width * height * 3
+    return (size + 63) // 64 * 64
+
+
+class _Segment:
+    """numpy views of the header and slots of a broker's shared memory."""
+
+    def __init__(self, shm):
+        self.shm = shm
+        buf = shm.buf
+        self.header = np.ndarray((HEADER_WORDS,), dtype=np.int64, buffer=buf)
+        self.floats = np.ndarray((HEADER_WORDS,), dtype=np.float64, buffer=buf)
+        width, height, slots = (int(v) for v in self.header[[_WIDTH, _HEIGHT, _SLOTS]])
+        self.shape = (height, width, 3)
+        size = _slot_size(width, height)
+        self.slots = []
+        for i in range(slots):
+            offset = HEADER_WORDS * 8 + i * size
+            self.slots.append((
+                np.ndarray((SLOT_WORDS,), dtype=np.int64, buffer=buf, offset=offset),
+                np.ndarray((SLOT_WORDS,), dtype=np.float64, buffer=buf, offset=offset),
+                np.ndarray((NUM_LANDMARKS, 4), dtype=np.float32, buffer=buf, offset=offset + SLOT_WORDS * 8),
+                np.ndarray(self.shape, dtype=np.uint8, buffer=buf, offset=offset + SLOT_WORDS * 8 + POINTS_BYTES),
+            ))
+
+    def release(self):
+        # The views must go before the buffer they point into can be closed
+        self.header = self.floats = None
+        self.slots = []
+        try:
+            self.shm.close()
+        except BufferError:  # a reader still holds a zero-copy frame; the mapping goes when it does
+            pass
+
+
+class BrokerWriter:
+    """The broker's side: publish() one frame (and its landmarks) into the next slot."""
+
+    def __init__(self, device, shape, pose_settings=None, slots=SLOTS):
+        height, width = shape[:2]
+        name = segment_name(device)
+        size = HEADER_WORDS * 8 + slots * _slot_size(width, height)
+        try:
+            shm = shared_memory.SharedMemory(name, create=True, size=size)
+        except FileExistsError:
+            if connect(device) is not None:
+                raise RuntimeError(f"A camera broker for device {device} is already running")
+            stale = shared_memory.SharedMemory(name)  # left behind by a broker that crashed
+            stale.close()
+            stale.unlink()
+            shm = shared_memory.SharedMemory(name, create=True, size=size)
+        header = np.ndarray((HEADER_WORDS,), dtype=np.int64, buffer=shm.buf)
+        floats = np.ndarray((HEADER_WORDS,), dtype=np.float64, buffer=shm.buf)
+        header[:] = 0
+        header[[_WIDTH, _HEIGHT, _SLOTS, _LATEST, _PID]] = (width, height, slots, -1, os.getpid())
+        if pose_settings is not None:
+            header[_LANDMARKS] = 1
+            floats[[_COMPLEXITY, _DETECTION, _TRACKING]] = (pose_settings["model_complexity"],
+                                                            pose_settings["min_detection_confidence"],
+                                                            pose_settings["min_tracking_confidence"])
+        floats[_HEARTBEAT] = floats[_LAST_READ] = time.time()
+        header[_MAGIC] = MAGIC  # last: readers attach only once the header is complete
+        del header, floats
+        self.segment = _Segment(shm)
+        self.published = 0
+
+    def publish(self, image, timestamp, points=None):
+        segment = self.segment
+        number = self.published
+        ints, floats, slot_points, pixels = segment.slots[number % len(segment.slots)]
+        seq = ints[_SEQ]
+        ints[_SEQ] = seq + 1  # odd: being written
+        np.copyto(pixels, image)
+        if points is not None:
+            slot_points[:] = points
+        ints[_FOUND] = points is not None
+        ints[_NUMBER] = number
+        floats[_TIMESTAMP] = timestamp
+        ints[_SEQ] = seq + 2
+        segment.header[_LATEST] = number
+        segment.floats[_HEARTBEAT] = time.time()
+        self.published += 1
+
+    def idle_for(self):
+        """Seconds since a reader last took a frame."""
+        return time.time() - self.segment.floats[_LAST_READ]
+
+    def close(self):
+        self.segment.header[_CLOSED] = 1
+        shm = self.segment.shm
+        self.segment.release()
+        shm.unlink()
+
+
+class CameraClient:
+    """
+    A reader of a running broker. latest() returns the newest frame; with
+    ``copy=False`` its image and points are views into shared memory, good
+    until valid() says the broker has reused their slot.
+    """
+
+    def __init__(self, shm):
+        self.segment = _Segment(shm)
+        header, floats = self.segment.header, self.segment.floats
+        self.shape = self.segment.shape
+        self.pid = int(header[_PID])
+        self.pose_settings = None
+        if header[_LANDMARKS]:
+            self.pose_settings = {"model_complexity": int(floats[_COMPLEXITY]),
+                                  "min_detection_confidence": round(float(floats[_DETECTION]), 3),
+                                  "min_tracking_confidence": round(float(floats[_TRACKING]), 3)}
+
+    @property
+    def alive(self):
+        header = self.segment.header
+        if header is None or header[_CLOSED]:
+            return False
+        return time.time() - self.segment.floats[_HEARTBEAT] < STALE_AFTER and _pid_alive(self.pid)
+
+    def latest(self, after=-1, copy=True, timeout=STALE_AFTER):
+        """
+        The newest frame published after frame number ``after``, waiting up to
+        ``timeout`` seconds for one; None if the broker stopped or none came.
+        """
+        segment = self.segment
+        deadline = time.monotonic() + timeout
+        while True:
+            header = segment.header
+            if header is None:
+                return None
+            number = int(header[_LATEST])
+            if number > after:
+                frame = self._read(number, copy)
+                if frame is not None:
+                    segment.floats[_LAST_READ] = time.time()
+                    return frame
+                continue  # overwritten while we read it; the next one is newer anyway
+            if header[_CLOSED] or time.monotonic() > deadline:
+                return None
+            time.sleep(0.001)
+
+    def _read(self, number, copy):
+        ints, floats, points, pixels = self.segment.slots[number % len(self.segment.slots)]
+        seq = ints[_SEQ]
+        if seq % 2 or ints[_NUMBER] != number:
+            return None
+        timestamp = float(floats[_TIMESTAMP])
+        found = bool(ints[_FOUND])
+        image = pixels.copy() if copy else pixels
+        points = (points.copy() if copy else points) if found else None
+        if ints[_SEQ] != seq:
+            return None
+        return BrokerFrame(number, timestamp, image, points)
+
+    def valid(self, frame):
+        """Whether a frame taken with copy=False still holds what was published."""
+        ints = self.segment.slots[frame.number % len(self.segment.slots)][0]
+        return ints[_NUMBER] == frame.number and ints[_SEQ] % 2 == 0
+
+    def close(self):
+        self.segment.release()
+
+
+class BrokerCapture:
+    """
+    FrameGrabber stand-in reading from a CameraClient: read() returns a copy
+    of the newest frame not returned yet (the caller may draw on it), and
+    ``points`` the broker's landmarks for it.
+    """
+
+    live = True
+
+    def __init__(self, client, timer=None):
+        self.client = client
+        self.pose_settings = client.pose_settings
+        self.timer = timer  # decoding happens in the broker; kept for FrameGrabber compatibility
+        self.timestamp = None
+        self.points = None
+        self.dropped = 0
+        self.frames_read = 0
+        self._last = int(client.segment.header[_LATEST]) - 1  # the newest frame is the first one read
+        self._open = True
+
+    def isOpened(self):
+        return self._open and self.client.alive
+
+    def read(self):
+        if not self._open:
+            return False, None
+        frame = self.client.latest(self._last)
+        if frame is None:
+            return False, None
+        if self._last >= 0:
+            self.dropped += frame.number - self._last - 1
+        self._last = frame.number
+        self.frames_read += 1
+        self.timestamp = frame.timestamp
+        self.points = frame.points
+        return True, frame.image
+
+    def get(self, prop_id):
+        height, width = self.client.shape[:2]
+        return {3: width, 4: height}.get(prop_id, 0.0)
+
+    def set(self, prop_id, value):
+        return False  # the broker owns the device settings
+
+    def release(self):
+        if self._open:
+            self._open = False
+            self.client.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def connect(device=0):
+    """A CameraClient for the broker serving camera ``device``, or None if none is running."""
+    try:
+        shm = shared_memory.SharedMemory(segment_name(device))
+    except (FileNotFoundError, ValueError):
+        return None
+    # Attaching registers the segment with this process's resource tracker, which
+    # would unlink it when we exit; it is the broker's to remove
+    resource_tracker.unregister(shm._name, "shared_memory")
+    if shm.size < HEADER_WORDS * 8 or np.ndarray((1,), dtype=np.int64, buffer=shm.buf)[0] != MAGIC:
+        shm.close()
+        return None
+    client = CameraClient(shm)
+    if not client.alive:
+        client.close()
+        return None
+    return client
+
+
+def capture(device=0, timer=None):
+    """A BrokerCapture of camera ``device`` if a broker serves it, else None."""
+    client = connect(device)
+    return BrokerCapture(client, timer) if client is not None else None
+
+
+def running(device=0):
+    client = connect(device)
+    if client is None:
+        return False
+    client.close()
+    return True
+
+
+def ensure_running(device=0, landmarks=True, idle_exit=30.0, timeout=10.0):
+    """
+    Start a broker for camera ``device`` in the background unless one is
+    running; True once it serves frames. It exits after ``idle_exit``
+    seconds without readers.
+    """
+    if running(device):
+        return True
+    command = [sys.executable, os.path.abspath(__file__), "--source", str(device), "--idle-exit", str(idle_exit)]
+    if landmarks:
+        command.append("--landmarks")
+    broker = subprocess.Popen(command, cwd=os.path.dirname(os.path.abspath(__file__)),
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, start_new_session=True)
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline and broker.poll() is None:  # exits at once without a camera
+        if running(device):
+            return True
+        time.sleep(0.1)
+    return running(device)
+
+
+def serve(source=0, device=None, landmarks=False, width=None, height=None, idle_exit=None,
+          model_complexity=1, min_detection_confidence=0.5, min_tracking_confidence=0.5):
+    """Run a broker until the source ends or, with ``idle_exit``, nobody has read for that long."""
+    from capture import FrameGrabber
+
+    if device is None:
+        if not isinstance(source, int):
+            raise ValueError("A video file needs the camera index it stands in for (device)")
+        device = source
+    pose_settings = None
+    if landmarks:
+        from landmarks import landmarks_to_array
+        from pose_engine import borrow_pose
+        from pose_stream import RgbBuffer
+
+        pose_settings = {"model_complexity": model_complexity,
+                         "min_detection_confidence": min_detection_confidence,
+                         "min_tracking_confidence": min_tracking_confidence}
+        rgb = RgbBuffer()
+
+    grabber = FrameGrabber(source)
+    if width:
+        grabber.set(3, width)
+    if height:
+        grabber.set(4, height)
+    try:
+        # The Pose is ready before the segment exists, so readers never find a broker that looks stalled
+        with borrow_pose(**pose_settings) if landmarks else nullcontext() as pose:
+            ok, image = grabber.read()
+            if not ok:
+                raise RuntimeError(f"Could not read from {source!r}")
+            writer = BrokerWriter(device, image.shape, pose_settings)
+            started = time.time()
+            try:
+                while ok:
+                    if grabber.live:
+                        stamp = grabber.timestamp
+                    else:  # a video file plays at its own speed, as the camera it stands in for would
+                        time.sleep(max(0.0, started + grabber.timestamp - time.time()))
+                        stamp = time.time()
+                    points = None
+                    if pose is not None:
+                        points = landmarks_to_array(pose.process(rgb.convert(image)).pose_landmarks)
+                    writer.publish(image, stamp, points)
+                    if idle_exit and writer.idle_for() > idle_exit:
+                        break
+                    ok, image = grabber.read()
+            finally:
+                writer.close()
+    finally:
+        grabber.release()
+    return writer.published
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--source", default="0", help="camera index or video file")
+    parser.add_argument("--device", type=int, help="camera index readers ask for (required for a video file)")
+    parser.add_argument("--landmarks", action="store_true", help="run a Pose and publish landmarks with the frames")
+    parser.add_argument("--width", type=int)
+    parser.add_argument("--height", type=int)
+    parser.add_argument("--idle-exit", type=float, help="stop after this many seconds without readers")
+    args = parser.parse_args()
+
+    source = int(args.source) if args.source.isdigit() else args.source
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))  # so the segment is still removed
+    try:
+        published = serve(source, args.device, args.landmarks, args.width, args.height, args.idle_exit)
+    except KeyboardInterrupt:
+        return
+    print(f"Published {published} frames")
+
+
+if __name__ == "__main__":
+    main()
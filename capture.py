@@ -0,0 +1,108 @@
+import threading
+import time
+from collections import deque
+
+import cv2
+
+
+class FrameGrabber:
+    """Drop-in replacement for cv2.VideoCapture that reads on a background thread.
+
+    For a live camera only the newest frames are kept in a small ring buffer, so a
+    slow pose.process() never makes the tracker work through stale frames; every
+    frame that is overwritten or skipped is counted in ``dropped``.
+    Video files are read without dropping so recorded reps are never lost.
+
+    ``timestamp`` is the time of the last frame returned by read(): wall-clock
+    capture time for a camera, position in the clip for a video file, so
+    durations measured from it stay correct when a file is processed faster
+    or slower than real time.
+
+    If a ``timer`` (perf.StageTimer) is given, the time spent in cap.read()
+    on the reader thread is recorded as its "decode" stage.
+    """
+
+    def __init__(self, source=0, buffer_size=2, drop_frames=None, timer=None):
+        self.cap = cv2.VideoCapture(source)
+        self.live = isinstance(source, int)
+        self.drop_frames = self.live if drop_frames is None else drop_frames
+        self.buffer = deque(maxlen=buffer_size)
+        self.dropped = 0
+        self.frames_read = 0
+        self.timestamp = None
+        self.timer = timer
+        self._cond = threading.Condition()
+        self._stopped = False
+        self._thread = None
+
+    def _start(self):
+        # Started lazily so cap.set(...) calls made before the first read still apply
+        self._thread = threading.Thread(target=self._reader, daemon=True)
+        self._thread.start()
+
+    def _reader(self):
+        while True:
+            started = time.perf_counter()
+            ret, frame = self.cap.read()
+            if self.timer is not None and ret:
+                self.timer.add("decode", time.perf_counter() - started)
+            stamp = time.time() if self.live else self.cap.get(cv2.CAP_PROP_POS_MSEC) / 1000.0
+            with self._cond:
+                if not ret:
+                    self._stopped = True
+                    self._cond.notify_all()
+                    return
+                if not self.drop_frames:
+                    while len(self.buffer) == self.buffer.maxlen and not self._stopped:
+                        self._cond.wait()
+                if self._stopped:
+                    return
+                if len(self.buffer) == self.buffer.maxlen:
+                    self.dropped += 1
+                self.buffer.append((stamp, frame))
+                self.frames_read += 1
+                self._cond.notify_all()
+
+    def isOpened(self):
+        return self.cap.isOpened() and not (self._stopped and not self.buffer)
+
+    def read(self):
+        """Return (True, frame) with the newest unread frame, or (False, None) at end of stream."""
+        if self._thread is None:
+            if not self.cap.isOpened():
+                return False, None
+            self._start()
+        with self._cond:
+            while not self.buffer and not self._stopped:
+                self._cond.wait()
+            if not self.buffer:
+                return False, None
+            if self.drop_frames:
+                self.timestamp, frame = self.buffer.pop()
+                self.dropped += len(self.buffer)
+                self.buffer.clear()
+            else:
+                self.timestamp, frame = self.buffer.popleft()
+            self._cond.notify_all()
+            return True, frame
+
+    def get(self, prop_id):
+        return self.cap.get(prop_id)
+
+    def set(self, prop_id, value):
+        return self.cap.set(prop_id, value)
+
+    def release(self):
+        with self._cond:
+            self._stopped = True
+            self.buffer.clear()
+            self._cond.notify_all()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+        self.cap.release()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
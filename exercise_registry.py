@@ -0,0 +1,59 @@
+"""
+The exercises the app can run, by name, resolved to their run_* functions
+only when one is started. Importing a tracker module loads mediapipe, cv2 and
+the pose pipeline, so the Streamlit pages that only show menus, schedules or
+history never pay for it.
+"""
+import importlib
+from collections import namedtuple
+
+# target: which keyword the run_* function takes its goal in; pose: fixed yoga pose, if any;
+# confidence: the min detection/tracking confidence its PoseStream uses, so the right Pose can be warmed up
+Exercise = namedtuple("Exercise", "name target module function pose confidence", defaults=(None, 0.5))
+
+TARGET_KEYWORDS = {"reps": "target_reps", "seconds": "target_time"}
+DEFAULT_TARGETS = {"reps": 10, "seconds": 30}
+
+EXERCISES = [
+    Exercise("Squats", "reps", "squats", "run_squats"),
+    Exercise("Pushups", "reps", "pushups", "run_pushups"),
+    Exercise("Lunges", "reps", "lunges", "run_lunges", confidence=0.7),
+    Exercise("Crunches", "reps", "crunches", "run_crunches"),
+    Exercise("Side-Lying Leg Raises", "reps", "sidelyinglegraises", "run_sidelying_leg_raises"),
+    Exercise("Plank", "seconds", "plank", "run_plank"),
+    Exercise("Yoga", "seconds", "yoga_pose_classifier", "run_yoga_pose", confidence=0.7),
+    Exercise("Tree Pose", "seconds", "yoga_pose_classifier", "run_yoga_pose", "Tree Pose", 0.7),
+    Exercise("Warrior Pose", "seconds", "yoga_pose_classifier", "run_yoga_pose", "Warrior Pose", 0.7),
+    Exercise("Chair Pose", "seconds", "yoga_pose_classifier", "run_yoga_pose", "Chair Pose", 0.7),
+]
+REGISTRY = {exercise.name.lower(): exercise for exercise in EXERCISES}
+
+
+def find_exercise(name):
+    """The Exercise called ``name`` (any case), else the first whose name contains or is contained in it, else None."""
+    key = name.strip().lower()
+    if key in REGISTRY:
+        return REGISTRY[key]
+    for other, exercise in REGISTRY.items():
+        if other in key or key in other:
+            return exercise
+    return None
+
+
+def load(exercise):
+    """The run_* function of ``exercise``, importing its module on first use."""
+    return getattr(importlib.import_module(exercise.module), exercise.function)
+
+
+def run_exercise(name, user_weight, video_path=0, target=None, pose_name=None, ui=None):
+    """Start exercise ``name`` with its goal in the unit its tracker expects (reps or seconds)."""
+    exercise = find_exercise(name)
+    if exercise is None:
+        raise ValueError(f"Exercise '{name}' is not supported")
+    kwargs = {"user_weight": user_weight, "video_path": video_path, "ui": ui,
+              TARGET_KEYWORDS[exercise.target]: DEFAULT_TARGETS[exercise.target] if target is None else target}
+    if exercise.module == "yoga_pose_classifier":
+        kwargs["pose_name"] = pose_name or exercise.pose
+        if not kwargs["pose_name"]:
+            raise ValueError(f"No yoga pose chosen for '{name}'")
+    return load(exercise)(**kwargs)
@@ -5,17 +5,13 @@ import subprocess
 import sys
 import os
 import platform
+from contextlib import contextmanager
 
 
-# Import your existing workout modules (make sure these imports match your project)
-from lunges import run_lunges
-from pushups import run_pushups
-from squats import run_squats
-from crunches import run_crunches
-from sidelyinglegraises import run_sidelying_leg_raises as run_side_lying_leg_raises
-from plank import run_plank
-from yoga_pose_classifier import run_yoga_pose
-from ninjastar import run_orbit_game
+# Exercise modules (and with them mediapipe/cv2) are imported only when a workout starts
+from exercise_registry import find_exercise, run_exercise
+from history_store import default_store, show_history
+import warm_start
 
 if "workout_status" not in st.session_state:
     st.session_state.workout_status = "running"  # can be "running", "paused", "exit"
@@ -53,20 +49,6 @@ SCHEDULES = {
     }
 }
 
-# Map exercise names to functions (and specify how to call)
-EXERCISE_MAP = {
-    "Squats": ("reps", run_squats),
-    "Pushups": ("reps", run_pushups),
-    "Lunges": ("reps", run_lunges),
-    "Crunches": ("reps", run_crunches),
-    "Side-lying leg raises": ("reps", run_side_lying_leg_raises),
-    "Plank": ("time_seconds", run_plank),
-    # Yoga poses: mark as time_seconds_pose and call run_yoga_pose directly
-    "Tree Pose": ("time_seconds_pose", lambda **kwargs: run_yoga_pose(**kwargs)),
-    "Warrior Pose": ("time_seconds_pose", lambda **kwargs: run_yoga_pose(**kwargs)),
-    "Chair Pose": ("time_seconds_pose", lambda **kwargs: run_yoga_pose(**kwargs))
-}
-
 # -------------------- Helpers --------------------
 def go_to(page):
     st.session_state.page = page
@@ -84,6 +66,12 @@ def launch_game_script(script_relpath):
         st.error(f"Game script not found: {script_path}")
         return None
 
+    import camera_broker
+    # One process owns the webcam and runs pose detection; the game reads its stream. Started with
+    # the game rather than with the page, so its idle timer cannot run out before anyone reads
+    if not camera_broker.ensure_running(0, landmarks=True):
+        st.info("Make sure no other app is using the webcam before starting a game (only one process can open the camera at a time).")
+
     game_dir = os.path.dirname(script_path)
     try:
         if platform.system() == "Windows":
@@ -99,6 +87,32 @@ def launch_game_script(script_relpath):
         st.error(f"Failed to launch game: {e}")
         return None
 
+@contextmanager
+def session_recording(exercise, metadata):
+    """
+    A SessionWriter for this run if "Record this session" is ticked, else None.
+    It is closed however the script is stopped (Pause/Resume/Exit or leaving
+    the page). A recording that cannot be written only leaves a warning for
+    the result page, so the workout result is saved either way.
+    """
+    from session_log import SessionWriter, prune, session_path
+
+    recorder = None
+    if st.session_state.record_sessions:
+        try:
+            recorder = SessionWriter(session_path(exercise), metadata)
+        except OSError as e:
+            st.session_state.recording_warning = f"The session was not recorded: {e}"
+    try:
+        yield recorder
+    finally:
+        if recorder is not None:
+            try:
+                recorder.close()
+                prune()  # the newest SESSIONS_KEEP recordings stay
+            except OSError as e:
+                st.session_state.recording_warning = f"The session recording could not be saved: {e}"
+
 # Ensure session_state key exists
 if 'game_proc' not in st.session_state:
     st.session_state['game_proc'] = None
@@ -173,7 +187,9 @@ def ensure_session_state():
         "current_target_type": None,
         "daily_completed": [],
         "daily_calories": 0,
-        "history": []
+        "last_result": None,
+        "record_sessions": False,
+        "recording_warning": None
     }
     for k, v in defaults.items():
         if k not in st.session_state:
@@ -186,6 +202,7 @@ if st.session_state.page == "welcome":
     st.title("Welcome to GetUpGo! the Smart Fitness Tracker!")
     st.write("Track exercises and posture using vision-based pose detection!")
     st.session_state.video_path = 0
+    warm_start.release_camera()
     # Center the three buttons
     col_spacer1, col1, col2, col3, col_spacer2 = st.columns([2, 3, 3, 3, 2])
     with col1:
@@ -223,8 +240,8 @@ if st.session_state.page == "welcome":
 # FITNESS GAMES PAGE
 elif st.session_state.page == "fitness_games_page":
     st.title("🎮 Fitness Games")
+    warm_start.release_camera()  # the camera broker opens the webcam instead
     st.write("Choose a game — each opens in its own window. Close the game window to return to Streamlit.")
-    st.info("Make sure no other app is using the webcam before starting a game (only one process can open the camera at a time).")
 
     col1, col2, col3 = st.columns([3, 3, 2])
     with col1:
@@ -270,6 +287,8 @@ elif st.session_state.page == "select":
     st.title("Select Your Workout (Manual Mode)")
     option = st.selectbox("Choose an exercise", ["Lunges", "Pushups", "Squats","Crunches", "Side-Lying Leg Raises", "Plank", "Yoga"])
     st.session_state.exercise = option
+    # Load the tracker, build its Pose and open the camera while the user fills in the rest
+    warm_start.start(option, st.session_state.video_path)
     st.session_state.weight = st.number_input("Enter your weight (kg)", min_value=30, max_value=150, value=st.session_state.weight)
 
     if option == "Yoga":
@@ -284,6 +303,9 @@ elif st.session_state.page == "select":
         target_reps = st.number_input("Target repetitions", min_value=1, max_value=100, value=st.session_state.target_reps or 5)
         st.session_state.target_reps = target_reps
 
+    st.checkbox("Show FPS / latency overlay", key="perf_hud")
+    st.session_state.record_sessions = st.checkbox("Record this session", value=st.session_state.record_sessions)
+
     col1, col2 = st.columns(2)
     with col1:
         if st.button("Start Exercise"):
@@ -315,6 +337,7 @@ elif st.session_state.page == "schedule_select":
     st.write(f"### Plan for {day_choice} ({level})")
     for i, item in enumerate(todays_workout, 1):
         st.write(f"{i}. {item}")
+    st.session_state.record_sessions = st.checkbox("Record these sessions", value=st.session_state.record_sessions)
 
     col1, col2 = st.columns(2)
     with col1:
@@ -333,6 +356,7 @@ elif st.session_state.page == "run_schedule":
     if not queue:
         st.success(f"All exercises done for {st.session_state.schedule_day} ({st.session_state.schedule_level}).")
         st.write(f"Total calories today: {st.session_state.get('daily_calories', 0):.2f} cal")
+        default_store().flush()  # the day's workouts, in one transaction
         level = st.session_state.schedule_level
         if level == "Beginner":
             if st.button("Do Intermediate/Medium Exercise of this day"):
@@ -378,6 +402,7 @@ elif st.session_state.page == "scheduled_announce":
     item = st.session_state.current_schedule_item or "Unknown"
     st.write(f"**Upcoming:** {item}")
     ex_name = st.session_state.current_exercise_for_run or "Unknown"
+    warm_start.start(ex_name, st.session_state.video_path)
     st.write(f"**Exercise:** {ex_name}")
     val = st.session_state.current_target_value
     typ = st.session_state.current_target_type
@@ -406,6 +431,8 @@ elif st.session_state.page == "scheduled_announce":
 
 # WORKOUT RUN (manual)
 elif st.session_state.page == "workout":
+    from tracker_ui import StreamlitUI
+
     st.title(f"🏃 Starting (Manual) {st.session_state.exercise}!")
     col1, col2, col3 = st.columns(3)
     with col1:
@@ -419,28 +446,21 @@ elif st.session_state.page == "workout":
         st.session_state.workout_status = "exit"
     result = None
     error_message=None
-    try:
-        ex = st.session_state.exercise
-        if ex == "Lunges":
-            result = run_lunges(user_weight=st.session_state.weight, video_path=st.session_state.video_path, target_reps=st.session_state.target_reps)
-        elif ex == "Pushups":
-            result = run_pushups(user_weight=st.session_state.weight, video_path=st.session_state.video_path, target_reps=st.session_state.target_reps)
-        elif ex == "Squats":
-            result = run_squats(user_weight=st.session_state.weight, video_path=st.session_state.video_path, target_reps=st.session_state.target_reps)
-        elif ex == "Crunches":
-            result = run_crunches(user_weight=st.session_state.weight, video_path=st.session_state.video_path, target_reps=st.session_state.target_reps)    
-        elif ex == "Side-Lying Leg Raises":
-            result = run_side_lying_leg_raises(user_weight=st.session_state.weight, video_path=st.session_state.video_path, target_reps=st.session_state.target_reps)
-        elif ex == "Plank":
-            result = run_plank(user_weight=st.session_state.weight, video_path=st.session_state.video_path, target_seconds=st.session_state.hold_time)
-        elif ex == "Yoga":
-            result = run_yoga_pose(user_weight=st.session_state.weight, video_path=st.session_state.video_path, target_time=st.session_state.hold_time, pose_name=st.session_state.yoga_pose)
-    except ImportError as e:
-        error_message = f"Import error - check if yoga_pose_classifier.py exists: {e}"
-        st.error(error_message) 
-    except Exception as e:
-        st.error(f"Error running workout: {e}")
-        result = {"status": "Failed", "error": str(e)}
+    # With recording on, every frame of the session is kept on disk for later review
+    with session_recording(st.session_state.exercise,
+                           {"exercise": st.session_state.exercise, "mode": "Manual"}) as recorder:
+        ui = StreamlitUI(hud=st.session_state.get("perf_hud", False), recorder=recorder)
+        try:
+            ex = st.session_state.exercise
+            target = st.session_state.hold_time if ex in ("Plank", "Yoga") else st.session_state.target_reps
+            result = run_exercise(ex, user_weight=st.session_state.weight, video_path=st.session_state.video_path,
+                                  target=target, pose_name=st.session_state.yoga_pose, ui=ui)
+        except ImportError as e:
+            error_message = f"Import error - check that the tracker for {st.session_state.exercise} and its dependencies are installed: {e}"
+            st.error(error_message) 
+        except Exception as e:
+            st.error(f"Error running workout: {e}")
+            result = {"status": "Failed", "error": str(e)}
     if error_message:
         result = {"status": "Failed", "error": error_message}
     elif result is None:
@@ -453,12 +473,18 @@ elif st.session_state.page == "workout":
     }
     if isinstance(result, dict):
         result.update(result_meta)
+        result["timing"] = ui.timer.summary()
+        if recorder is not None:
+            result["recording"] = recorder.path
     st.session_state.results.append(result)
-    st.session_state.history.append(result)
+    st.session_state.last_result = result
+    default_store().add(result)
     go_to("result_manual")
 
 # WORKOUT RUN FOR SCHEDULED ITEM
 elif st.session_state.page == "workout_scheduled_run":
+    from tracker_ui import StreamlitUI
+
     st.title(f"🏃 Starting (Scheduled) {st.session_state.current_exercise_for_run}!")
     col1, col2, col3 = st.columns(3)
     with col1:
@@ -483,61 +509,23 @@ elif st.session_state.page == "workout_scheduled_run":
         go_to("schedule_select") 
 
     result = None
-    try:
-        ex_key = st.session_state.current_exercise_for_run
-        kwargs = {
-            "user_weight": st.session_state.weight,
-            "video_path": st.session_state.video_path
-        }
-        val = st.session_state.current_target_value
-        typ = st.session_state.current_target_type
-
-        # find best match key in EXERCISE_MAP
-        found_key = None
-        for k in EXERCISE_MAP.keys():
-            if k.lower() == ex_key.lower():
-                found_key = k
-                break
-        if not found_key:
-            for k in EXERCISE_MAP.keys():
-                if k.lower() in ex_key.lower() or ex_key.lower() in k.lower():
-                    found_key = k
-                    break
-
-        if not found_key:
-            raise ValueError(f"Exercise '{ex_key}' not supported by EXERCISE_MAP")
-
-        call_type, func = EXERCISE_MAP[found_key]
-
-        if call_type == "reps":
-            if val is None:
-                val = st.session_state.get("target_reps", 10)
-            kwargs["target_reps"] = val
-            result = func(**kwargs)
-        elif call_type == "time_seconds":
-            if val is None:
-                val = st.session_state.get("hold_time", 30)
-            kwargs["target_seconds"] = val
-            result = func(**kwargs)
-        elif call_type == "time_seconds_pose":
+    with session_recording(st.session_state.current_exercise_for_run,
+                           {"exercise": st.session_state.current_exercise_for_run, "mode": "Scheduled",
+                            "day": st.session_state.schedule_day, "level": st.session_state.schedule_level}) as recorder:
+        ui = StreamlitUI(hud=st.session_state.get("perf_hud", False), recorder=recorder)
+        try:
+            ex_key = st.session_state.current_exercise_for_run
+            exercise = find_exercise(ex_key)
+            if exercise is None:
+                raise ValueError(f"Exercise '{ex_key}' is not supported")
+            val = st.session_state.current_target_value
             if val is None:  # fallback if parsing failed
-              val = 30
-            pose_name = found_key
-            result = run_yoga_pose(user_weight=st.session_state.weight,
-                           video_path=st.session_state.video_path,
-                           target_time=val,
-                           pose_name=pose_name)
-    
-        # elif call_type == "time_seconds_pose":
-        #     if val is None:
-        #         val = st.session_state.get("hold_time", 30)
-        #     pose_name = found_key
-        #     result = run_yoga_pose(user_weight=st.session_state.weight, video_path=st.session_state.video_path, target_time=val, pose_name=pose_name)
-        else:
-            result = func(user_weight=st.session_state.weight, video_path=st.session_state.video_path)
-    except Exception as e:
-        st.error(f"Error running scheduled workout: {e}")
-        result = {"status": "Failed", "error": str(e)}
+                val = st.session_state.get("target_reps" if exercise.target == "reps" else "hold_time")
+            result = run_exercise(exercise.name, user_weight=st.session_state.weight,
+                                  video_path=st.session_state.video_path, target=val, ui=ui)
+        except Exception as e:
+            st.error(f"Error running scheduled workout: {e}")
+            result = {"status": "Failed", "error": str(e)}
 
     result = result or {"status": "Failed"}
     metadata = {
@@ -550,8 +538,12 @@ elif st.session_state.page == "workout_scheduled_run":
     }
     if isinstance(result, dict):
         result.update(metadata)
+        result["timing"] = ui.timer.summary()
+        if recorder is not None:
+            result["recording"] = recorder.path
     st.session_state.results.append(result)
-    st.session_state.history.append(result)
+    st.session_state.last_result = result
+    default_store().add(result)
 
     # update daily accumulators
     calories = result.get("calories", 0) if isinstance(result, dict) else 0
@@ -563,8 +555,11 @@ elif st.session_state.page == "workout_scheduled_run":
 
 # SCHEDULED RESULT PAGE (custom result for scheduled flows)
 elif st.session_state.page == "scheduled_result":
-    res = st.session_state.history[-1] if st.session_state.history else {}
+    res = st.session_state.last_result or {}
     st.title("✅ Exercise Completed (Scheduled)")
+    if st.session_state.recording_warning:
+        st.warning(st.session_state.recording_warning)
+        st.session_state.recording_warning = None
     st.write(f"**DAY:** {st.session_state.schedule_day}  |  **PLAN:** {st.session_state.schedule_level}")
     ex_name = res.get("exercise", st.session_state.current_exercise_for_run)
     st.write(f"**Exercise:** {ex_name}")
@@ -610,8 +605,12 @@ elif st.session_state.page == "scheduled_result":
 
 # MANUAL RESULT PAGE
 elif st.session_state.page == "result_manual":
-    result = st.session_state.history[-1] if st.session_state.history else {}
+    result = st.session_state.last_result or {}
+    default_store().flush()
     st.title("✅ Workout Completed (Manual)")
+    if st.session_state.recording_warning:
+        st.warning(st.session_state.recording_warning)
+        st.session_state.recording_warning = None
     if isinstance(result, dict) and result.get("status") == "Success":
         st.success("Great job! You completed your workout.")
         if 'reps' in result:
@@ -631,14 +630,7 @@ elif st.session_state.page == "result_manual":
 # RESULT HISTORY
 elif st.session_state.page == "result_history":
     st.title("📚 Workout History")
-    history = st.session_state.get("history", [])
-    if not history:
-        st.info("No workouts yet.")
-    else:
-        for i, item in enumerate(history[::-1], 1):
-            st.markdown(f"### Session {i}")
-            st.write(item)
-            st.divider()
+    show_history(default_store())
     if st.button("Back"):
         go_to("welcome")
 
@@ -0,0 +1,583 @@
+"""
+Body gestures for the pose-controlled games, detected once and published to
+every game that wants them.
+
+A GestureService runs the one pose pipeline (a PoseStream on a background
+thread) and feeds each frame's landmarks to a GestureRecognizer, which
+evaluates every GestureSpec in SPECS in a few numpy operations per frame,
+whatever the number of gestures. Gestures that start or end are published
+on a GestureBus as GestureEvent tuples; a game subscribes to the ones it
+reacts to and polls them from its own loop.
+
+The bus can also be served on a local socket, so programs in other
+processes get the events without running a pose model of their own:
+
+    python gestures.py              # camera 0, serving on PORT
+    python gestures.py --source "Sample Videos/_plunges.mp4" --show
+
+The socket only carries events. open_feed() connects to such a server when
+one is running, unless the caller shows the camera: then the pipeline runs
+in its own process. A server on a camera reads it through camera_broker, so
+that pipeline reads the same camera (and the broker's landmarks) alongside it.
+"""
+import argparse
+import json
+import os
+import queue
+import socket
+import threading
+import time
+from collections import namedtuple
+
+import numpy as np
+
+from landmarks import (NOSE, LEFT_SHOULDER, RIGHT_SHOULDER, LEFT_ELBOW, RIGHT_ELBOW, LEFT_WRIST, RIGHT_WRIST,
+                       LEFT_HIP, RIGHT_HIP, LEFT_KNEE, LEFT_ANKLE, joint_table, joint_angles)
+from perf import StageTimer
+from pipeline import DropOldestQueue
+
+PORT = int(os.environ.get("GETUPGO_GESTURE_PORT", 50551))
+
+INF = float("inf")
+
+# Gesture names
+START = "start"            # hands joined: start or resume a game, and recalibrate the standing pose
+JUMP = "jump"              # shoulders rise above the standing pose
+DUCK = "duck"              # shoulders drop well below it
+FLAP = "flap"              # both arms raised out to the side
+LEAN_LEFT = "lean_left"    # whole upper body in the left half of the (mirrored) frame
+LEAN_RIGHT = "lean_right"  # ... or in the right half
+RAISE_LEFT = "raise_left"  # left wrist above the nose
+RAISE_RIGHT = "raise_right"
+SHIELD = "shield"          # both wrists above the nose
+BRAKE = "brake"            # hips sink below the standing pose (leaning forward)
+SQUAT = "squat"            # left knee bent past 80 degrees; ends once it straightens past 140
+HEAD_UP = "head_up"        # head moved up by HEAD_STEP since its last move
+HEAD_DOWN = "head_down"    # ... or down
+
+# active: True when the gesture starts, False when it ends.
+# timestamp: wall-clock capture time of the frame it was seen in.
+# lost: the gesture ended because the pose was lost, not because it was released.
+GestureEvent = namedtuple("GestureEvent", "gesture timestamp active lost", defaults=(False,))
+
+# What a gesture watches: ``terms`` of one ``kind`` combined with ``reduce``
+# ("min", "max" or "mean"). With "all", every term must enter the range for
+# the gesture to start and every term must leave it for it to end; its value
+# is the smallest term. Build them with the helpers below.
+Signal = namedtuple("Signal", "kind terms reduce")
+
+# A gesture is active while its signal is inside ``enter`` (low, high).
+# ``hysteresis`` widens the range once inside, so jitter at the threshold
+# does not end and restart it; ``debounce`` is how many seconds the signal
+# must stay in (or out) before the change is published. A ``relative``
+# signal is measured from the standing pose the recognizer calibrated. A
+# signal with a ``step`` is measured from where it was after its last move
+# of at least ``step``, so a gesture on it starts once per such move.
+GestureSpec = namedtuple("GestureSpec", "gesture signal enter hysteresis debounce relative step",
+                         defaults=(0.0, 0.0, False, 0.0))
+
+
+def angle(*triples, reduce="min"):
+    """Signal: joint angle in degrees at the middle of each (a, b, c); by default the smallest."""
+    return Signal("angle", tuple(triples), reduce)
+
+
+def rise(uppers, lower, reduce="min"):
+    """Signal: how far (in frame heights) each landmark in ``uppers`` is above ``lower``."""
+    return Signal("rise", tuple((upper, lower) for upper in uppers), reduce)
+
+
+def coord(axis, *indices, reduce="mean"):
+    """Signal: normalized x (axis 0) or y (axis 1) of the landmarks, by default their mean."""
+    return Signal("xy"[axis], tuple((index,) for index in indices), reduce)
+
+
+def gap(a, b):
+    """Signal: distance between two landmarks in normalized image units."""
+    return Signal("gap", ((a, b),), "min")
+
+
+SHOULDERS = (LEFT_SHOULDER, RIGHT_SHOULDER)
+# 50 px of a 720 px frame, the head move the Dinosaur game has always used
+HEAD_STEP = 0.07
+
+SPECS = [
+    GestureSpec(START, gap(LEFT_WRIST, RIGHT_WRIST), (-INF, 0.10), hysteresis=0.02, debounce=0.3),
+    GestureSpec(JUMP, coord(1, *SHOULDERS), (-INF, -0.03), hysteresis=0.01, relative=True),
+    GestureSpec(DUCK, coord(1, *SHOULDERS), (0.10, INF), hysteresis=0.02, debounce=0.05, relative=True),
+    GestureSpec(FLAP, angle((RIGHT_ELBOW, RIGHT_SHOULDER, RIGHT_HIP), (LEFT_ELBOW, LEFT_SHOULDER, LEFT_HIP),
+                            reduce="all"), (80, INF), hysteresis=50),
+    GestureSpec(LEAN_LEFT, coord(0, *SHOULDERS, reduce="max"), (-INF, 0.5), hysteresis=0.02, debounce=0.05),
+    GestureSpec(LEAN_RIGHT, coord(0, *SHOULDERS, reduce="min"), (0.5, INF), hysteresis=0.02, debounce=0.05),
+    GestureSpec(RAISE_LEFT, rise((LEFT_WRIST,), NOSE), (0.0, INF), hysteresis=0.02),
+    GestureSpec(RAISE_RIGHT, rise((RIGHT_WRIST,), NOSE), (0.0, INF), hysteresis=0.02),
+    GestureSpec(SHIELD, rise((LEFT_WRIST, RIGHT_WRIST), NOSE), (0.0, INF), hysteresis=0.02),
+    GestureSpec(BRAKE, coord(1, LEFT_HIP, RIGHT_HIP), (0.08, INF), hysteresis=0.02, relative=True),
+    GestureSpec(SQUAT, angle((LEFT_HIP, LEFT_KNEE, LEFT_ANKLE)), (-INF, 80), hysteresis=60),
+    GestureSpec(HEAD_UP, coord(1, NOSE), (-INF, -HEAD_STEP), step=HEAD_STEP),
+    GestureSpec(HEAD_DOWN, coord(1, NOSE), (HEAD_STEP, INF), step=HEAD_STEP),
+]
+
+_KINDS = ("angle", "rise", "x", "y", "gap")
+_REDUCERS = {"min": np.minimum, "max": np.maximum, "mean": np.add, "all": np.minimum}
+
+
+class GestureRecognizer:
+    """
+    Turns a stream of (33, 4) landmark arrays into GestureEvents.
+
+    All terms of a kind (every joint angle, every height difference, ...)
+    are computed in one numpy call, and the hysteresis and debounce state of
+    all gestures is updated as arrays, so a frame costs the same handful of
+    operations however many gestures there are.
+
+    Relative gestures stay inactive until the standing pose is known: the
+    mean of the first ``calibration_frames`` poses, then the pose at every
+    ``START``. A frame without a pose ends every active gesture, with
+    events marked ``lost``.
+    """
+
+    def __init__(self, specs=SPECS, calibration_frames=30, calibrate_on=START):
+        self.specs = list(specs)
+        self.names = [spec.gesture for spec in self.specs]
+        self.calibration_frames = calibration_frames
+        self.calibrate_on = self.names.index(calibrate_on) if calibrate_on in self.names else None
+
+        terms = {kind: [] for kind in _KINDS}
+        positions = []  # per spec, where its terms sit in the concatenated term vector
+        for spec in self.specs:
+            kind = spec.signal.kind
+            if kind not in terms or spec.signal.reduce not in _REDUCERS:
+                raise ValueError(f"{spec.gesture}: unknown signal {spec.signal.kind}/{spec.signal.reduce}")
+            if spec.signal.reduce == "all" and (spec.relative or spec.step):
+                raise ValueError(f"{spec.gesture}: an \"all\" signal cannot be relative or stepped")
+            positions.append((kind, len(terms[kind]), len(spec.signal.terms)))
+            terms[kind].extend(spec.signal.terms)
+        offsets, total = {}, 0
+        for kind in _KINDS:
+            offsets[kind] = total
+            total += len(terms[kind])
+        self._angles = joint_table(*terms["angle"]) if terms["angle"] else None
+        self._rise = np.array(terms["rise"], dtype=np.intp).reshape(-1, 2)
+        self._x = np.array(terms["x"], dtype=np.intp).reshape(-1)
+        self._y = np.array(terms["y"], dtype=np.intp).reshape(-1)
+        self._gap = np.array(terms["gap"], dtype=np.intp).reshape(-1, 2)
+        self._terms = np.empty(total, dtype=np.float64)
+
+        # Terms regrouped spec by spec, so one reduceat per reducer combines them
+        self._order = np.array([offsets[kind] + start + i for kind, start, n in positions for i in range(n)],
+                               dtype=np.intp)
+        counts = np.array([n for _, _, n in positions], dtype=np.intp)
+        self._starts = np.concatenate(([0], np.cumsum(counts)[:-1])).astype(np.intp)
+        self._counts = counts
+        self._reduce = {name: np.array([spec.signal.reduce == name for spec in self.specs], dtype=bool)
+                        for name in _REDUCERS}
+
+        self._low = np.array([spec.enter[0] for spec in self.specs], dtype=np.float64)
+        self._high = np.array([spec.enter[1] for spec in self.specs], dtype=np.float64)
+        self._hysteresis = np.array([spec.hysteresis for spec in self.specs], dtype=np.float64)
+        self._debounce = np.array([spec.debounce for spec in self.specs], dtype=np.float64)
+        self._relative = np.array([spec.relative for spec in self.specs], dtype=bool)
+        self._step = np.array([spec.step for spec in self.specs], dtype=np.float64)
+        self._stepped = self._step > 0
+
+        self.values = np.full(len(self.specs), np.nan)  # last signal readings
+        self.baseline = np.full(len(self.specs), np.nan)
+        self.anchor = np.full(len(self.specs), np.nan)  # where step signals last moved to
+        self.active = np.zeros(len(self.specs), dtype=bool)
+        self._zone = np.zeros(len(self.specs), dtype=bool)  # inside the range, before debounce
+        self._since = np.zeros(len(self.specs))
+        self._calibration = []
+
+    def signals(self, points):
+        """Raw signal value of every spec for one frame (before the baseline is taken off)."""
+        t = self._terms
+        o = 0
+        if self._angles is not None:
+            n = len(self._angles)
+            t[o:o + n] = joint_angles(points, self._angles)
+            o += n
+        n = len(self._rise)
+        t[o:o + n] = points[self._rise[:, 1], 1] - points[self._rise[:, 0], 1]
+        o += n
+        n = len(self._x)
+        t[o:o + n] = points[self._x, 0]
+        o += n
+        n = len(self._y)
+        t[o:o + n] = points[self._y, 1]
+        o += n
+        n = len(self._gap)
+        t[o:o + n] = np.hypot(*(points[self._gap[:, 0], :2] - points[self._gap[:, 1], :2]).T)
+
+        grouped = self._grouped = t[self._order]
+        values = np.empty(len(self.specs))
+        for name, ufunc in _REDUCERS.items():
+            mask = self._reduce[name]
+            if mask.any():
+                values[mask] = ufunc.reduceat(grouped, self._starts)[mask]
+        values[self._reduce["mean"]] /= self._counts[self._reduce["mean"]]
+        return values
+
+    def calibrate(self, raw):
+        """Take ``raw`` signal values as the standing pose relative gestures are measured from."""
+        self.baseline = np.where(self._relative, raw, np.nan)
+        self._calibration = None
+
+    def update(self, points, timestamp):
+        """Events for the gestures that started or ended with this frame, in SPECS order."""
+        if points is None:
+            return self._end_all(timestamp)
+        raw = self.signals(points)
+        if self._calibration is not None and self._relative.any():
+            self._calibration.append(raw)
+            if len(self._calibration) >= self.calibration_frames:
+                self.calibrate(np.mean(self._calibration, axis=0))
+        self.values = np.where(self._relative, raw - self.baseline, raw)
+        if self._stepped.any():
+            self.anchor = np.where(self._stepped & np.isnan(self.anchor), raw, self.anchor)
+            self.values = np.where(self._stepped, raw - self.anchor, self.values)
+            with np.errstate(invalid="ignore"):
+                moved = self._stepped & (np.abs(self.values) >= self._step)
+            self.anchor[moved] = raw[moved]
+
+        margin = np.where(self._zone, self._hysteresis, 0.0)
+        with np.errstate(invalid="ignore"):  # NaN (not calibrated yet) is never inside
+            zone = (self.values > self._low - margin) & (self.values < self._high + margin)
+            if self._reduce["all"].any():
+                # Term by term: entering takes all of a spec's terms inside, staying any of them
+                inside = ((self._grouped > np.repeat(self._low - margin, self._counts))
+                          & (self._grouped < np.repeat(self._high + margin, self._counts)))
+                every = np.logical_and.reduceat(inside, self._starts)
+                some = np.logical_or.reduceat(inside, self._starts)
+                zone = np.where(self._reduce["all"], np.where(self._zone, some, every), zone)
+        self._since[zone != self._zone] = timestamp
+        self._zone = zone
+        changed = (zone != self.active) & (timestamp - self._since >= self._debounce)
+        self.active ^= changed
+        if self.calibrate_on is not None and changed[self.calibrate_on] and self.active[self.calibrate_on]:
+            self.calibrate(raw)
+        return [GestureEvent(self.names[i], timestamp, bool(self.active[i])) for i in np.flatnonzero(changed)]
+
+    def _end_all(self, timestamp):
+        ended = np.flatnonzero(self.active)
+        self.active[:] = False
+        self._zone[:] = False
+        return [GestureEvent(self.names[i], timestamp, False, True) for i in ended]
+
+    def held(self):
+        """Names of the gestures active now."""
+        return {self.names[i] for i in np.flatnonzero(self.active)}
+
+
+class Subscription:
+    """
+    The events of the gestures a game subscribed to (all of them for None),
+    queued until it calls poll(). ``held`` is the set of those gestures that
+    are active as of the last poll(). When the pipeline runs in this process
+    ``service`` is its GestureService, whose latest frame latest() returns.
+    """
+
+    def __init__(self, gestures=None, service=None):
+        self.gestures = None if gestures is None else frozenset(gestures)
+        self.service = service
+        self.held = set()
+        self.timer = service.timer if service is not None else StageTimer()
+        self._events = queue.Queue()
+        self._owns_service = False
+
+    def wants(self, gesture):
+        return self.gestures is None or gesture in self.gestures
+
+    def put(self, event):
+        if self.wants(event.gesture):
+            self._events.put(event)
+
+    def poll(self):
+        """Every event since the last call, oldest first."""
+        events = []
+        while True:
+            try:
+                event = self._events.get_nowait()
+            except queue.Empty:
+                return events
+            events.append(event)
+            (self.held.add if event.active else self.held.discard)(event.gesture)
+
+    def latest(self):
+        """(frame number, annotated image) of the pipeline's newest frame; image is None when it runs elsewhere."""
+        return self.service.latest() if self.service is not None else (0, None)
+
+    @property
+    def running(self):
+        return self.service.running if self.service is not None else True
+
+    @property
+    def error(self):
+        return self.service.error if self.service is not None else None
+
+    def close(self):
+        if self.service is not None:
+            self.service.bus.unsubscribe(self)
+            if self._owns_service:
+                self.service.stop()
+
+
+class GestureBus:
+    """In-process publish/subscribe of GestureEvents; publish() may be called from any thread."""
+
+    def __init__(self):
+        self._subscribers = []
+        self._lock = threading.Lock()
+
+    def subscribe(self, gestures=None, service=None):
+        return self.add(Subscription(gestures, service))
+
+    def add(self, subscriber):
+        """Register anything with a put(event) method."""
+        with self._lock:
+            self._subscribers.append(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            if subscriber in self._subscribers:
+                self._subscribers.remove(subscriber)
+
+    def publish(self, events):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for event in events:
+            for subscriber in subscribers:
+                subscriber.put(event)
+
+
+class GestureService:
+    """
+    Reads ``source`` through a PoseStream on a background thread and
+    publishes the recognizer's events on ``bus``. Events are stamped with the
+    wall-clock capture time (for a video file, the time the frame was processed).
+
+    latest() is the newest frame with the skeleton and the active gestures
+    drawn on it. Times go to ``timer``: the stream's stages plus "logic" for
+    gesture recognition. As nothing here runs on the caller's thread, a game
+    loop on a fixed timestep never waits for inference.
+
+    ``width`` and ``height`` ask a camera the service opens itself for that
+    resolution; a camera served by camera_broker keeps the broker's settings.
+    """
+
+    def __init__(self, source=0, specs=SPECS, bus=None, flip=True, timer=None, width=None, height=None,
+                 **stream_options):
+        self.source = source
+        self.resolution = (width, height)
+        self.bus = bus if bus is not None else GestureBus()
+        self.recognizer = GestureRecognizer(specs)
+        self.timer = timer if timer is not None else StageTimer()
+        self.flip = flip
+        self.stream_options = stream_options
+        self.frames = 0
+        self.error = None
+        self._image = None
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._server = None
+        self._clients = []
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def subscribe(self, gestures=None):
+        return self.bus.subscribe(gestures, service=self)
+
+    def _run(self):
+        import cv2
+        from overlay import draw_skeleton
+        from pose_stream import PoseStream
+
+        live = isinstance(self.source, int)
+        stream = PoseStream(self.source, flip=self.flip, use_cache=False, timer=self.timer, **self.stream_options)
+        if live:
+            for prop_id, value in zip((cv2.CAP_PROP_FRAME_WIDTH, cv2.CAP_PROP_FRAME_HEIGHT), self.resolution):
+                if value:
+                    stream.cap.set(prop_id, value)
+        try:
+            for frame in stream:
+                if self._stopped.is_set():
+                    break
+                stamp = frame.timestamp if live else time.time()
+                events = self.recognizer.update(frame.points, stamp)
+                self.bus.publish(events)
+                self.timer.lap("logic")
+                if frame.image is not None:
+                    draw_skeleton(frame.image, frame.points)
+                    cv2.putText(frame.image, " ".join(sorted(self.recognizer.held())), (10, 30),
+                                cv2.FONT_HERSHEY_PLAIN, 2, (0, 255, 0), 2)
+                with self._lock:
+                    self._image = frame.image
+                    self.frames += 1
+        except Exception as e:  # surfaced to the games through ``error``
+            self.error = e
+        finally:
+            stream.release()
+            self._stopped.set()
+            for client in self._clients:  # their RemoteSubscriptions stop running
+                client.close()
+
+    @property
+    def running(self):
+        return not self._stopped.is_set()
+
+    def latest(self):
+        """(frame number, annotated image) of the newest processed frame; image is None before the first."""
+        with self._lock:
+            return self.frames, self._image
+
+    def serve(self, port=PORT, host="127.0.0.1"):
+        """Also publish on a local TCP socket, one JSON event per line, for games in other processes."""
+        self._server = socket.create_server((host, port))
+        threading.Thread(target=self._accept, daemon=True).start()
+        return self
+
+    def _accept(self):
+        while not self._stopped.is_set():
+            try:
+                conn, _ = self._server.accept()
+            except OSError:
+                return
+            self._clients.append(self.bus.add(_SocketSubscriber(conn, self.bus)))
+
+    def stop(self):
+        self._stopped.set()
+        if self._server is not None:
+            self._server.close()
+        if self._thread.is_alive() and self._thread is not threading.current_thread():
+            self._thread.join(timeout=2)
+
+
+class _SocketSubscriber:
+    """
+    Sends every event to one connected client from its own thread, so a slow
+    client never holds up the publisher and the other subscribers; one that
+    falls more than ``backlog`` events behind loses the oldest. Drops itself
+    when the client goes away.
+    """
+
+    def __init__(self, conn, bus, backlog=256):
+        self.conn = conn
+        self.bus = bus
+        self._events = DropOldestQueue(backlog)
+        self._thread = threading.Thread(target=self._send, daemon=True)
+        self._thread.start()
+
+    def put(self, event):
+        self._events.put(event)
+
+    def _send(self):
+        while True:
+            event = self._events.get()
+            if event is None:  # closed, and everything queued before was sent
+                break
+            try:
+                self.conn.sendall((json.dumps(event._asdict()) + "\n").encode())
+            except OSError:
+                break
+        self.bus.unsubscribe(self)
+        self.conn.close()
+
+    def close(self):
+        self._events.close()
+
+
+class RemoteSubscription(Subscription):
+    """
+    A Subscription fed by a gesture server in another process (see
+    GestureService.serve). Only events come over the socket: latest() has
+    no image.
+    """
+
+    def __init__(self, gestures=None, port=PORT, host="127.0.0.1", timeout=0.5):
+        super().__init__(gestures)
+        self.conn = socket.create_connection((host, port), timeout=timeout)
+        self.conn.settimeout(None)
+        self._closed = threading.Event()
+        self._thread = threading.Thread(target=self._read, daemon=True)
+        self._thread.start()
+
+    def _read(self):
+        with self.conn.makefile("r", encoding="utf-8") as lines:
+            for line in lines:
+                self.put(GestureEvent(**json.loads(line)))
+        self._closed.set()
+
+    @property
+    def running(self):
+        return not self._closed.is_set()
+
+    def close(self):
+        try:
+            self.conn.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.conn.close()
+
+
+def open_feed(gestures=None, source=0, port=PORT, frames=False, **service_options):
+    """
+    Subscribe to ``gestures``: from the gesture server on ``port`` if one is
+    running, otherwise from a GestureService reading ``source`` in this
+    process, which close() stops again. A caller that shows the camera
+    passes ``frames=True`` and always gets the in-process service, whose
+    latest() has the frames a server cannot send. ``service_options``
+    (e.g. ``width`` and ``height``) go to that GestureService.
+    """
+    if port and not frames:
+        try:
+            return RemoteSubscription(gestures, port)
+        except OSError:
+            pass
+    subscription = GestureService(source, **service_options).start().subscribe(gestures)
+    subscription._owns_service = True
+    return subscription
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--source", default="0", help="camera index or video file")
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--show", action="store_true", help="show the camera with the active gestures")
+    args = parser.parse_args()
+
+    source = int(args.source) if args.source.isdigit() else args.source
+    if isinstance(source, int):
+        import camera_broker
+
+        # Games that show the camera run their own pipeline; through the broker they can open it too
+        camera_broker.ensure_running(source, landmarks=True)
+    service = GestureService(source).serve(args.port)
+    subscription = service.subscribe()
+    service.start()
+    print(f"Publishing gestures on 127.0.0.1:{args.port}")
+    shown = 0
+    try:
+        while service.running:
+            for event in subscription.poll():
+                print(f"{event.timestamp:.3f} {event.gesture} {'start' if event.active else 'end'}")
+            frames, image = service.latest()
+            if args.show and image is not None and frames != shown:
+                import cv2
+                shown = frames
+                cv2.imshow("Gestures", image)
+                if cv2.waitKey(1) & 0xFF == 27:
+                    break
+            time.sleep(0.01)
+    except KeyboardInterrupt:
+        pass
+    service.stop()
+    if service.error:
+        print(f"Stopped: {service.error}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,237 @@
+"""
+Workout history kept in an SQLite file, so it survives restarts of the app.
+
+One row per finished workout, with the fields the history page filters and
+sums on (user, exercise, date, reps, seconds, calories) as columns and the
+whole result dict as JSON. Rows are looked up through indexes on
+(user, timestamp) and (user, exercise, timestamp), and the history page
+only ever reads one page of rows plus small aggregates, so it stays fast
+however many sessions a user has.
+
+Results are queued by add() and written in one transaction by flush(), which
+runs when the queue is full, before any query and at exit.
+"""
+import atexit
+import datetime
+import json
+import os
+import sqlite3
+import threading
+
+HISTORY_PATH = os.environ.get(
+    "GETUPGO_HISTORY",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "history.sqlite3"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS workouts (
+    id        INTEGER PRIMARY KEY,
+    user      TEXT NOT NULL DEFAULT '',
+    exercise  TEXT NOT NULL DEFAULT '',
+    mode      TEXT,
+    status    TEXT,
+    reps      INTEGER,
+    seconds   REAL,
+    calories  REAL NOT NULL DEFAULT 0,
+    plan_day  TEXT,
+    plan_level TEXT,
+    timestamp TEXT NOT NULL,
+    date      TEXT NOT NULL,
+    data      TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS workouts_user_time ON workouts (user, timestamp);
+CREATE INDEX IF NOT EXISTS workouts_user_exercise_time ON workouts (user, exercise, timestamp);
+CREATE INDEX IF NOT EXISTS workouts_user_date ON workouts (user, date, calories);
+"""
+
+# Keys the trackers report their duration under: plank "time", yoga "duration"
+SECONDS_KEYS = ("time", "duration_sec", "duration")
+
+COLUMNS = ["user", "exercise", "mode", "status", "reps", "seconds", "calories",
+           "plan_day", "plan_level", "timestamp", "date", "data"]
+
+
+def _seconds(result):
+    """The first of SECONDS_KEYS in ``result`` that holds a number, as a float; values like "N/A" are skipped."""
+    for key in SECONDS_KEYS:
+        try:
+            return float(result[key])
+        except (KeyError, TypeError, ValueError):
+            continue
+    return None
+
+
+def _row(result, user):
+    timestamp = result.get("timestamp") or datetime.datetime.now().isoformat()
+    return (
+        user or "",
+        result.get("exercise") or "",
+        result.get("mode") or ("Scheduled" if result.get("day") else None),
+        result.get("status"),
+        result.get("reps"),
+        _seconds(result),
+        result.get("calories") or 0,
+        result.get("day"),
+        result.get("level"),
+        timestamp,
+        timestamp[:10],
+        json.dumps(result, default=str),
+    )
+
+
+class HistoryStore:
+    """
+    The history file at ``path``. One connection is shared by the Streamlit
+    script threads of a process, guarded by a lock.
+    """
+
+    def __init__(self, path=HISTORY_PATH, batch_size=32):
+        self.path = path
+        self.batch_size = batch_size
+        self._pending = []
+        self._lock = threading.Lock()
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(SCHEMA)
+        self._migrate()
+
+    def _migrate(self):
+        (version,) = self._db.execute("PRAGMA user_version").fetchone()
+        if version < 1:
+            # Yoga results were stored without their "duration" in the seconds column
+            with self._db:
+                self._db.execute("UPDATE workouts SET seconds = json_extract(data, '$.duration') "
+                                 "WHERE seconds IS NULL AND json_type(data, '$.duration') IN ('integer', 'real')")
+                self._db.execute("PRAGMA user_version = 1")
+
+    def add(self, result, user=""):
+        """Queue one workout result (the dict a run_* function returns, plus metadata)."""
+        if not isinstance(result, dict):
+            return
+        with self._lock:
+            self._pending.append(_row(result, user))
+            full = len(self._pending) >= self.batch_size
+        if full:
+            self.flush()
+
+    def add_many(self, results, user=""):
+        for result in results:
+            self.add(result, user)
+
+    def flush(self):
+        """Write every queued result in a single transaction."""
+        with self._lock:
+            if not self._pending:
+                return
+            rows, self._pending = self._pending, []
+            with self._db:
+                self._db.executemany(
+                    f"INSERT INTO workouts ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})",
+                    rows)
+
+    def _query(self, sql, params=()):
+        self.flush()
+        with self._lock:
+            return self._db.execute(sql, params).fetchall()
+
+    @staticmethod
+    def _where(user, exercise=None, since=None):
+        clauses, params = ["user = ?"], [user or ""]
+        if exercise:
+            clauses.append("exercise = ?")
+            params.append(exercise)
+        if since:
+            clauses.append("timestamp >= ?")
+            params.append(since)
+        return " AND ".join(clauses), params
+
+    def count(self, user="", exercise=None):
+        where, params = self._where(user, exercise)
+        return self._query(f"SELECT COUNT(*) FROM workouts WHERE {where}", params)[0][0]
+
+    def page(self, user="", offset=0, limit=20, exercise=None):
+        """Newest-first results ``offset`` to ``offset + limit``, as dicts of the stored columns (no JSON)."""
+        where, params = self._where(user, exercise)
+        rows = self._query(
+            f"SELECT id, exercise, mode, status, reps, seconds, calories, plan_day, plan_level, timestamp "
+            f"FROM workouts WHERE {where} ORDER BY timestamp DESC, id DESC LIMIT ? OFFSET ?",
+            params + [limit, offset])
+        return [dict(row) for row in rows]
+
+    def result(self, workout_id):
+        """The full result dict stored for one workout."""
+        rows = self._query("SELECT data FROM workouts WHERE id = ?", (workout_id,))
+        return json.loads(rows[0]["data"]) if rows else None
+
+    def exercises(self, user=""):
+        where, params = self._where(user)
+        return [row[0] for row in self._query(
+            f"SELECT DISTINCT exercise FROM workouts WHERE {where} ORDER BY exercise", params)]
+
+    def daily_calories(self, user="", since=None):
+        """[(date, calories, workouts)] per day, oldest first."""
+        where, params = self._where(user, since=since)
+        return [tuple(row) for row in self._query(
+            f"SELECT date, ROUND(SUM(calories), 2), COUNT(*) FROM workouts WHERE {where} "
+            f"GROUP BY date ORDER BY date", params)]
+
+    def exercise_totals(self, user="", since=None):
+        """[(exercise, workouts, total reps, total seconds, calories)], most practised first."""
+        where, params = self._where(user, since=since)
+        return [tuple(row) for row in self._query(
+            f"SELECT exercise, COUNT(*), COALESCE(SUM(reps), 0), ROUND(COALESCE(SUM(seconds), 0), 1), "
+            f"ROUND(SUM(calories), 2) FROM workouts WHERE {where} "
+            f"GROUP BY exercise ORDER BY COUNT(*) DESC", params)]
+
+    def close(self):
+        self.flush()
+        with self._lock:
+            self._db.close()
+
+
+def show_history(store, user="", page_size=20, key="history"):
+    """
+    The Quick History page body: per-day calories, totals per exercise and one
+    page of sessions, newest first. Only that page is read from the store.
+    """
+    import streamlit as st
+
+    exercises = store.exercises(user)
+    if not exercises:
+        st.info("No workouts yet.")
+        return
+
+    daily = store.daily_calories(user)
+    st.subheader("Calories per day")
+    st.bar_chart({"date": [d for d, _, _ in daily], "calories": [c for _, c, _ in daily]},
+                 x="date", y="calories")
+    st.subheader("Totals per exercise")
+    st.dataframe([{"exercise": e, "sessions": n, "reps": r, "seconds": s, "calories": c}
+                  for e, n, r, s, c in store.exercise_totals(user)],
+                 use_container_width=True, hide_index=True)
+
+    st.subheader("Sessions")
+    exercise = st.selectbox("Exercise", ["All"] + exercises, key=f"{key}_exercise")
+    exercise = None if exercise == "All" else exercise
+    pages = max(1, -(-store.count(user, exercise) // page_size))
+    page = st.number_input("Page", min_value=1, max_value=pages, value=1, step=1, key=f"{key}_page")
+    st.dataframe(store.page(user, (page - 1) * page_size, page_size, exercise),
+                 use_container_width=True, hide_index=True)
+    st.caption(f"Page {page} of {pages}")
+
+
+_default = None
+_default_lock = threading.Lock()
+
+
+def default_store():
+    """The store at HISTORY_PATH, opened once per process and flushed at exit."""
+    global _default
+    with _default_lock:
+        if _default is None:
+            _default = HistoryStore()
+            atexit.register(_default.close)
+        return _default
@@ -0,0 +1,106 @@
+import numpy as np
+
+# Cheapest last: (largest input width handed to MediaPipe, infer every Nth frame).
+# MediaPipe scales its input down to 256x256 itself, so a smaller width mostly
+# saves the colour conversion and its own copy/resize of big frames; the stride
+# is what cuts inference time.
+LEVELS = ((None, 1), (960, 1), (640, 1), (480, 1), (480, 2), (480, 3))
+
+SETTLE_FRAMES = 15  # inferred frames at a level before it may change again
+
+
+class InferenceScheduler:
+    """
+    Picks the input width and inference stride from measured pose latency.
+
+    ``update()`` is fed the milliseconds spent converting and running
+    MediaPipe on each inferred frame. When the per-frame share of that cost
+    (cost / stride) goes over ``budget_ms`` the scheduler moves one level
+    cheaper; when it is comfortably under, it moves back one level, using the
+    cost last measured at that level so it does not bounce between the two.
+    With ``adaptive`` off it stays on full resolution, every frame.
+    """
+
+    def __init__(self, budget_ms=1000 / 30, adaptive=True):
+        self.budget_ms = budget_ms
+        self.adaptive = adaptive
+        self.level = 0
+        self.changes = 0
+        self.inferred = 0
+        self.interpolated = 0
+        self.cost = {}  # level -> moving average of ms per inferred frame
+        self.frames_per_level = {}
+        self._since_inferred = 0
+        self._settle = SETTLE_FRAMES
+
+    @property
+    def max_width(self):
+        return LEVELS[self.level][0]
+
+    @property
+    def stride(self):
+        return LEVELS[self.level][1]
+
+    def should_infer(self):
+        """Call once per frame read; False means this frame's landmarks will be interpolated."""
+        if self._since_inferred + 1 >= self.stride:
+            self._since_inferred = 0
+            return True
+        self._since_inferred += 1
+        self.interpolated += 1
+        return False
+
+    def update(self, cost_ms):
+        self.inferred += 1
+        key = f"{self.max_width or 'full'}/{self.stride}"
+        self.frames_per_level[key] = self.frames_per_level.get(key, 0) + 1
+        previous = self.cost.get(self.level)
+        self.cost[self.level] = cost_ms if previous is None else 0.8 * previous + 0.2 * cost_ms
+        if not self.adaptive:
+            return
+        self._settle -= 1
+        if self._settle > 0:
+            return
+
+        per_frame = self.cost[self.level] / self.stride
+        if per_frame > self.budget_ms and self.level < len(LEVELS) - 1:
+            self._move(self.level + 1)
+        elif self.level > 0:
+            better = self.level - 1
+            estimate = self.cost.get(better)
+            if estimate is None:
+                fits = per_frame < 0.5 * self.budget_ms
+            else:
+                fits = estimate / LEVELS[better][1] < 0.8 * self.budget_ms
+            if fits:
+                self._move(better)
+
+    def _move(self, level):
+        self.level = level
+        self.changes += 1
+        self._settle = SETTLE_FRAMES
+
+    def policy(self):
+        """What the scheduler chose, for the session result."""
+        return {
+            "adaptive": self.adaptive,
+            "budget_ms": round(self.budget_ms, 2),
+            "max_width": self.max_width,
+            "stride": self.stride,
+            "changes": self.changes,
+            "inferred": self.inferred,
+            "interpolated": self.interpolated,
+            "frames_per_level": dict(self.frames_per_level),
+        }
+
+
+def interpolate(start, end, timestamps):
+    """
+    Landmarks for frames between two inferred ones, linear in time.
+    ``start`` and ``end`` are (timestamp, points); a side with no pose gives None for every frame.
+    """
+    (t0, p0), (t1, p1) = start, end
+    if p0 is None or p1 is None:
+        return [None] * len(timestamps)
+    span = t1 - t0
+    return [p0 + (p1 - p0) * np.float32((t - t0) / span if span > 0 else 1.0) for t in timestamps]
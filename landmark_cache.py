@@ -0,0 +1,79 @@
+import hashlib
+import os
+
+import numpy as np
+
+from landmarks import NUM_LANDMARKS
+
+CACHE_DIR = os.environ.get(
+    "GETUPGO_LANDMARK_CACHE",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".landmark_cache"))
+
+# Switched off by the benchmarks so every run decodes and runs MediaPipe
+enabled = True
+
+# One record per decoded frame; points holds x, y, z, visibility and is NaN when no pose was found
+FRAME_DTYPE = np.dtype([("timestamp", "f8"), ("found", "?"), ("points", "f4", (NUM_LANDMARKS, 4))])
+
+_hashes = {}
+
+
+def file_hash(path, chunk_size=1 << 20):
+    """SHA-1 of the file contents, memoised on (path, size, mtime)."""
+    stat = os.stat(path)
+    memo_key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+    if memo_key not in _hashes:
+        digest = hashlib.sha1()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(chunk_size), b""):
+                digest.update(chunk)
+        _hashes[memo_key] = digest.hexdigest()
+    return _hashes[memo_key]
+
+
+def cache_path(video_path, settings):
+    """Cache file for a video and the pose settings that produced its landmarks."""
+    tag = "-".join(f"{k}{settings[k]}" for k in sorted(settings))
+    return os.path.join(CACHE_DIR, f"{file_hash(video_path)}-{tag}.npy")
+
+
+def load(video_path, settings):
+    """Memory-map the cached frames for this video, or return None if it has not been cached yet."""
+    try:
+        path = cache_path(video_path, settings)
+    except OSError:
+        return None
+    if not os.path.exists(path):
+        return None
+    try:
+        frames = np.load(path, mmap_mode="r")
+    except (OSError, ValueError):
+        return None
+    return frames if frames.dtype == FRAME_DTYPE else None
+
+
+class LandmarkWriter:
+    """Collects per-frame landmarks during one pass over a video and saves them in one go."""
+
+    def __init__(self, capacity=1024):
+        self.frames = np.empty(capacity, dtype=FRAME_DTYPE)
+        self.count = 0
+
+    def append(self, timestamp, points):
+        if self.count == len(self.frames):
+            self.frames = np.resize(self.frames, 2 * len(self.frames))
+        row = self.frames[self.count]
+        row["timestamp"] = timestamp
+        row["found"] = points is not None
+        row["points"] = np.nan if points is None else points
+        self.count += 1
+
+    def save(self, video_path, settings):
+        path = cache_path(video_path, settings)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.save(f, self.frames[:self.count])
+        # Atomic so a concurrent reader (e.g. another batch worker) never maps a half-written file
+        os.replace(tmp_path, path)
+        return path
@@ -0,0 +1,61 @@
+import numpy as np
+
+NUM_LANDMARKS = 33
+
+# MediaPipe pose landmark indices (same values as mp_pose.PoseLandmark)
+NOSE = 0
+LEFT_SHOULDER, RIGHT_SHOULDER = 11, 12
+LEFT_ELBOW, RIGHT_ELBOW = 13, 14
+LEFT_WRIST, RIGHT_WRIST = 15, 16
+LEFT_HIP, RIGHT_HIP = 23, 24
+LEFT_KNEE, RIGHT_KNEE = 25, 26
+LEFT_ANKLE, RIGHT_ANKLE = 27, 28
+
+# Index of each landmark's left/right counterpart (itself for the nose)
+MIRRORED = np.array([0, 4, 5, 6, 1, 2, 3, 8, 7, 10, 9, 12, 11, 14, 13, 16, 15, 18, 17, 20, 19, 22, 21,
+                     24, 23, 26, 25, 28, 27, 30, 29, 32, 31], dtype=np.intp)
+
+
+def joint_table(*triples):
+    """Build an (N, 3) index table of (a, b, c) triples; the angle is measured at b."""
+    return np.array(triples, dtype=np.intp).reshape(-1, 3)
+
+
+def landmarks_to_array(pose_landmarks, out=None):
+    """
+    Convert a MediaPipe landmark list (results.pose_landmarks or its .landmark)
+    into a (33, 4) float32 array of x, y, z, visibility. Returns None when no pose was found.
+    """
+    if pose_landmarks is None:
+        return None
+    landmark = getattr(pose_landmarks, "landmark", pose_landmarks)
+    if out is None:
+        out = np.empty((NUM_LANDMARKS, 4), dtype=np.float32)
+    out[:] = [(lm.x, lm.y, lm.z, lm.visibility) for lm in landmark]
+    return out
+
+
+def mirror_points(points):
+    """
+    The landmarks of a horizontally flipped frame: x mirrored and left and
+    right swapped, as MediaPipe would report them for the flipped image.
+    """
+    if points is None:
+        return None
+    mirrored = points[MIRRORED]
+    mirrored[:, 0] = 1.0 - mirrored[:, 0]
+    return mirrored
+
+
+def joint_angles(points, table):
+    """
+    Angles in degrees (0-180) at the middle landmark of every row of ``table``,
+    measured in the image (x, y) plane.
+    """
+    a = points[table[:, 0]]
+    b = points[table[:, 1]]
+    c = points[table[:, 2]]
+    radians = (np.arctan2(c[:, 1] - b[:, 1], c[:, 0] - b[:, 0]) -
+               np.arctan2(a[:, 1] - b[:, 1], a[:, 0] - b[:, 0]))
+    angles = np.abs(np.degrees(radians))
+    return np.where(angles > 180.0, 360.0 - angles, angles)
@@ -12,12 +12,12 @@ import os
 import sys
 import math
 import random
-from collections import deque
-import cv2
-import mediapipe as mp
 import pygame
 import time
 
+import gestures
+from video_panel import VideoPanel
+
 def run_orbit_game():
     # ------------------------- CONFIGURATION ----------------------------
     FULL_WIDTH, HEIGHT = 1000, 700
@@ -31,15 +31,10 @@ def run_orbit_game():
     BOOST_MULT = 2.2
     BRAKE_MULT = 0.4
     SHIELD_TIME = 1200
-    LEAN_THRESHOLD = 0.08
     USER_WEIGHT = 70.0
     MET_VALUE = 4.0
     CAL_PER_MIN = MET_VALUE * USER_WEIGHT * 3.5 / 200
     HIGH_SCORE_FILE = "highscore.txt"
-    L_SHOULDER, R_SHOULDER = 11, 12
-    L_HIP, R_HIP = 23, 24
-    L_WRIST, R_WRIST = 15, 16
-    NOSE = 0
 
     def load_high_score():
         if os.path.exists(HIGH_SCORE_FILE):
@@ -67,26 +62,11 @@ def run_orbit_game():
     clock = pygame.time.Clock()
     font = pygame.font.SysFont("consolas", 24)
 
-    mp_pose = mp.solutions.pose
-    pose = mp_pose.Pose(min_detection_confidence=0.5, min_tracking_confidence=0.5)
-    cap = cv2.VideoCapture(0)
-    if not cap.isOpened():
-        print("Error: Could not open webcam.")
-        return
-
-    # Calibration
-    hip_samples = deque(maxlen=30)
-    while len(hip_samples) < 30:
-        ret, frame = cap.read()
-        if not ret:
-            continue
-        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        results = pose.process(frame_rgb)
-        if results.pose_landmarks:
-            lh = results.pose_landmarks.landmark[L_HIP].y
-            rh = results.pose_landmarks.landmark[R_HIP].y
-            hip_samples.append((lh + rh) / 2)
-    base_hip_y = sum(hip_samples) / len(hip_samples)
+    # Right/left hand up, both hands up and leaning forward come from the shared gesture pipeline;
+    # leaning forward is measured from the standing pose it calibrates on the first frames
+    feed = gestures.open_feed([gestures.RAISE_LEFT, gestures.RAISE_RIGHT, gestures.SHIELD, gestures.BRAKE], frames=True)
+    camera_panel = VideoPanel((PANEL_W, PANEL_H))
+    shown = 0
 
     player_angle = 0.0
     angular_velocity = 0.0
@@ -103,23 +83,14 @@ def run_orbit_game():
         y = CENTRE[1] + radius * math.sin(angle)
         return int(x), int(y)
 
-    def detect_gestures(results):
-        g = {"lean": 0, "boost": False, "brake": False, "jump": False}
-        if not results.pose_landmarks:
-            return g
-        lm = results.pose_landmarks.landmark
-        nose_y = lm[NOSE].y
-        lw_y = lm[L_WRIST].y
-        rw_y = lm[R_WRIST].y
-        if rw_y < nose_y and lw_y < nose_y:
+    def detect_gestures(held):
+        g = {"lean": 0, "boost": False, "brake": gestures.BRAKE in held, "jump": False}
+        if gestures.SHIELD in held:
             g["jump"] = True
-        elif rw_y < nose_y:
+        elif gestures.RAISE_RIGHT in held:
             g["lean"] = 1
-        elif lw_y < nose_y:
+        elif gestures.RAISE_LEFT in held:
             g["lean"] = -1
-        hip_y = (lm[L_HIP].y + lm[R_HIP].y) / 2
-        if hip_y > base_hip_y + LEAN_THRESHOLD:
-            g["brake"] = True
         return g
 
     # ------------------------- MAIN LOOP ------------------------------
@@ -129,22 +100,19 @@ def run_orbit_game():
         increase_rate = 0.00000001
         max_speed = 0.005
         current_rotate_speed = min(current_rotate_speed + increase_rate * dt, max_speed)
-        ret, frame = cap.read()
-        if not ret:
+        if not feed.running:
             break
-        frame = cv2.flip(frame, 1)
-        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        results = pose.process(frame_rgb)
-        gestures = detect_gestures(results)
-        angular_velocity += gestures["lean"] * current_rotate_speed
+        feed.poll()
+        controls = detect_gestures(feed.held)
+        angular_velocity += controls["lean"] * current_rotate_speed
         speed_mult = 1.0
-        if gestures["boost"]:
+        if controls["boost"]:
             speed_mult *= BOOST_MULT
-        if gestures["brake"]:
+        if controls["brake"]:
             speed_mult *= BRAKE_MULT
         player_angle = (player_angle + angular_velocity * speed_mult * (dt / 16.67)) % (2 * math.pi)
         now = pygame.time.get_ticks()
-        if gestures["jump"] and shield_timer <= 0:
+        if controls["jump"] and shield_timer <= 0:
             shield_timer = SHIELD_TIME
         if shield_timer > 0:
             shield_timer -= dt
@@ -166,10 +134,11 @@ def run_orbit_game():
         asteroids[:] = [a for a in asteroids if not a.get("hit")]
         score_ms += dt
         screen.fill((0, 0, 0))
-        cam_small = cv2.resize(frame, (PANEL_W, PANEL_H))
-        cam_rgb = cv2.cvtColor(cam_small, cv2.COLOR_BGR2RGB)
-        cam_surface = pygame.surfarray.make_surface(cam_rgb.swapaxes(0, 1))
-        screen.blit(cam_surface, (0, 0))
+        frames, frame = feed.latest()  # None before the first frame, or when the pipeline runs in another process
+        if frame is not None and frames != shown:
+            shown = frames
+            camera_panel.update(frame)
+        camera_panel.blit(screen, (0, 0))
         for a in asteroids:
             ax, ay = polar_to_screen(a["angle"], a["radius"])
             screen.blit(fireball_img, fireball_img.get_rect(center=(ax, ay)))
@@ -221,7 +190,7 @@ def run_orbit_game():
             if event.key == pygame.K_ESCAPE:
                 game_over_running = False
     
-    cap.release()
+    feed.close()
     pygame.quit()
 
 if __name__ == "__main__":
@@ -0,0 +1,148 @@
+import cv2
+import numpy as np
+
+# mp.solutions.pose.POSE_CONNECTIONS, as an (N, 2) index table
+POSE_CONNECTIONS = np.array([
+    (0, 1), (0, 4), (1, 2), (2, 3), (3, 7), (4, 5), (5, 6), (6, 8), (9, 10),
+    (11, 12), (11, 13), (11, 23), (12, 14), (12, 24), (13, 15), (14, 16),
+    (15, 17), (15, 19), (15, 21), (16, 18), (16, 20), (16, 22), (17, 19), (18, 20),
+    (23, 24), (23, 25), (24, 26), (25, 27), (26, 28), (27, 29), (27, 31), (28, 30),
+    (28, 32), (29, 31), (30, 32),
+], dtype=np.intp)
+
+# mp_drawing.draw_landmarks defaults
+VISIBILITY_THRESHOLD = 0.5
+JOINT_COLOR = (0, 0, 255)
+BONE_COLOR = BORDER_COLOR = (224, 224, 224)  # mp_drawing's WHITE_COLOR
+
+
+def draw_skeleton(image, points, connections=POSE_CONNECTIONS, thickness=2, radius=2):
+    """
+    Draw a pose straight from a (33, 4) landmark array, looking like
+    mp_drawing.draw_landmarks: landmarks that are not visible or fall outside
+    the image are skipped, and so are the bones touching them. All bones are
+    one cv2.polylines call.
+    """
+    if points is None:
+        return image
+    h, w = image.shape[:2]
+    xy = points[:, :2].astype(np.float64)  # float32 would round some pixels differently from mp_drawing
+    shown = (points[:, 3] >= VISIBILITY_THRESHOLD) & np.all((xy >= 0) & (xy <= 1), axis=1)
+    pixels = np.minimum(np.floor(xy * (w, h)), (w - 1, h - 1)).astype(np.int32)
+
+    bones = connections[shown[connections[:, 0]] & shown[connections[:, 1]]]
+    if len(bones):
+        cv2.polylines(image, list(pixels[bones]), False, BONE_COLOR, thickness)
+    border = max(radius + 1, int(radius * 1.2))
+    for x, y in pixels[shown].tolist():
+        cv2.circle(image, (x, y), border, BORDER_COLOR, thickness)
+        cv2.circle(image, (x, y), radius, JOINT_COLOR, thickness)
+    return image
+
+
+class Sprite:
+    """A small BGR patch with a coverage mask, pasted onto frames at (x, y)."""
+
+    def __init__(self, x, y, patch, mask):
+        self.x, self.y = x, y
+        self.patch = patch
+        self.mask = mask.astype(np.uint8)
+
+    @classmethod
+    def text(cls, text, org, scale, color, thickness, font=cv2.FONT_HERSHEY_SIMPLEX):
+        """Rasterize ``text`` once, placed as cv2.putText(image, text, org, ...) would place it."""
+        (tw, th), baseline = cv2.getTextSize(text, font, scale, thickness)
+        pad = thickness
+        mask = np.zeros((th + baseline + 2 * pad, tw + 2 * pad), dtype=np.uint8)
+        cv2.putText(mask, text, (pad, th + pad), font, scale, 255, thickness)
+        patch = np.empty(mask.shape + (3,), dtype=np.uint8)
+        patch[:] = color
+        return cls(org[0] - pad, org[1] - th - pad, patch, mask > 0)
+
+    def paste(self, image):
+        h, w = image.shape[:2]
+        x0, y0 = max(self.x, 0), max(self.y, 0)
+        x1 = min(self.x + self.patch.shape[1], w)
+        y1 = min(self.y + self.patch.shape[0], h)
+        if x0 >= x1 or y0 >= y1:
+            return
+        src = (slice(y0 - self.y, y1 - self.y), slice(x0 - self.x, x1 - self.x))
+        cv2.copyTo(self.patch[src], self.mask[src], image[y0:y1, x0:x1])
+
+
+class Overlay:
+    """
+    A tracker's HUD, split into the parts that never change and the values
+    that do. Panels and labels are rendered into one layer the first time a
+    frame of a new size is drawn; each ``value`` slot is rasterized again only
+    when the text it shows changes. draw() then just pastes the cached pixels:
+
+        hud = Overlay()
+        hud.panel((0, 0), (300, 100), (245, 117, 16))
+        hud.label('SQUATS', (10, 30), 0.8, (0, 0, 0), 2)
+        hud.value('reps', (10, 80), 2, (255, 255, 255), 2)
+        ...
+        hud.draw(image, reps=str(reps))
+    """
+
+    def __init__(self):
+        self._static = []  # ("panel", pt1, pt2, color) / ("label", text, org, scale, color, thickness)
+        self._slots = {}  # name -> (org, scale, color, thickness)
+        self._layer = None
+        self._layer_shape = None
+        self._sprites = {}  # name -> (text, Sprite)
+
+    def panel(self, pt1, pt2, color):
+        """A filled rectangle, as cv2.rectangle(image, pt1, pt2, color, -1)."""
+        self._static.append(("panel", pt1, pt2, color))
+        self._layer_shape = None
+
+    def label(self, text, org, scale, color, thickness):
+        """Fixed text, as cv2.putText with FONT_HERSHEY_SIMPLEX."""
+        self._static.append(("label", text, org, scale, color, thickness))
+        self._layer_shape = None
+
+    def value(self, name, org, scale, color, thickness):
+        """A text slot filled in by draw(image, name=text)."""
+        self._slots[name] = (org, scale, color, thickness)
+
+    def _render_static(self, shape):
+        h, w = shape[:2]
+        patch = np.zeros((h, w, 3), dtype=np.uint8)
+        mask = np.zeros((h, w), dtype=np.uint8)
+        for item in self._static:
+            if item[0] == "panel":
+                _, pt1, pt2, color = item
+                cv2.rectangle(patch, pt1, pt2, color, -1)
+                cv2.rectangle(mask, pt1, pt2, 255, -1)
+            else:
+                _, text, org, scale, color, thickness = item
+                cv2.putText(patch, text, org, cv2.FONT_HERSHEY_SIMPLEX, scale, color, thickness)
+                cv2.putText(mask, text, org, cv2.FONT_HERSHEY_SIMPLEX, scale, 255, thickness)
+        # Keep only the bounding box of what was drawn
+        ys, xs = np.nonzero(mask)
+        if len(ys) == 0:
+            return None
+        y0, y1, x0, x1 = ys.min(), ys.max() + 1, xs.min(), xs.max() + 1
+        return Sprite(int(x0), int(y0), patch[y0:y1, x0:x1].copy(), mask[y0:y1, x0:x1] > 0)
+
+    def _sprite(self, name, text):
+        cached = self._sprites.get(name)
+        if cached is not None and cached[0] == text:
+            return cached[1]
+        org, scale, color, thickness = self._slots[name]
+        sprite = Sprite.text(text, org, scale, color, thickness)
+        self._sprites[name] = (text, sprite)
+        return sprite
+
+    def draw(self, image, **values):
+        """Paste the static layer, then every value given (as text; None leaves the slot empty)."""
+        if self._layer_shape != image.shape[:2]:
+            self._layer = self._render_static(image.shape)
+            self._layer_shape = image.shape[:2]
+        if self._layer is not None:
+            self._layer.paste(image)
+        for name, text in values.items():
+            if text is not None and text != "":
+                self._sprite(name, str(text)).paste(image)
+        return image
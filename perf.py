@@ -0,0 +1,145 @@
+import math
+import threading
+import time
+from collections import deque
+
+import cv2
+
+# Stages of one tracker loop iteration, in the order they run
+STAGES = ("decode", "wait", "convert", "inference", "logic", "draw", "display")
+
+# Frames in the rolling window behind the HUD (about four seconds at 30 fps)
+WINDOW = 120
+
+# Session histograms use log-spaced buckets: 16 per doubling from 1 µs up to ~16 s,
+# so a percentile read from them is within about 2% of the exact value
+_BIN_MIN_MS = 0.001
+_BINS_PER_DOUBLING = 16
+_NUM_BINS = 24 * _BINS_PER_DOUBLING
+
+
+class StageStats:
+    """Running totals, a log-bucketed histogram and the last WINDOW samples of one stage (ms)."""
+    __slots__ = ("count", "total", "max", "bins", "recent")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.bins = [0] * _NUM_BINS
+        self.recent = deque(maxlen=WINDOW)
+
+    def add(self, ms):
+        self.count += 1
+        self.total += ms
+        if ms > self.max:
+            self.max = ms
+        index = int(_BINS_PER_DOUBLING * math.log2(ms / _BIN_MIN_MS)) if ms > _BIN_MIN_MS else 0
+        self.bins[min(index, _NUM_BINS - 1)] += 1
+        self.recent.append(ms)
+
+    def percentile(self, p):
+        """Approximate percentile over the whole session, from the histogram."""
+        rank = p / 100 * self.count
+        seen = 0
+        for index, n in enumerate(self.bins):
+            seen += n
+            if n and seen >= rank:
+                # Geometric middle of the bucket, never more than the largest sample
+                return min(_BIN_MIN_MS * 2 ** ((index + 0.5) / _BINS_PER_DOUBLING), self.max)
+        return self.max
+
+    def rolling_mean(self):
+        return sum(self.recent) / len(self.recent) if self.recent else 0.0
+
+
+class StageTimer:
+    """
+    Per-frame timings of a tracker loop, split into named stages.
+
+    The loop calls start() when it begins work on a frame and lap(stage) as
+    each stage finishes, so a stage is timed from the end of the previous one.
+    Each thread laps from its own mark, so pipeline stages on different
+    threads can share a timer; a thread that does not call start() sets its
+    mark with mark(). Work timed elsewhere (the FrameGrabber's decoding) is
+    recorded with add(). Memory use is fixed however long the session runs.
+    """
+
+    def __init__(self):
+        self.stages = {}
+        self.frames = 0
+        self.dropped = 0  # copied from the FrameGrabber by PoseStream
+        self.notes = {}  # extra session facts for summary(), e.g. the inference policy
+        self.first_frame = None
+        self._starts = deque(maxlen=WINDOW)
+        self._local = threading.local()
+        self._lock = threading.Lock()  # guards adding stages, which other threads may be listing
+
+    def start(self):
+        now = self._local.mark = time.perf_counter()
+        if self.first_frame is None:
+            self.first_frame = now
+        self.frames += 1
+        self._starts.append(now)
+
+    def mark(self):
+        self._local.mark = time.perf_counter()
+
+    def lap(self, stage):
+        now = time.perf_counter()
+        self.add(stage, now - getattr(self._local, "mark", now))
+        self._local.mark = now
+
+    def add(self, stage, seconds):
+        stats = self.stages.get(stage)
+        if stats is None:
+            with self._lock:
+                stats = self.stages.setdefault(stage, StageStats())
+        stats.add(seconds * 1000)
+
+    def count(self, stage):
+        return self.stages[stage].count if stage in self.stages else 0
+
+    def fps(self):
+        """Frames per second over the rolling window."""
+        if len(self._starts) < 2:
+            return 0.0
+        return (len(self._starts) - 1) / (self._starts[-1] - self._starts[0])
+
+    def _ordered(self):
+        """(stage, StageStats) pairs in STAGES order, taken while no stage is being added."""
+        with self._lock:
+            items = list(self.stages.items())
+        return sorted(items, key=lambda item: STAGES.index(item[0]) if item[0] in STAGES else len(STAGES))
+
+    def summary(self, percentiles=(50, 90, 99)):
+        """Session totals plus count, mean, max and percentiles (ms) for every stage."""
+        elapsed = self._starts[-1] - self.first_frame if self.frames > 1 else 0
+        summary = {
+            "frames": self.frames,
+            "fps": round((self.frames - 1) / elapsed, 2) if elapsed else None,
+            "dropped": self.dropped,
+            **self.notes,
+            "stages": {},
+        }
+        for stage, stats in self._ordered():
+            entry = {"count": stats.count, "mean": round(stats.total / stats.count, 3)}
+            for p in percentiles:
+                entry[f"p{p}"] = round(stats.percentile(p), 3)
+            entry["max"] = round(stats.max, 3)
+            summary["stages"][stage] = entry
+        return summary
+
+
+def draw_hud(image, timer):
+    """Draw FPS, dropped frames and the rolling per-stage milliseconds in the top-right corner."""
+    lines = [f"FPS {timer.fps():5.1f}  dropped {timer.dropped}"]
+    lines += [f"{stage:<9} {stats.rolling_mean():6.1f} ms" for stage, stats in timer._ordered()]
+
+    line_height = 16
+    width = 200
+    x = max(image.shape[1] - width, 0)
+    cv2.rectangle(image, (x, 0), (image.shape[1], line_height * len(lines) + 8), (0, 0, 0), -1)
+    for i, line in enumerate(lines, 1):
+        cv2.putText(image, line, (x + 6, i * line_height), cv2.FONT_HERSHEY_PLAIN, 1, (0, 255, 0), 1)
+    return image
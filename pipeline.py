@@ -0,0 +1,128 @@
+import threading
+import time
+from collections import deque
+
+# Returned by a tracker's count() callback to end the session
+STOP = object()
+
+
+class DropOldestQueue:
+    """Bounded queue whose put() never blocks: when full, the oldest item is discarded (and counted)."""
+
+    def __init__(self, maxsize=2):
+        self.items = deque(maxlen=maxsize)
+        self.dropped = 0
+        self.closed = False
+        self._cond = threading.Condition()
+
+    def put(self, item):
+        with self._cond:
+            if len(self.items) == self.items.maxlen:
+                self.dropped += 1
+            self.items.append(item)
+            self._cond.notify()
+
+    def get(self, timeout=None):
+        """Oldest item, or None once the queue is closed and empty (or after ``timeout``)."""
+        with self._cond:
+            if not self.items and not self.closed:
+                self._cond.wait(timeout)
+            return self.items.popleft() if self.items else None
+
+    def close(self):
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+
+
+class TrackerPipeline:
+    """
+    Runs a tracker as three stages that overlap on separate threads:
+
+    1. capture: the FrameGrabber's reader thread decodes frames;
+    2. inference: a worker thread iterates the PoseStream (colour conversion
+       and pose.process()) and calls ``count(frame)``, the tracker's rep
+       counting, on every frame;
+    3. render: the calling thread takes frames from a small drop-oldest
+       queue, calls ``draw(image, frame, state)`` and ui.show(). Streamlit
+       may only be used from the script thread, so this stage stays there,
+       and it also polls ui.status() for pause/exit.
+
+    ``count`` returns the state its overlay needs (handed to ``draw`` with the
+    frame, so drawing never reads counters the worker is updating), or STOP
+    to end the session. If the display falls behind, frames are dropped from
+    the render queue only; counting still sees every frame.
+
+    When the UI has a ``recorder`` (a SessionWriter), every counted frame is
+    appended to it from the worker thread, with ``counter``'s state.
+    """
+
+    def __init__(self, stream, ui, count, draw, caption=None, queue_size=2, counter=None):
+        self.stream = stream
+        self.ui = ui
+        self.count = count
+        self.draw = draw
+        self.caption = caption
+        self.counter = counter
+        self.frames = DropOldestQueue(queue_size)
+        self.status = "running"
+        self.error = None
+        self._worker = threading.Thread(target=self._infer, daemon=True)
+
+    def _infer(self):
+        timer = self.ui.timer
+        recorder = getattr(self.ui, "recorder", None)
+        try:
+            for frame in self.stream:
+                while self.status == "paused":
+                    time.sleep(0.05)  # hold the stream (a video file stops advancing) until resumed
+                if self.status == "exit":
+                    break
+                state = self.count(frame)
+                if recorder is not None:
+                    recorder.append(frame.timestamp, frame.points, self.counter)
+                timer.lap("logic")
+                if state is STOP:
+                    break
+                if frame.image is not None:
+                    self.frames.put((frame, state))
+        except Exception as e:  # re-raised on the calling thread
+            self.error = e
+        finally:
+            self.frames.close()
+
+    def run(self):
+        ui = self.ui
+        self._worker.start()
+        try:
+            while True:
+                self.status = ui.status()
+                if self.status == "exit":
+                    break
+                item = self.frames.get(timeout=0.1)
+                if item is None:
+                    if self.frames.closed and not self.frames.items:
+                        break
+                    continue
+                if not ui.wants_frame():
+                    continue
+                frame, state = item
+                ui.timer.mark()
+                self.draw(frame.image, frame, state)
+                ui.timer.lap("draw")
+                ui.show(frame.image, self.caption)
+        finally:
+            self.status = "exit"
+            self._worker.join(timeout=1.0)
+            if self._worker.is_alive() and self.stream.cap is not None:
+                self.stream.cap.release()  # unblocks a worker waiting on a camera that stopped delivering
+                self._worker.join()
+            self.stream.release()
+            ui.timer.notes["render_dropped"] = self.frames.dropped
+        if self.error is not None:
+            raise self.error
+
+
+def run_pipeline(stream, ui, count, draw, caption=None, counter=None):
+    """Run ``count``/``draw`` over ``stream`` with a TrackerPipeline and release the stream."""
+    TrackerPipeline(stream, ui, count, draw, caption, counter=counter).run()
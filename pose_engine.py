@@ -0,0 +1,109 @@
+import atexit
+import threading
+from contextlib import contextmanager
+
+import mediapipe as mp
+import numpy as np
+
+mp_pose = mp.solutions.pose
+
+# (model_complexity, min_detection_confidence, min_tracking_confidence) -> idle Pose instances
+_idle = {}
+_all = []
+_fresh = set()  # ids of pooled Poses not used since their reset, which need no reset before a loan
+_lock = threading.Lock()
+_DUMMY = np.zeros((256, 256, 3), dtype=np.uint8)
+
+
+def _key(model_complexity, min_detection_confidence, min_tracking_confidence):
+    return (int(model_complexity), round(float(min_detection_confidence), 3),
+            round(float(min_tracking_confidence), 3))
+
+
+def _create(key):
+    model_complexity, detection, tracking = key
+    pose = mp_pose.Pose(model_complexity=model_complexity,
+                        min_detection_confidence=detection,
+                        min_tracking_confidence=tracking)
+    _refresh(pose)
+    with _lock:
+        _all.append(pose)
+    return pose
+
+
+def _refresh(pose):
+    """
+    Clear a Pose's tracking state and get it ready for a first frame. reset()
+    restarts the graph, which is only initialised again (~0.1 s) by the next
+    frame, so a dummy frame is run after it; an empty frame finds no pose and
+    leaves no tracking state behind.
+    """
+    pose.reset()
+    pose.process(_DUMMY)
+    with _lock:
+        _fresh.add(id(pose))
+
+
+def warm_up(model_complexity=1, min_detection_confidence=0.5, min_tracking_confidence=0.5):
+    """
+    Make sure a Pose for these settings is sitting in the pool ready for its
+    first frame: created, or reset after its last loan, here rather than
+    when it is borrowed.
+    """
+    key = _key(model_complexity, min_detection_confidence, min_tracking_confidence)
+    with _lock:
+        idle = _idle.setdefault(key, [])
+        if any(id(pose) in _fresh for pose in idle):
+            return
+        stale = idle.pop() if idle else None
+    if stale is None:
+        pose = _create(key)
+    else:
+        _refresh(stale)
+        pose = stale
+    with _lock:
+        _idle.setdefault(key, []).append(pose)
+
+
+@contextmanager
+def borrow_pose(model_complexity=1, min_detection_confidence=0.5, min_tracking_confidence=0.5):
+    """
+    Lend a warmed-up mp_pose.Pose for the duration of a with-block.
+    Instances are shared across exercises, so each loan starts with no tracking state.
+    """
+    key = _key(model_complexity, min_detection_confidence, min_tracking_confidence)
+    with _lock:
+        idle = _idle.get(key) or []
+        ready = [pose for pose in idle if id(pose) in _fresh]
+        pose = ready[-1] if ready else (idle[-1] if idle else None)
+        if pose is not None:
+            idle.remove(pose)
+    if pose is None:
+        pose = _create(key)
+    elif id(pose) not in _fresh:
+        pose.reset()
+    with _lock:
+        _fresh.discard(id(pose))
+    try:
+        yield pose
+    finally:
+        with _lock:
+            if pose in _all:
+                _idle.setdefault(key, []).append(pose)
+
+
+def shutdown():
+    """Close every Pose the engine has created."""
+    with _lock:
+        poses = list(_all)
+        _all.clear()
+        _idle.clear()
+        _fresh.clear()
+    for pose in poses:
+        try:
+            pose.close()
+        except Exception:
+            pass
+
+
+atexit.register(shutdown)
@@ -0,0 +1,166 @@
+"""
+Classify still poses (yoga) against templates kept in yoga_poses.json.
+
+Every frame's landmarks become one feature vector: the eight joint angles
+the yoga tracker has always used, plus how far each wrist is above its
+shoulder in torso lengths. A template gives a (low, high) range for some of
+those features; features it does not mention are ignored. All templates are
+compared at once as (poses x features) arrays, so the cost hardly grows
+with the number of poses.
+
+Templates can be added by hand or from a reference photo, which adds ranges
+of +-TOLERANCE degrees around the angles measured in it:
+
+    python pose_index.py add "Chair Pose" "Sample Videos/Chair pose.jpg"
+"""
+import argparse
+import json
+import os
+
+import numpy as np
+
+from landmarks import (LEFT_SHOULDER, RIGHT_SHOULDER, LEFT_ELBOW, RIGHT_ELBOW, LEFT_WRIST, RIGHT_WRIST,
+                       LEFT_HIP, RIGHT_HIP, LEFT_KNEE, RIGHT_KNEE, LEFT_ANKLE, RIGHT_ANKLE,
+                       joint_table, joint_angles)
+
+INDEX_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "yoga_poses.json")
+
+ANGLE_NAMES = ["left_hip", "right_hip", "left_elbow", "right_elbow",
+               "left_shoulder", "right_shoulder", "left_knee", "right_knee"]
+FEATURE_NAMES = ANGLE_NAMES + ["left_wrist_raise", "right_wrist_raise"]
+YOGA_JOINTS = joint_table(
+    (LEFT_SHOULDER, LEFT_HIP, LEFT_KNEE),
+    (RIGHT_SHOULDER, RIGHT_HIP, RIGHT_KNEE),
+    (LEFT_SHOULDER, LEFT_ELBOW, LEFT_WRIST),
+    (RIGHT_SHOULDER, RIGHT_ELBOW, RIGHT_WRIST),
+    (LEFT_ELBOW, LEFT_SHOULDER, LEFT_HIP),
+    (RIGHT_HIP, RIGHT_SHOULDER, RIGHT_ELBOW),
+    (LEFT_HIP, LEFT_KNEE, LEFT_ANKLE),
+    (RIGHT_HIP, RIGHT_KNEE, RIGHT_ANKLE),
+)
+SHOULDERS = [LEFT_SHOULDER, RIGHT_SHOULDER]
+WRISTS = [LEFT_WRIST, RIGHT_WRIST]
+HIPS = [LEFT_HIP, RIGHT_HIP]
+
+TOLERANCE = 20.0  # degrees either side of a reference photo's angles
+
+
+def pose_features(points):
+    """Feature vector (in FEATURE_NAMES order) of one frame's (33, 4) landmarks."""
+    features = np.empty(len(FEATURE_NAMES))
+    features[:len(ANGLE_NAMES)] = joint_angles(points, YOGA_JOINTS)
+    torso = np.linalg.norm(points[SHOULDERS, :2].mean(axis=0) - points[HIPS, :2].mean(axis=0))
+    # y grows downwards, so a raised wrist is positive
+    features[len(ANGLE_NAMES):] = (points[SHOULDERS, 1] - points[WRISTS, 1]) / max(torso, 1e-6)
+    return features
+
+
+class PoseIndex:
+    """
+    Templates compiled to arrays: ``center`` and ``inverse_width`` are
+    (templates, features), with zero inverse width where a template does not
+    constrain a feature. A frame's distance to a template is its largest
+    feature offset in half-widths, so under 1 means every range is met.
+    """
+
+    def __init__(self, data):
+        self.features = data.get("features", FEATURE_NAMES)
+        if self.features != FEATURE_NAMES:
+            raise ValueError(f"Pose index features {self.features} do not match {FEATURE_NAMES}")
+        self.poses = data["poses"]
+        self.names = [pose["name"] for pose in self.poses]
+        self.met = {pose["name"]: pose.get("met", 3.0) for pose in self.poses}
+        self.aliases = {}
+        for pose in self.poses:
+            for alias in [pose["name"]] + pose.get("aliases", []):
+                self.aliases[alias.lower()] = pose["name"]
+
+        self.center = np.zeros((len(self.poses), len(self.features)))
+        self.inverse_width = np.zeros((len(self.poses), len(self.features)))
+        column = {name: i for i, name in enumerate(self.features)}
+        for row, pose in enumerate(self.poses):
+            for name, (low, high) in pose["ranges"].items():
+                self.center[row, column[name]] = (low + high) / 2
+                self.inverse_width[row, column[name]] = 2 / (high - low)
+
+    @classmethod
+    def load(cls, path=INDEX_PATH):
+        with open(path, encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def resolve(self, name):
+        """Template name for a pose name or alias ("Warrior Pose" -> "Warrior II Pose"), or None."""
+        return self.aliases.get(name.strip().lower())
+
+    def distances(self, features):
+        return (np.abs(features - self.center) * self.inverse_width).max(axis=1)
+
+    def classify(self, points):
+        """
+        (pose name, confidence) of the closest template, or (None, 0.0) when
+        no template's ranges are all met. Confidence is 1 at a template's
+        centre and falls to 0 at the edge of its ranges.
+        """
+        if points is None:
+            return None, 0.0
+        distances = self.distances(pose_features(points))
+        best = int(np.argmin(distances))
+        if distances[best] >= 1.0:
+            return None, 0.0
+        return self.names[best], float(1.0 - distances[best])
+
+
+_default = None
+
+
+def default_index():
+    """The index in yoga_poses.json, loaded once per process."""
+    global _default
+    if _default is None:
+        _default = PoseIndex.load()
+    return _default
+
+
+def template_from_image(name, image_path, tolerance=TOLERANCE):
+    """A template with ranges of +-``tolerance`` degrees around the angles in a reference photo."""
+    import cv2
+    from pose_engine import borrow_pose
+    from landmarks import landmarks_to_array
+
+    image = cv2.imread(image_path)
+    if image is None:
+        raise ValueError(f"Cannot read {image_path}")
+    with borrow_pose() as pose:  # reset on loan, so the photo gets a fresh detection
+        points = landmarks_to_array(pose.process(cv2.cvtColor(image, cv2.COLOR_BGR2RGB)).pose_landmarks)
+    if points is None:
+        raise ValueError(f"No pose found in {image_path}")
+    features = pose_features(points)
+    ranges = {n: [round(v - tolerance, 1), round(v + tolerance, 1)]
+              for n, v in zip(ANGLE_NAMES, features.tolist())}
+    return {"name": name, "ranges": ranges}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+    add = sub.add_parser("add", help="add a template measured from a reference photo")
+    add.add_argument("name")
+    add.add_argument("image")
+    add.add_argument("--tolerance", type=float, default=TOLERANCE)
+    add.add_argument("--met", type=float, default=3.0)
+    args = parser.parse_args()
+
+    with open(INDEX_PATH, encoding="utf-8") as f:
+        data = json.load(f)
+    template = template_from_image(args.name, args.image, args.tolerance)
+    template["met"] = args.met
+    data["poses"].append(template)
+    PoseIndex(data)  # validate before writing
+    with open(INDEX_PATH, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+        f.write("\n")
+    print(f"Added {args.name} ({len(template['ranges'])} ranges) to {INDEX_PATH}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+import time
+from collections import namedtuple
+from contextlib import nullcontext
+
+import cv2
+import numpy as np
+
+import camera_broker
+import landmark_cache
+import warm_start
+from capture import FrameGrabber
+from inference_scheduler import InferenceScheduler, interpolate
+from landmarks import landmarks_to_array, mirror_points
+from perf import StageTimer
+from pose_engine import borrow_pose
+from roi import RoiTracker
+from smoothing import OneEuroFilter
+
+# image: BGR frame to draw on (None when replaying from the cache)
+# points: (33, 4) landmark array, None when no pose was found
+# landmarks: MediaPipe landmark list as returned by pose.process(), unsmoothed (None when interpolated or replaying)
+PoseFrame = namedtuple("PoseFrame", "image timestamp points landmarks")
+
+
+class RgbBuffer:
+    """
+    The RGB copy of a frame that pose.process() needs, written into the same
+    array every time instead of a new one per frame. It is handed over
+    non-writeable, which lets MediaPipe use it without copying; process()
+    has finished with it before the next convert() overwrites it. The BGR
+    frame itself is never touched, so trackers keep drawing on it.
+    """
+
+    def __init__(self):
+        self.rgb = None
+        self.scaled = None
+        self.allocations = 0
+
+    def _buffer(self, current, shape):
+        if current is None or current.shape != shape:
+            self.allocations += 1
+            return np.empty(shape, dtype=np.uint8)
+        return current
+
+    def convert(self, bgr, max_width=None):
+        """RGB version of ``bgr``, downscaled to ``max_width`` if it is wider."""
+        h, w = bgr.shape[:2]
+        if max_width is not None and w > max_width:
+            size = (max_width, h * max_width // w)
+            self.scaled = self._buffer(self.scaled, (size[1], size[0], 3))
+            bgr = cv2.resize(bgr, size, dst=self.scaled, interpolation=cv2.INTER_AREA)
+        self.rgb = self._buffer(self.rgb, bgr.shape)
+        self.rgb.flags.writeable = True
+        cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB, dst=self.rgb)
+        self.rgb.flags.writeable = False
+        return self.rgb
+
+
+class PoseStream:
+    """
+    Iterate over a camera or video file as PoseFrame tuples.
+
+    A full pass over a video file is saved to the landmark cache, keyed by the
+    file's contents and the pose settings; later streams over the same file
+    replay those landmarks without decoding or running MediaPipe.
+
+    Stage timings go to ``timer``: decode, wait (for the reader thread),
+    convert and inference here; the tracker laps logic, draw and display.
+
+    With ``adaptive`` (the default for cameras) an InferenceScheduler lowers
+    the input width and runs MediaPipe on every 2nd or 3rd frame when
+    inference does not fit in ``frame_budget_ms``. Frames in between get
+    landmarks interpolated from the inferred frames on either side, which
+    delays them by at most the stride. Video files are inferred in full by
+    default so their results (and the landmark cache) do not depend on CPU load.
+
+    With ``roi`` set, each frame is cropped to the body found in the previous
+    one (see RoiTracker) before conversion and inference.
+
+    With ``smoothing`` (the default) the points handed out are run through a
+    OneEuroFilter, so landmark jitter does not flicker angles around a
+    threshold. The cache keeps the raw points and replays smooth them again.
+
+    A camera served by camera_broker is read from its shared memory rather
+    than opened again, and when the broker runs a Pose with the same
+    settings (and no ``roi``) its landmarks are used instead of running
+    MediaPipe here.
+    """
+
+    def __init__(self, video_path=0, flip=False, use_cache=True, model_complexity=1,
+                 min_detection_confidence=0.5, min_tracking_confidence=0.5, timer=None,
+                 adaptive=None, frame_budget_ms=1000 / 30, roi=False, smoothing=True):
+        self.video_path = video_path
+        self.flip = flip
+        self.pose_settings = {"model_complexity": model_complexity,
+                              "min_detection_confidence": min_detection_confidence,
+                              "min_tracking_confidence": min_tracking_confidence}
+        self.cache_settings = {"c": model_complexity, "d": min_detection_confidence,
+                               "t": min_tracking_confidence, "flip": int(flip)}
+        if roi:
+            self.cache_settings["roi"] = 1
+        self.roi = RoiTracker() if roi else None
+        self.rgb = RgbBuffer()
+        self.smoother = OneEuroFilter() if smoothing else None
+        self.timer = timer if timer is not None else StageTimer()
+        if adaptive is None:
+            adaptive = isinstance(video_path, int)
+        self.scheduler = InferenceScheduler(frame_budget_ms, adaptive)
+        self.timestamp = None
+        self.cap = None
+        self.writer = None
+        self._frames = None
+
+        self.replay = None
+        # Interpolated landmarks depend on CPU load, so adaptive streams are never cached
+        use_cache = use_cache and landmark_cache.enabled and not adaptive and not isinstance(video_path, int)
+        if use_cache:
+            self.replay = landmark_cache.load(video_path, self.cache_settings)
+        self.shared_landmarks = False
+        if self.replay is None:
+            if isinstance(video_path, int):
+                # The camera broker's stream if one serves this camera, else a camera opened by
+                # warm_start while the user was choosing the exercise, if there is one
+                self.cap = camera_broker.capture(video_path, timer=self.timer)
+                if self.cap is not None:
+                    self.shared_landmarks = self.roi is None and self.cap.pose_settings == {
+                        key: round(float(value), 3) for key, value in self.pose_settings.items()}
+                else:
+                    self.cap = warm_start.take_camera(video_path, timer=self.timer)
+            if self.cap is None:
+                self.cap = FrameGrabber(video_path, timer=self.timer)
+            if use_cache:
+                self.writer = landmark_cache.LandmarkWriter()
+
+    def isOpened(self):
+        return self.replay is not None or self.cap.isOpened()
+
+    def __iter__(self):
+        self._frames = self._replay() if self.replay is not None else self._infer()
+        return self._frames
+
+    def _replay(self):
+        for row in self.replay:
+            self.timer.start()
+            self.timestamp = float(row["timestamp"])
+            yield PoseFrame(None, self.timestamp, self._smooth(row["points"] if row["found"] else None), None)
+
+    def _smooth(self, points):
+        return points if self.smoother is None else self.smoother(points, self.timestamp)
+
+    def _emit(self, image, timestamp, points, landmarks):
+        self.timestamp = timestamp
+        if self.writer is not None:
+            self.writer.append(timestamp, points)
+        return PoseFrame(image, timestamp, self._smooth(points), landmarks)
+
+    def _infer(self):
+        scheduler = self.scheduler
+        pending = []  # (image, timestamp) of frames read while inference was skipped
+        previous = None  # (timestamp, points) of the last inferred frame
+        with nullcontext() if self.shared_landmarks else borrow_pose(**self.pose_settings) as pose:
+            while self.cap.isOpened():
+                self.timer.start()
+                ret, image = self.cap.read()
+                if not ret:
+                    break
+                self.timer.lap("wait")
+                self.timer.dropped = self.cap.dropped
+                if self.flip:
+                    cv2.flip(image, 1, dst=image)  # mirror for webcam; each read is a fresh array
+                timestamp = self.cap.timestamp
+                if self.shared_landmarks:  # inferred once, by the broker, on the unflipped frame
+                    points = mirror_points(self.cap.points) if self.flip else self.cap.points
+                    self.timer.lap("inference")
+                    yield self._emit(image, timestamp, points, None)
+                    continue
+                if not scheduler.should_infer():
+                    pending.append((image, timestamp))
+                    continue
+
+                started = time.perf_counter()
+                source = self.roi.crop(image) if self.roi is not None else image
+                rgb = self.rgb.convert(source, scheduler.max_width)
+                self.timer.lap("convert")
+                results = pose.process(rgb)
+                self.timer.lap("inference")
+                scheduler.update((time.perf_counter() - started) * 1000)
+
+                if self.roi is not None:
+                    self.roi.to_full(results.pose_landmarks, image.shape)
+                points = landmarks_to_array(results.pose_landmarks)
+                if self.roi is not None and self.roi.update(points, image.shape):
+                    pose.reset()  # its frame-to-frame tracking was in the old crop's coordinates
+                if pending:
+                    between = interpolate(previous or (timestamp, points), (timestamp, points),
+                                          [stamp for _, stamp in pending])
+                    for (skipped, stamp), guess in zip(pending, between):
+                        yield self._emit(skipped, stamp, guess, None)
+                    pending.clear()
+                previous = (timestamp, points)
+                yield self._emit(image, timestamp, points, results.pose_landmarks)
+
+            # Frames after the last inference keep its landmarks
+            for skipped, stamp in pending:
+                yield self._emit(skipped, stamp, previous[1] if previous else None, None)
+
+        # Only a pass that reached the end of the file is worth caching
+        if self.writer is not None:
+            self.writer.save(self.video_path, self.cache_settings)
+
+    def release(self):
+        self.timer.notes["inference_policy"] = self.scheduler.policy()
+        if self.roi is not None:
+            self.timer.notes["roi"] = self.roi.stats()
+        if self.smoother is not None:
+            self.timer.notes["smoothing"] = self.smoother.key()
+        if self._frames is not None:
+            self._frames.close()  # hands the borrowed Pose back if the tracker stopped early
+        if self.cap is not None:
+            self.cap.release()
@@ -0,0 +1,141 @@
+from collections import namedtuple
+
+from landmarks import (LEFT_SHOULDER, RIGHT_SHOULDER, LEFT_ELBOW, LEFT_WRIST, LEFT_HIP, RIGHT_HIP,
+                       LEFT_KNEE, RIGHT_KNEE, LEFT_ANKLE, RIGHT_ANKLE, joint_table, joint_angles)
+
+INF = float("inf")
+
+# A rep is the signal entering ``start`` and then ``finish``, both (low, high)
+# ranges. ``hysteresis`` widens a range once the signal is inside it, so jitter
+# around a threshold does not drop it back out; ``min_phase`` is how many
+# seconds the signal has to stay in a range before that phase counts.
+RepSpec = namedtuple("RepSpec", "signal start finish hysteresis min_phase", defaults=(0.0, 0.0))
+
+# A hold runs while the signal is inside ``hold``; it only ends once the signal
+# has been outside for ``min_phase`` seconds.
+HoldSpec = namedtuple("HoldSpec", "signal hold hysteresis min_phase", defaults=(0.0, 0.0))
+
+
+def joint_angle(a, b, c):
+    """Signal: the angle in degrees at ``b``."""
+    table = joint_table((a, b, c))
+    return lambda points: joint_angles(points, table)[0]
+
+
+def landmark_coordinate(index, axis):
+    """Signal: one normalized coordinate (0 = x, 1 = y) of a landmark."""
+    return lambda points: points[index, axis]
+
+
+def when_visible(signal, indices, threshold=0.5):
+    """Signal that reads None unless every landmark in ``indices`` is visible above ``threshold``."""
+    indices = list(indices)
+    return lambda points: signal(points) if (points[indices, 3] > threshold).all() else None
+
+
+SPECS = {
+    "squats": RepSpec(joint_angle(LEFT_HIP, LEFT_KNEE, LEFT_ANKLE), start=(-INF, 70), finish=(160, INF),
+                      hysteresis=5, min_phase=0.1),
+    "pushups": RepSpec(joint_angle(LEFT_SHOULDER, LEFT_ELBOW, LEFT_WRIST), start=(70, 100), finish=(170, INF),
+                       hysteresis=3),
+    "lunges": RepSpec(joint_angle(RIGHT_HIP, RIGHT_KNEE, RIGHT_ANKLE), start=(-INF, 90), finish=(160, INF),
+                      hysteresis=5, min_phase=0.1),
+    "crunches": RepSpec(joint_angle(RIGHT_SHOULDER, RIGHT_HIP, RIGHT_KNEE), start=(120, INF), finish=(-INF, 110),
+                        hysteresis=3, min_phase=0.1),
+    # y grows downwards: the ankle goes above 0.40 of the frame height and back below 0.55
+    "sidelyinglegraises": RepSpec(landmark_coordinate(RIGHT_ANKLE, 1), start=(-INF, 0.40), finish=(0.55, INF),
+                                  hysteresis=0.02, min_phase=0.1),
+    "plank": HoldSpec(when_visible(joint_angle(LEFT_SHOULDER, LEFT_HIP, LEFT_ANKLE),
+                                   (LEFT_SHOULDER, RIGHT_SHOULDER, LEFT_HIP, RIGHT_HIP, LEFT_ANKLE, RIGHT_ANKLE)),
+                      hold=(160, 180), hysteresis=3, min_phase=0.3),
+}
+
+
+def _inside(value, bounds, margin):
+    return value is not None and bounds[0] - margin < value < bounds[1] + margin
+
+
+class RepCounter:
+    """
+    Counts reps of a RepSpec, one update() per frame in constant time.
+
+    ``phase`` is the last phase the signal settled in ("start", "finish" or
+    None before either) and ``value`` the last signal reading. update()
+    returns "start" when the start phase is entered, "rep" when a rep is
+    completed, and None otherwise. Frames without a pose leave everything
+    as it was.
+    """
+
+    def __init__(self, spec):
+        self.spec = spec
+        self.reps = 0
+        self.phase = None
+        self.value = None
+        self.zone = None  # range the latest reading is in, before min_phase is applied
+        self._since = None
+
+    def _zone(self, value):
+        spec = self.spec
+        margin = spec.hysteresis
+        for name, bounds in (("start", spec.start), ("finish", spec.finish)):
+            if _inside(value, bounds, margin if self.zone == name else 0.0):
+                return name
+        return None
+
+    def update(self, points, timestamp):
+        if points is None:
+            return None
+        self.value = self.spec.signal(points)
+        zone = self._zone(self.value)
+        if zone != self.zone:
+            self.zone = zone
+            self._since = timestamp
+        if zone is None or zone == self.phase or timestamp - self._since < self.spec.min_phase:
+            return None
+
+        completed = zone == "finish" and self.phase == "start"
+        self.phase = zone
+        if completed:
+            self.reps += 1
+            return "rep"
+        return "start" if zone == "start" else None
+
+
+class HoldTimer:
+    """
+    Times holds of a HoldSpec. ``elapsed`` is the length of the current (or
+    last) hold, ``sets`` the number of holds that have ended, ``detected``
+    whether the position was ever reached. Frames without a pose leave
+    everything as it was; a hold that is running keeps its start time.
+    """
+
+    def __init__(self, spec):
+        self.spec = spec
+        self.holding = False
+        self.elapsed = 0.0
+        self.sets = 0
+        self.detected = False
+        self.value = None
+        self._started = None
+        self._left = None  # when the signal last left the hold range during a hold
+
+    def update(self, points, timestamp):
+        if points is None:
+            return self.elapsed
+        spec = self.spec
+        self.value = spec.signal(points)
+        if _inside(self.value, spec.hold, spec.hysteresis if self.holding else 0.0):
+            self.detected = True
+            self._left = None
+            if not self.holding:
+                self.holding = True
+                self._started = timestamp
+            self.elapsed = timestamp - self._started
+        elif self.holding:
+            if self._left is None:
+                self._left = timestamp
+            if timestamp - self._left >= spec.min_phase:
+                self.holding = False
+                self.sets += 1
+                self.elapsed = self._left - self._started
+        return self.elapsed
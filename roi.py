@@ -0,0 +1,88 @@
+import numpy as np
+
+
+class RoiTracker:
+    """
+    Crops each frame to the area around the pose found in the previous frame,
+    so colour conversion and pose.process() only see the part of the frame
+    the person is in.
+
+    Landmarks from the crop are mapped back to full-frame coordinates with
+    to_full(). The crop is only moved when the body gets near its edge (or it
+    has become much bigger than needed), because MediaPipe tracks the pose
+    from one frame to the next in crop coordinates; update() returns True
+    when it did move so the caller can reset the Pose. A lost pose, or a crop
+    that would cover most of the frame anyway (or be under ``min_size``
+    pixels), falls back to the full frame.
+    """
+
+    def __init__(self, margin=0.5, max_area=0.8, min_size=32):
+        self.margin = margin
+        self.max_area = max_area
+        self.min_size = min_size
+        self.box = None  # (x0, y0, x1, y1) in pixels; None = full frame
+        self.cropped = 0
+        self.full_frames = 0
+        self.moves = 0
+
+    def crop(self, image):
+        if self.box is None:
+            self.full_frames += 1
+            return image
+        self.cropped += 1
+        x0, y0, x1, y1 = self.box
+        return image[y0:y1, x0:x1]
+
+    def to_full(self, pose_landmarks, shape):
+        """Map MediaPipe landmarks found in the current crop to full-frame coordinates, in place."""
+        if self.box is None or pose_landmarks is None:
+            return pose_landmarks
+        h, w = shape[:2]
+        x0, y0, x1, y1 = self.box
+        sx, sy = (x1 - x0) / w, (y1 - y0) / h
+        ox, oy = x0 / w, y0 / h
+        for lm in pose_landmarks.landmark:
+            lm.x = ox + lm.x * sx
+            lm.y = oy + lm.y * sy
+            lm.z *= sx  # z is on the same scale as x
+        return pose_landmarks
+
+    def update(self, points, shape):
+        """Pick the crop for the next frame from this frame's full-frame landmarks (None when lost)."""
+        old = self.box
+        if points is None:
+            self.box = None
+        else:
+            h, w = shape[:2]
+            # Every landmark, visible or not: MediaPipe still places limbs outside the crop,
+            # which is what lets the crop grow back to include them
+            lo = np.clip(points[:, :2].min(axis=0), 0, 1)
+            hi = np.clip(points[:, :2].max(axis=0), 0, 1)
+            pad = (hi - lo) * self.margin
+            want = self._pixels(lo - pad, hi + pad, w, h)
+            crop_w, crop_h = want[2] - want[0], want[3] - want[1]
+            if crop_w * crop_h > self.max_area * w * h or min(crop_w, crop_h) < self.min_size:
+                self.box = None
+            elif not self._keeps(old, lo - pad / 2, hi + pad / 2, want, w, h):
+                self.box = want
+        moved = self.box != old
+        self.moves += moved
+        return moved
+
+    @staticmethod
+    def _pixels(lo, hi, w, h):
+        lo = np.clip(lo, 0, 1)
+        hi = np.clip(hi, 0, 1)
+        return (int(lo[0] * w), int(lo[1] * h), int(np.ceil(hi[0] * w)), int(np.ceil(hi[1] * h)))
+
+    def _keeps(self, box, lo, hi, want, w, h):
+        """Whether the current crop still holds the body with half the margin and is not oversized."""
+        if box is None:
+            return False
+        inner = self._pixels(lo, hi, w, h)
+        contains = box[0] <= inner[0] and box[1] <= inner[1] and box[2] >= inner[2] and box[3] >= inner[3]
+        area = (box[2] - box[0]) * (box[3] - box[1])
+        return contains and area <= 2.5 * (want[2] - want[0]) * (want[3] - want[1])
+
+    def stats(self):
+        return {"cropped": self.cropped, "full_frames": self.full_frames, "moves": self.moves}
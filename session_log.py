@@ -0,0 +1,248 @@
+"""
+Record workout sessions frame by frame and read them back without the video.
+
+A session file is a small header followed by fixed-size records, one per
+frame: timestamp, landmarks, the eight joint angles the trackers use and the
+rep counter's state. The header is the magic bytes, the header length and a
+JSON object (exercise, start time, record layout); records start at a
+64-byte boundary so the reader can memory-map them as one NumPy array.
+
+    python session_log.py sessions/pushups-20250101-120000-000.gus --at 12.5
+"""
+import argparse
+import json
+import os
+import queue
+import struct
+import threading
+import time
+
+import numpy as np
+
+from landmarks import NUM_LANDMARKS, joint_angles
+from pose_index import ANGLE_NAMES, YOGA_JOINTS
+
+SESSIONS_DIR = os.environ.get(
+    "GETUPGO_SESSIONS",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "sessions"))
+# prune() keeps this many of the newest recordings
+SESSIONS_KEEP = int(os.environ.get("GETUPGO_SESSIONS_KEEP", 50))
+
+MAGIC = b"GUGSESS1"
+ALIGN = 64
+
+# phase: 0 = none yet, 1 = start (or holding), 2 = finish
+RECORD_DTYPE = np.dtype([
+    ("timestamp", "f8"),
+    ("found", "?"),
+    ("phase", "i1"),
+    ("reps", "i4"),
+    ("value", "f4"),
+    ("held", "f4"),
+    ("points", "f4", (NUM_LANDMARKS, 4)),
+    ("angles", "f4", (len(ANGLE_NAMES),)),
+])
+PHASES = {None: 0, "start": 1, "finish": 2}
+
+
+def session_path(exercise, started=None):
+    """
+    A new file name under SESSIONS_DIR for ``exercise``. The stamp has
+    millisecond resolution and a counter is added if the name is still
+    taken, so two sessions started close together get separate files.
+    """
+    started = time.time() if started is None else started
+    stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(started)) + f"-{int(started * 1000) % 1000:03d}"
+    slug = "".join(ch for ch in exercise.lower() if ch.isalnum()) or "session"
+    path = os.path.join(SESSIONS_DIR, f"{slug}-{stamp}.gus")
+    suffix = 1
+    while os.path.exists(path):
+        path = os.path.join(SESSIONS_DIR, f"{slug}-{stamp}-{suffix}.gus")
+        suffix += 1
+    return path
+
+
+def prune(keep=SESSIONS_KEEP, directory=None):
+    """Delete all but the ``keep`` newest session files in ``directory`` (SESSIONS_DIR); returns the paths removed."""
+    directory = SESSIONS_DIR if directory is None else directory
+    try:
+        names = [name for name in os.listdir(directory) if name.endswith(".gus")]
+    except FileNotFoundError:
+        return []
+    paths = sorted((os.path.join(directory, name) for name in names), key=os.path.getmtime, reverse=True)
+    removed = []
+    for path in paths[max(keep, 0):]:
+        try:
+            os.remove(path)
+            removed.append(path)
+        except OSError:  # still open elsewhere, or already gone
+            pass
+    return removed
+
+
+class SessionWriter:
+    """
+    Streams records to a session file. append() only fills a row of an
+    in-memory chunk; full chunks (or the current one every ``flush_interval``
+    seconds) go to a background thread that writes them, so the tracker
+    never waits on the disk. close() writes what is left and returns the path;
+    used as a context manager it is closed however the block is left. An
+    existing file is never overwritten.
+
+    ``counter`` passed to append() is a RepCounter or HoldTimer (anything
+    with some of reps/sets, phase/holding, value, elapsed); None records no
+    counter state.
+    """
+
+    def __init__(self, path, metadata=None, chunk_size=256, flush_interval=1.0):
+        self.path = path
+        self.chunk_size = chunk_size
+        self.flush_interval = flush_interval
+        self.count = 0
+        self.error = None
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._file = open(path, "xb")
+        self._write_header(dict(metadata or {}))
+        self._chunk = np.zeros(chunk_size, dtype=RECORD_DTYPE)
+        self._filled = 0
+        self._handed_off = time.monotonic()
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._flush_loop, daemon=True)
+        self._thread.start()
+
+    def _write_header(self, metadata):
+        metadata.setdefault("started", time.time())
+        metadata["angle_names"] = ANGLE_NAMES
+        metadata["record"] = [[name, str(RECORD_DTYPE[name])] for name in RECORD_DTYPE.names]
+        body = json.dumps(metadata).encode("utf-8")
+        size = len(MAGIC) + 4 + len(body)
+        padded = -(-size // ALIGN) * ALIGN
+        self._file.write(MAGIC + struct.pack("<I", padded) + body + b" " * (padded - size))
+
+    def append(self, timestamp, points, counter=None):
+        row = self._chunk[self._filled]
+        row["timestamp"] = timestamp
+        row["found"] = points is not None
+        if points is None:
+            row["points"] = np.nan
+            row["angles"] = np.nan
+        else:
+            row["points"] = points
+            row["angles"] = joint_angles(points, YOGA_JOINTS)
+        if counter is not None:
+            row["reps"] = getattr(counter, "reps", getattr(counter, "sets", 0))
+            row["phase"] = 1 if getattr(counter, "holding", False) else PHASES.get(getattr(counter, "phase", None), 0)
+            value = getattr(counter, "value", None)
+            row["value"] = np.nan if value is None else value
+            row["held"] = getattr(counter, "elapsed", np.nan)
+        else:
+            row["reps"], row["phase"], row["value"], row["held"] = 0, 0, np.nan, np.nan
+        self._filled += 1
+        self.count += 1
+        if self._filled == self.chunk_size or time.monotonic() - self._handed_off >= self.flush_interval:
+            self._hand_off()
+
+    def _hand_off(self):
+        if self._filled:
+            self._queue.put(self._chunk[:self._filled])
+            self._chunk = np.zeros(self.chunk_size, dtype=RECORD_DTYPE)
+            self._filled = 0
+        self._handed_off = time.monotonic()
+
+    def _flush_loop(self):
+        while True:
+            chunk = self._queue.get()
+            if chunk is None:
+                break
+            try:
+                self._file.write(chunk.tobytes())
+                self._file.flush()
+            except OSError as e:  # reported by close(); the tracker keeps running
+                self.error = e
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self._file.closed:
+            return self.path
+        self._hand_off()
+        self._queue.put(None)
+        self._thread.join()
+        self._file.close()
+        if self.error is not None:
+            raise self.error
+        return self.path
+
+
+class SessionReader:
+    """
+    A recorded session, memory-mapped: ``records`` is a read-only structured
+    array (see RECORD_DTYPE) that is only paged in as it is used. A file cut
+    short by a crash is read up to its last whole record.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{path} is not a session file")
+            (offset,) = struct.unpack("<I", f.read(4))
+            self.metadata = json.loads(f.read(offset - len(MAGIC) - 4).decode("utf-8").rstrip())
+        count = (os.path.getsize(path) - offset) // RECORD_DTYPE.itemsize
+        if count:
+            self.records = np.memmap(path, dtype=RECORD_DTYPE, mode="r", offset=offset, shape=(count,))
+        else:
+            self.records = np.zeros(0, dtype=RECORD_DTYPE)
+
+    def __len__(self):
+        return len(self.records)
+
+    def __iter__(self):
+        return iter(self.records)
+
+    @property
+    def duration(self):
+        if not len(self.records):
+            return 0.0
+        return float(self.records["timestamp"][-1] - self.records["timestamp"][0])
+
+    def seek(self, seconds):
+        """Index of the first record at or after ``seconds`` from the start of the session."""
+        if not len(self.records):
+            return 0
+        times = self.records["timestamp"]
+        return int(np.searchsorted(times, times[0] + seconds))
+
+    def between(self, start, end):
+        """Records from ``start`` to ``end`` seconds into the session, as a view."""
+        return self.records[self.seek(start):self.seek(end)]
+
+    def frames(self):
+        """(timestamp, points or None) per record, the input a tracker's counter needs to re-score."""
+        for row in self.records:
+            yield float(row["timestamp"]), (np.array(row["points"]) if row["found"] else None)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path")
+    parser.add_argument("--at", type=float, default=None, help="print the record this many seconds in")
+    args = parser.parse_args()
+
+    session = SessionReader(args.path)
+    found = session.records["found"]
+    print(json.dumps({k: v for k, v in session.metadata.items() if k != "record"}))
+    print(f"{len(session)} frames, {session.duration:.1f} s, pose found in {int(found.sum())}, "
+          f"final reps {int(session.records['reps'][-1]) if len(session) else 0}")
+    if args.at is not None and len(session):
+        row = session.records[min(session.seek(args.at), len(session) - 1)]
+        angles = dict(zip(ANGLE_NAMES, np.round(row["angles"].astype(float), 1).tolist()))
+        print(f"t={row['timestamp']:.2f} reps={row['reps']} phase={row['phase']} value={row['value']:.2f} {angles}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,99 +1,56 @@
-import cv2
-import mediapipe as mp
-import numpy as np
-import time
-import streamlit as st
+from overlay import Overlay, draw_skeleton
+from pipeline import STOP, run_pipeline
+from pose_stream import PoseStream
+from tracker_ui import StreamlitUI
+from rep_counter import SPECS, RepCounter
 import os
 os.environ['TF_CPP_MIN_LOG_LEVEL'] = '2'  # Suppress TensorFlow logs
 
 MET = 3.5  # MET value for side-lying leg raises
 
-mp_drawing = mp.solutions.drawing_utils
-mp_pose = mp.solutions.pose
+def run_sidelying_leg_raises(user_weight, target_reps=10, video_path=0, ui=None, roi=False):
+    # Up once the right ankle rises above 0.40 of the frame height, a rep when it drops below 0.55
+    counter = RepCounter(SPECS["sidelyinglegraises"])
 
-def calculate_angle(a, b, c):
-    a, b, c = np.array(a), np.array(b), np.array(c)
-    radians = np.arctan2(c[1] - b[1], c[0] - b[0]) - np.arctan2(a[1] - b[1], a[0] - b[0])
-    angle = np.abs(radians * 180 / np.pi)
-    return 360 - angle if angle > 180 else angle
-
-def run_sidelying_leg_raises(user_weight, target_reps=10, video_path=0):
-    count = 0
-    direction = 0  # 0 = down, 1 = up
-    threshold_up = 0.40
-    threshold_down = 0.55
-
-    cap = cv2.VideoCapture(video_path)
-    if not cap.isOpened():
-        st.error("Error opening video source")
+    ui = ui or StreamlitUI()
+    stream = PoseStream(video_path, flip=True, min_detection_confidence=0.5, min_tracking_confidence=0.5,
+                        timer=ui.timer, roi=roi)
+    if not stream.isOpened():
+        ui.error("Error opening video source")
         return {"exercise": "Side-Lying Leg Raises", "reps": 0, "calories": 0, "status": "Fail"}
 
-    pose = mp_pose.Pose(min_detection_confidence=0.5, min_tracking_confidence=0.5)
     start_time = None
-    frame_placeholder = st.empty()
 
-    while cap.isOpened():
-        ret, frame = cap.read()
-        if not ret:
-            break
+    hud = Overlay()
+    hud.value('reps', (30, 100), 1.2, (0, 255, 255), 3)
 
+    def count_frame(frame):
+        nonlocal start_time
         if start_time is None:
-            start_time = time.time()
-
-        frame = cv2.flip(frame, 1)  # mirror for webcam
-        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        results = pose.process(rgb_frame)
-        frame = cv2.cvtColor(rgb_frame, cv2.COLOR_RGB2BGR)
-        if st.session_state.workout_status == "exit":
-           break
-
-        if st.session_state.workout_status == "paused":
-            if not st.session_state.pause_message_shown:
-             st.warning("⏸ Workout Paused. Press Resume to continue.")
-             st.session_state.pause_message_shown = True
-            time.sleep(1)
-            continue
-        else:
-          # Reset when resumed
-          st.session_state.pause_message_shown = False
+            start_time = frame.timestamp
 
-        if results.pose_landmarks:
-            lm = results.pose_landmarks.landmark
+        if counter.update(frame.points, frame.timestamp) == "rep" and counter.reps >= target_reps:
+            return STOP
+        return counter.reps
 
-            hip = [lm[mp_pose.PoseLandmark.RIGHT_HIP.value].x, lm[mp_pose.PoseLandmark.RIGHT_HIP.value].y]
-            knee = [lm[mp_pose.PoseLandmark.RIGHT_KNEE.value].x, lm[mp_pose.PoseLandmark.RIGHT_KNEE.value].y]
-            ankle = [lm[mp_pose.PoseLandmark.RIGHT_ANKLE.value].x, lm[mp_pose.PoseLandmark.RIGHT_ANKLE.value].y]
+    def draw(image, frame, reps):
+        if frame.points is not None:
+            draw_skeleton(image, frame.points)
 
-            angle = calculate_angle(hip, knee, ankle)
-            ankle_y = ankle[1]
-
-            if ankle_y < threshold_up and direction == 0:
-                direction = 1
-            elif ankle_y > threshold_down and direction == 1:
-                count += 1
-                if count >= target_reps:
-                    break
-                direction = 0
-
-            mp_drawing.draw_landmarks(frame, results.pose_landmarks, mp_pose.POSE_CONNECTIONS)
-
-            # cv2.putText(frame, f'Angle: {int(angle)}°', (30, 60),
+            # cv2.putText(image, f'Angle: {int(angle)}°', (30, 60),
                         # cv2.FONT_HERSHEY_SIMPLEX, 0.9, (255, 255, 0), 2)
-            cv2.putText(frame, f'Reps: {count}', (30, 100),
-                        cv2.FONT_HERSHEY_SIMPLEX, 1.2, (0, 255, 255), 3)
-
-        frame_placeholder.image(frame, channels="BGR", caption="Side-Lying Leg Raise Tracker")
+            hud.draw(image, reps=f'Reps: {reps}')
 
-    cap.release()
+    run_pipeline(stream, ui, count_frame, draw, "Side-Lying Leg Raise Tracker", counter=counter)
 
-    elapsed_time = time.time() - start_time if start_time else 0
+    elapsed_time = stream.timestamp - start_time if start_time is not None else 0
     calories_burned = MET * user_weight * (elapsed_time / 3600)
 
     return {
         "exercise": "Side-Lying Leg Raises",
-        "reps": count,
+        "reps": counter.reps,
         "duration_sec": int(elapsed_time),
         "calories": round(calories_burned, 2),
-        "status": "Success" if count >= target_reps else "Fail",
-        "success": count >= target_reps
+        "status": "Success" if counter.reps >= target_reps else "Fail",
+        "success": counter.reps >= target_reps
     }
@@ -0,0 +1,73 @@
+import math
+
+import numpy as np
+
+from landmarks import NUM_LANDMARKS
+
+
+class OneEuroFilter:
+    """
+    One-Euro filter (Casiez et al., CHI 2012) over the x, y, z of all 33
+    landmarks at once: an exponential smoother whose cutoff frequency rises
+    with the speed of each coordinate. Slow or still joints are smoothed
+    heavily, which removes jitter; fast ones hardly at all, which keeps lag
+    low. ``min_cutoff`` (Hz) sets the smoothing at rest and ``beta`` how
+    quickly it falls away with speed (in normalized image units per second).
+
+    Call it with each frame's (33, 4) points and timestamp in order; it
+    returns a smoothed copy (visibility is passed through) and leaves its
+    input alone. None, a lost pose, resets it so the next pose starts fresh.
+    """
+
+    def __init__(self, min_cutoff=1.0, beta=10.0, d_cutoff=1.0):
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        self.x = np.zeros((NUM_LANDMARKS, 3), dtype=np.float32)  # filtered position
+        self.dx = np.zeros((NUM_LANDMARKS, 3), dtype=np.float32)  # filtered speed
+        self._delta = np.empty((NUM_LANDMARKS, 3), dtype=np.float32)
+        self._alpha = np.empty((NUM_LANDMARKS, 3), dtype=np.float32)
+        self.timestamp = None
+
+    def key(self):
+        """Short string of the parameters, for cache keys and result notes."""
+        return f"{self.min_cutoff:g}/{self.beta:g}/{self.d_cutoff:g}"
+
+    def reset(self):
+        self.timestamp = None
+
+    def __call__(self, points, timestamp):
+        if points is None:
+            self.reset()
+            return None
+        out = points.copy()
+        xyz = out[:, :3]
+        if self.timestamp is None or timestamp <= self.timestamp:
+            self.x[:] = xyz
+            self.dx.fill(0.0)
+            self.timestamp = timestamp
+            return out
+        dt = timestamp - self.timestamp
+        self.timestamp = timestamp
+
+        # Speed, smoothed with a fixed cutoff
+        delta, alpha = self._delta, self._alpha
+        np.subtract(xyz, self.x, out=delta)
+        delta /= dt
+        delta -= self.dx
+        delta *= 1.0 / (1.0 + 1.0 / (2 * math.pi * self.d_cutoff * dt))
+        self.dx += delta
+
+        # Per-coordinate cutoff from that speed, then alpha = 1 / (1 + tau / dt) with tau = 1 / (2 pi cutoff)
+        np.abs(self.dx, out=alpha)
+        alpha *= self.beta
+        alpha += self.min_cutoff
+        alpha *= 2 * math.pi * dt
+        np.add(alpha, 1.0, out=delta)
+        alpha /= delta
+
+        np.subtract(xyz, self.x, out=delta)
+        delta *= alpha
+        self.x += delta
+        xyz[:] = self.x
+        return out
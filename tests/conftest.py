@@ -0,0 +1,26 @@
+import os
+import sys
+
+import numpy as np
+
+# The modules under test live in the project root
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from landmarks import NUM_LANDMARKS  # noqa: E402
+
+
+def blank_pose():
+    """A (33, 4) landmark array with every point at the centre of the frame and fully visible."""
+    points = np.full((NUM_LANDMARKS, 4), 0.5, dtype=np.float32)
+    points[:, 2] = 0.0
+    points[:, 3] = 1.0
+    return points
+
+
+def set_angle(points, a, b, c, degrees, length=0.2):
+    """Place landmarks ``a`` and ``c`` around ``b`` so the joint angle at ``b`` is ``degrees``."""
+    bx, by = points[b, :2]
+    theta = np.radians(degrees)
+    points[a, :2] = (bx, by - length)
+    points[c, :2] = (bx + length * np.sin(theta), by - length * np.cos(theta))
+    return points
@@ -0,0 +1,107 @@
+import pytest
+
+import gestures
+from conftest import blank_pose, set_angle
+from gestures import GestureEvent, GestureRecognizer, GestureSpec, coord
+from landmarks import LEFT_ELBOW, LEFT_HIP, LEFT_SHOULDER, NOSE, RIGHT_ELBOW, RIGHT_HIP, RIGHT_SHOULDER
+
+RIGHT = GestureSpec("right", coord(0, NOSE), (0.6, float("inf")), hysteresis=0.05, debounce=0.1)
+
+
+def nose(x=0.5, y=0.5):
+    points = blank_pose()
+    points[NOSE, :2] = (x, y)
+    return points
+
+
+def arms(right, left):
+    """A pose with each arm raised ``right`` / ``left`` degrees from the side of the body."""
+    points = blank_pose()
+    points[RIGHT_SHOULDER, :2] = (0.4, 0.3)
+    points[LEFT_SHOULDER, :2] = (0.6, 0.3)
+    # set_angle puts the hip straight above the shoulder; mirroring y about the shoulder hangs it below
+    for elbow, shoulder, hip, degrees in ((RIGHT_ELBOW, RIGHT_SHOULDER, RIGHT_HIP, right),
+                                          (LEFT_ELBOW, LEFT_SHOULDER, LEFT_HIP, left)):
+        set_angle(points, hip, shoulder, elbow, degrees)
+        for index in (hip, elbow):
+            points[index, 1] = 2 * points[shoulder, 1] - points[index, 1]
+    return points
+
+
+def test_debounce_delays_start_and_end():
+    recognizer = GestureRecognizer([RIGHT])
+    assert recognizer.update(nose(0.7), 0.0) == []
+    assert recognizer.update(nose(0.7), 0.05) == []
+    assert recognizer.update(nose(0.7), 0.15) == [GestureEvent("right", 0.15, True)]
+    assert recognizer.update(nose(0.5), 0.2) == []
+    assert recognizer.update(nose(0.5), 0.35) == [GestureEvent("right", 0.35, False)]
+
+
+def test_debounce_drops_a_blip():
+    recognizer = GestureRecognizer([RIGHT])
+    events = [recognizer.update(nose(x), t) for x, t in ((0.7, 0.0), (0.5, 0.05), (0.5, 0.2))]
+    assert events == [[], [], []]
+
+
+def test_hysteresis_keeps_the_gesture_near_the_threshold():
+    recognizer = GestureRecognizer([RIGHT._replace(debounce=0.0)])
+    assert recognizer.update(nose(0.65), 0.0)[0].active
+    assert recognizer.update(nose(0.57), 0.1) == []  # below 0.6, above 0.6 - 0.05
+    assert recognizer.held() == {"right"}
+    assert recognizer.update(nose(0.54), 0.2) == [GestureEvent("right", 0.2, False)]
+
+
+def test_losing_the_pose_ends_active_gestures_as_lost():
+    recognizer = GestureRecognizer([RIGHT._replace(debounce=0.0)])
+    recognizer.update(nose(0.7), 0.0)
+    assert recognizer.update(None, 0.1) == [GestureEvent("right", 0.1, False, lost=True)]
+    assert recognizer.held() == set()
+    assert recognizer.update(None, 0.2) == []
+
+
+def test_flap_needs_both_arms_up_and_both_down():
+    flap = next(spec for spec in gestures.SPECS if spec.gesture == gestures.FLAP)
+    recognizer = GestureRecognizer([flap])
+    assert recognizer.update(arms(90, 10), 0.0) == []  # one arm up is not a flap
+    assert recognizer.update(arms(90, 85), 0.1)[0].active
+    assert recognizer.values[0] == pytest.approx(85, abs=0.01)  # the lower arm
+    assert recognizer.update(arms(10, 85), 0.2) == []  # one arm down does not end it
+    assert recognizer.update(arms(40, 40), 0.3) == []  # still inside the hysteresis (above 30)
+    assert recognizer.update(arms(10, 20), 0.4) == [GestureEvent(gestures.FLAP, 0.4, False)]
+
+
+def test_head_steps_fire_once_per_move():
+    specs = [spec for spec in gestures.SPECS if spec.gesture in (gestures.HEAD_UP, gestures.HEAD_DOWN)]
+    recognizer = GestureRecognizer(specs)
+    step = gestures.HEAD_STEP
+    seen = []
+    for t, y in enumerate((0.5, 0.5 - step / 2, 0.5 - step - 0.01, 0.5 - step - 0.01, 0.5 + 0.01)):
+        seen += [(event.gesture, event.active) for event in recognizer.update(nose(y=y), t)]
+    assert seen == [(gestures.HEAD_UP, True), (gestures.HEAD_UP, False),
+                    (gestures.HEAD_DOWN, True)]
+
+
+def test_relative_gestures_wait_for_calibration():
+    spec = GestureSpec("low", coord(1, NOSE), (0.1, float("inf")), relative=True)
+    recognizer = GestureRecognizer([spec], calibration_frames=3)
+    for t in range(3):
+        assert recognizer.update(nose(y=0.3), t) == []
+    assert recognizer.update(nose(y=0.45), 3)[0].active
+    assert recognizer.values[0] == pytest.approx(0.15)
+
+
+def test_all_signal_cannot_be_relative():
+    spec = GestureSpec("both", gestures.angle((LEFT_HIP, LEFT_SHOULDER, LEFT_ELBOW), reduce="all"), (80, 180),
+                       relative=True)
+    with pytest.raises(ValueError):
+        GestureRecognizer([spec])
+
+
+def test_bus_delivers_only_subscribed_gestures():
+    bus = gestures.GestureBus()
+    rights = bus.subscribe(["right"])
+    everything = bus.subscribe()
+    bus.publish([GestureEvent("right", 0.0, True), GestureEvent("left", 0.0, True)])
+    assert [event.gesture for event in rights.poll()] == ["right"]
+    assert rights.held == {"right"}
+    assert len(everything.poll()) == 2
@@ -0,0 +1,83 @@
+import json
+import sqlite3
+
+import pytest
+
+from history_store import COLUMNS, SCHEMA, HistoryStore, _seconds
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = HistoryStore(str(tmp_path / "history.sqlite3"), batch_size=3)
+    yield store
+    store.close()
+
+
+def workout(exercise="Squats", timestamp="2025-01-01T10:00:00", **fields):
+    return dict(exercise=exercise, timestamp=timestamp, status="Success", calories=1.5, **fields)
+
+
+def test_results_are_queued_until_a_query_or_a_full_batch(store):
+    store.add(workout(reps=10))
+    assert store._pending
+    assert store.count() == 1  # queries flush first
+    store.add_many([workout(reps=1), workout(reps=2), workout(reps=3)])
+    assert len(store._pending) == 0  # the third filled the batch
+    assert store.count() == 4
+
+
+def test_page_is_newest_first_and_result_round_trips(store):
+    store.add(workout(reps=5, timestamp="2025-01-01T10:00:00"))
+    store.add(workout("Pushups", reps=8, timestamp="2025-01-02T10:00:00", extra={"form": [1, 2]}))
+    page = store.page(limit=1)
+    assert [row["exercise"] for row in page] == ["Pushups"]
+    assert store.page(offset=1)[0]["exercise"] == "Squats"
+    assert store.result(page[0]["id"])["extra"] == {"form": [1, 2]}
+    assert store.result(12345) is None
+
+
+def test_users_and_exercises_are_kept_apart(store):
+    store.add(workout(reps=5), user="ana")
+    store.add(workout("Plank", time=30), user="ana")
+    store.add(workout(reps=7), user="ben")
+    assert store.count("ana") == 2
+    assert store.count("ana", exercise="Plank") == 1
+    assert store.exercises("ana") == ["Plank", "Squats"]
+
+
+def test_yoga_duration_counts_as_seconds(store):
+    store.add(workout("Yoga", duration=42.5))
+    store.add(workout("Plank", duration_sec=20))
+    totals = {row[0]: row for row in store.exercise_totals()}
+    assert totals["Yoga"][3] == 42.5
+    assert totals["Plank"][3] == 20.0
+    assert store.daily_calories() == [("2025-01-01", 3.0, 2)]
+
+
+@pytest.mark.parametrize("result, seconds", [
+    ({"time": 12}, 12.0),
+    ({"duration_sec": "15.5"}, 15.5),
+    ({"time": "N/A", "duration": 8}, 8.0),
+    ({"time": None}, None),
+    ({"duration": "N/A"}, None),
+    ({}, None),
+])
+def test_seconds_takes_the_first_numeric_value(result, seconds):
+    assert _seconds(result) == seconds
+
+
+def test_migration_fills_numeric_yoga_durations(tmp_path):
+    path = str(tmp_path / "old.sqlite3")
+    db = sqlite3.connect(path)
+    db.executescript(SCHEMA)
+    insert = f"INSERT INTO workouts ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})"
+    for data in ({"duration": 30}, {"duration": "N/A"}):
+        db.execute(insert, ("", "Yoga", None, None, None, None, 0, None, None,
+                            "2025-01-01T10:00:00", "2025-01-01", json.dumps(data)))
+    db.commit()
+    db.close()
+
+    store = HistoryStore(path)
+    assert [row["seconds"] for row in store.page()] == [None, 30.0]  # newest (the "N/A") first
+    assert store._db.execute("PRAGMA user_version").fetchone()[0] == 1
+    store.close()
@@ -0,0 +1,114 @@
+import pytest
+
+from conftest import blank_pose, set_angle
+from landmarks import LEFT_ANKLE, LEFT_HIP, LEFT_KNEE, LEFT_SHOULDER, RIGHT_ANKLE
+from rep_counter import INF, SPECS, HoldSpec, HoldTimer, RepCounter, RepSpec
+
+FPS = 30
+
+
+def scalar_spec(**options):
+    # The signal is the "points" value itself, so the tests drive the counter with plain numbers
+    return RepSpec(lambda value: value, start=(-INF, 70), finish=(160, INF), **options)
+
+
+def feed(counter, values, start=0.0):
+    """update() once per value at FPS; the events that were not None."""
+    events = []
+    for i, value in enumerate(values):
+        event = counter.update(value, start + i / FPS)
+        if event is not None:
+            events.append(event)
+    return events
+
+
+def knee(degrees):
+    return set_angle(blank_pose(), LEFT_HIP, LEFT_KNEE, LEFT_ANKLE, degrees)
+
+
+def test_rep_is_start_then_finish():
+    counter = RepCounter(scalar_spec())
+    assert feed(counter, [120, 60, 120, 170]) == ["start", "rep"]
+    assert counter.reps == 1
+    assert counter.phase == "finish"
+
+
+def test_finish_without_start_is_not_a_rep():
+    counter = RepCounter(scalar_spec())
+    assert feed(counter, [170, 120, 170]) == []
+    assert counter.reps == 0
+
+
+def test_hysteresis_keeps_the_phase_through_jitter():
+    counter = RepCounter(scalar_spec(hysteresis=5))
+    # 72 is outside the start range but within its hysteresis once inside
+    assert feed(counter, [60, 72, 69, 74, 66]) == ["start"]
+    assert counter.zone == "start"
+    counter.update(80, 1.0)
+    assert counter.zone is None
+
+
+def test_min_phase_ignores_a_brief_dip():
+    counter = RepCounter(scalar_spec(min_phase=0.1))
+    assert feed(counter, [120, 60, 120, 170, 170, 170, 170]) == []
+    assert feed(counter, [60] * 5 + [170] * 5, start=1.0) == ["start", "rep"]
+
+
+def test_frames_without_a_pose_change_nothing():
+    counter = RepCounter(scalar_spec())
+    feed(counter, [60])
+    assert counter.update(None, 1.0) is None
+    assert (counter.phase, counter.value, counter.reps) == ("start", 60, 0)
+
+
+def test_squat_spec_counts_from_landmarks():
+    counter = RepCounter(SPECS["squats"])
+    angles = [175] * 5 + [60] * 5 + [175] * 5
+    for i, degrees in enumerate(angles):
+        counter.update(knee(degrees), i / FPS)
+    assert counter.reps == 1
+    assert counter.value == pytest.approx(175, abs=0.01)
+
+
+def plank(degrees, visible=True):
+    points = set_angle(blank_pose(), LEFT_SHOULDER, LEFT_HIP, LEFT_ANKLE, degrees)
+    if not visible:
+        points[RIGHT_ANKLE, 3] = 0.1
+    return points
+
+
+def test_hold_runs_while_in_range():
+    timer = HoldTimer(SPECS["plank"])
+    for i in range(31):
+        timer.update(plank(175), i / FPS)
+    assert timer.holding and timer.detected
+    assert timer.elapsed == pytest.approx(1.0)
+
+
+def test_hold_survives_a_short_drop_and_ends_after_min_phase():
+    timer = HoldTimer(HoldSpec(lambda value: value, hold=(160, 180), hysteresis=3, min_phase=0.3))
+    timer.update(170, 0.0)
+    timer.update(150, 1.0)  # out, but not for min_phase yet
+    timer.update(170, 1.2)
+    assert timer.holding and timer.sets == 0
+    assert timer.elapsed == pytest.approx(1.2)
+
+    timer.update(150, 2.0)
+    timer.update(150, 2.5)
+    assert not timer.holding and timer.sets == 1
+    assert timer.elapsed == pytest.approx(2.0)  # up to when it left the range
+
+
+def test_hold_needs_every_landmark_visible():
+    timer = HoldTimer(SPECS["plank"])
+    timer.update(plank(175, visible=False), 0.0)
+    timer.update(plank(175, visible=False), 1.0)
+    assert timer.value is None
+    assert not timer.detected and timer.elapsed == 0.0
+
+
+def test_hold_ignores_frames_without_a_pose():
+    timer = HoldTimer(SPECS["plank"])
+    timer.update(plank(175), 0.0)
+    assert timer.update(None, 5.0) == 0.0
+    assert timer.holding
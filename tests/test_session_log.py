@@ -0,0 +1,115 @@
+import os
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+import session_log
+from conftest import blank_pose
+from session_log import RECORD_DTYPE, SessionReader, SessionWriter
+
+
+def record(path, frames=10, chunk_size=4):
+    """A session of ``frames`` frames, every third one without a pose; returns the points written."""
+    written = []
+    with SessionWriter(str(path), {"exercise": "Squats"}, chunk_size=chunk_size) as writer:
+        for i in range(frames):
+            points = None if i % 3 == 2 else blank_pose() + i / 100
+            counter = SimpleNamespace(reps=i // 4, phase="start" if i % 2 else "finish", value=90.0 + i)
+            writer.append(i * 0.1, points, counter)
+            written.append(points)
+    return written
+
+
+def test_round_trip(tmp_path):
+    path = tmp_path / "squats.gus"
+    written = record(path)
+    session = SessionReader(str(path))
+
+    assert len(session) == 10
+    assert session.metadata["exercise"] == "Squats"
+    assert session.metadata["record"] == [[name, str(RECORD_DTYPE[name])] for name in RECORD_DTYPE.names]
+    rows = session.records
+    assert rows["found"].tolist() == [points is not None for points in written]
+    assert rows["reps"].tolist() == [i // 4 for i in range(10)]
+    assert rows["phase"].tolist() == [1 if i % 2 else 2 for i in range(10)]
+    assert rows["value"][3] == pytest.approx(93.0)
+    np.testing.assert_allclose(rows["points"][4], written[4])
+    assert np.isnan(rows["angles"][2]).all()
+    assert session.duration == pytest.approx(0.9)
+
+    frames = list(session.frames())
+    assert frames[2] == (pytest.approx(0.2), None)
+    np.testing.assert_allclose(frames[0][1], written[0])
+
+
+def test_seek_and_between(tmp_path):
+    path = tmp_path / "squats.gus"
+    record(path)
+    session = SessionReader(str(path))
+    assert session.seek(0.25) == 3
+    assert session.between(0.2, 0.5)["timestamp"].tolist() == pytest.approx([0.2, 0.3, 0.4])
+
+
+def test_hold_timer_state_is_recorded(tmp_path):
+    path = tmp_path / "plank.gus"
+    with SessionWriter(str(path)) as writer:
+        writer.append(0.0, blank_pose(), SimpleNamespace(sets=2, holding=True, value=170.0, elapsed=4.5))
+        writer.append(0.1, blank_pose())
+    rows = SessionReader(str(path)).records
+    assert (rows["reps"][0], rows["phase"][0], rows["held"][0]) == (2, 1, 4.5)
+    assert rows["reps"][1] == 0 and np.isnan(rows["held"][1])
+
+
+def test_existing_file_is_never_overwritten(tmp_path):
+    path = tmp_path / "squats.gus"
+    record(path)
+    size = os.path.getsize(path)
+    with pytest.raises(FileExistsError):
+        SessionWriter(str(path))
+    assert os.path.getsize(path) == size
+
+
+def test_closed_by_the_context_manager_when_the_block_fails(tmp_path):
+    path = tmp_path / "squats.gus"
+    with pytest.raises(RuntimeError):
+        with SessionWriter(str(path), chunk_size=100) as writer:
+            writer.append(0.0, blank_pose())
+            raise RuntimeError("stopped")
+    assert writer.close() == str(path)  # already closed
+    assert len(SessionReader(str(path))) == 1
+
+
+def test_file_cut_short_is_read_to_its_last_whole_record(tmp_path):
+    path = tmp_path / "squats.gus"
+    record(path)
+    with open(path, "r+b") as f:
+        f.truncate(os.path.getsize(path) - RECORD_DTYPE.itemsize // 2)
+    assert len(SessionReader(str(path))) == 9
+
+
+def test_not_a_session_file(tmp_path):
+    path = tmp_path / "other.gus"
+    path.write_bytes(b"not a session")
+    with pytest.raises(ValueError):
+        SessionReader(str(path))
+
+
+def test_session_paths_do_not_collide(tmp_path, monkeypatch):
+    monkeypatch.setattr(session_log, "SESSIONS_DIR", str(tmp_path))
+    first = session_log.session_path("Side-Lying Leg Raises", started=1700000000.25)
+    assert os.path.basename(first).startswith("sidelyinglegraises-")
+    open(first, "w").close()
+    second = session_log.session_path("Side-Lying Leg Raises", started=1700000000.25)
+    assert second != first and second.endswith("-1.gus")
+
+
+def test_prune_keeps_the_newest(tmp_path):
+    for i in range(5):
+        path = tmp_path / f"s{i}.gus"
+        path.touch()
+        os.utime(path, (i, i))
+    (tmp_path / "notes.txt").touch()
+    removed = session_log.prune(2, str(tmp_path))
+    assert sorted(os.path.basename(path) for path in removed) == ["s0.gus", "s1.gus", "s2.gus"]
+    assert sorted(os.listdir(tmp_path)) == ["notes.txt", "s3.gus", "s4.gus"]
@@ -0,0 +1,117 @@
+import sys
+import time
+
+import cv2
+import streamlit as st
+
+from perf import StageTimer, draw_hud
+
+
+class DisplaySink:
+    """
+    Turns tracker frames into JPEG bytes for the page, at most ``target_fps`` times a second.
+
+    Frames are downscaled to ``max_width`` and encoded once here, so st.image only
+    has to forward the bytes instead of converting and re-encoding a full-size
+    array. If handing a frame to ``publish`` takes longer than the frame interval
+    (the page is not keeping up), the next frame is held back for that long.
+    """
+
+    def __init__(self, publish, max_width=640, jpeg_quality=80, target_fps=15):
+        self.publish = publish
+        self.max_width = max_width
+        self.jpeg_quality = jpeg_quality
+        self.interval = 1.0 / target_fps if target_fps else 0.0
+        self.shown = 0
+        self.skipped = 0
+        self._next_due = 0.0
+
+    def due(self):
+        """True when the next frame would be shown; trackers skip drawing otherwise."""
+        if time.perf_counter() >= self._next_due:
+            return True
+        self.skipped += 1
+        return False
+
+    def encode(self, image):
+        h, w = image.shape[:2]
+        if self.max_width and w > self.max_width:
+            image = cv2.resize(image, (self.max_width, h * self.max_width // w), interpolation=cv2.INTER_AREA)
+        ok, jpeg = cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality])
+        return jpeg.tobytes()
+
+    def push(self, image, caption=None):
+        started = time.perf_counter()
+        data = self.encode(image)
+        sent = time.perf_counter()
+        self.publish(data, caption)
+        now = time.perf_counter()
+        self._next_due = max(started + self.interval, now + (now - sent))
+        self.shown += 1
+
+
+class StreamlitUI:
+    """
+    Frame display and pause/resume/exit controls for a tracker running inside the Streamlit app.
+    With ``hud`` set, every frame shows the live FPS and per-stage latency from ``timer``.
+    ``recorder`` (a session_log.SessionWriter) receives every counted frame.
+    """
+    headless = False
+
+    def __init__(self, hud=False, max_width=640, jpeg_quality=80, target_fps=15, recorder=None):
+        self.frame_placeholder = st.empty()
+        self.recorder = recorder
+        self.timer = StageTimer()
+        self.hud = hud
+        self.sink = DisplaySink(self._publish, max_width, jpeg_quality, target_fps)
+
+    def _publish(self, data, caption):
+        self.frame_placeholder.image(data, caption=caption, output_format="JPEG")
+
+    def error(self, message):
+        st.error(message)
+
+    def status(self):
+        """Return "running", "paused" or "exit"; while paused, show the message once and wait a second."""
+        status = st.session_state.get("workout_status", "running")
+        if status == "paused":
+            if not st.session_state.get("pause_message_shown"):
+                st.warning("⏸ Workout Paused. Press Resume to continue.")
+                st.session_state.pause_message_shown = True
+            time.sleep(1)
+        else:
+            # Reset when resumed
+            st.session_state.pause_message_shown = False
+        return status
+
+    def wants_frame(self):
+        return self.sink.due()
+
+    def show(self, image, caption=None):
+        if self.hud:
+            draw_hud(image, self.timer)
+        self.sink.push(image, caption)
+        self.timer.lap("display")
+
+
+class HeadlessUI:
+    """Stand-in for StreamlitUI when a tracker runs outside the app (batch scoring, scripts)."""
+    headless = True
+
+    def __init__(self, recorder=None):
+        self.errors = []
+        self.recorder = recorder
+        self.timer = StageTimer()
+
+    def error(self, message):
+        self.errors.append(message)
+        print(message, file=sys.stderr)
+
+    def status(self):
+        return "running"
+
+    def wants_frame(self):
+        return False  # nothing is displayed, so trackers need not draw
+
+    def show(self, image, caption=None):
+        self.timer.lap("display")
@@ -0,0 +1,68 @@
+import sys
+
+import cv2
+import numpy as np
+import pygame
+
+# cv2 conversion from the camera's BGR to the byte order of a 32-bit surface, keyed by
+# the byte offsets of its red, green and blue channels
+_CONVERSIONS = {
+    (2, 1, 0): cv2.COLOR_BGR2BGRA,
+    (0, 1, 2): cv2.COLOR_BGR2RGBA,
+}
+
+
+def _byte_offsets(surface):
+    """Byte offsets of red, green and blue within one pixel of a 32-bit ``surface``."""
+    offsets = tuple(shift // 8 for shift in surface.get_shifts()[:3])
+    if sys.byteorder == "big":
+        offsets = tuple(3 - offset for offset in offsets)
+    return offsets
+
+
+class VideoPanel:
+    """
+    A camera feed shown in a pygame game, kept in one Surface for the whole
+    game instead of a new one per frame.
+
+    update() resizes the BGR frame into a preallocated array and converts it
+    straight into the Surface's own pixels through a BufferProxy, so there is
+    no make_surface() allocation and no second copy of the picture. The
+    Surface has the display's pixel format when a display is open, which
+    makes blit() a plain copy. When cv2 cannot write that format, the
+    Surface wraps the resized BGR array itself and blit() converts instead.
+    """
+
+    def __init__(self, size):
+        self.size = tuple(size)
+        w, h = self.size
+        self.surface = pygame.Surface(self.size)
+        if pygame.display.get_surface() is not None:
+            self.surface = self.surface.convert()
+        self.scaled = np.empty((h, w, 3), dtype=np.uint8)
+        self.code = None
+        if self.surface.get_bytesize() == 4 and self.surface.get_pitch() == 4 * w:
+            self.code = _CONVERSIONS.get(_byte_offsets(self.surface))
+        if self.code is None:
+            self.surface = pygame.image.frombuffer(self.scaled, self.size, "BGR")
+        self.ready = False
+
+    def update(self, frame):
+        """Show the BGR ``frame``, stretched to the panel size."""
+        w, h = self.size
+        if frame.shape[:2] != (h, w):
+            frame = cv2.resize(frame, self.size, dst=self.scaled)
+        if self.code is None:
+            if frame is not self.scaled:
+                np.copyto(self.scaled, frame)
+        else:
+            # The Surface stays locked while the view exists, and a locked Surface cannot be blitted
+            view = self.surface.get_view("0")
+            cv2.cvtColor(frame, self.code, dst=np.frombuffer(view, dtype=np.uint8).reshape(h, w, 4))
+            del view
+        self.ready = True
+
+    def blit(self, screen, dest=(0, 0)):
+        """Draw the latest frame on ``screen``; nothing before the first update()."""
+        if self.ready:
+            screen.blit(self.surface, dest)
@@ -0,0 +1,142 @@
+"""
+Get a workout's slow start-up done while the user is still choosing it.
+
+start() runs on a background thread: it imports the exercise's tracker
+(and with it mediapipe and cv2), puts an initialised Pose with the
+tracker's settings in the pose_engine pool (graph built, one dummy frame
+run) and opens and primes the camera. When the workout starts, borrow_pose()
+finds the Pose ready and PoseStream takes the open camera with
+take_camera() instead of opening the device again.
+
+A camera that is not taken within ``keep_open`` seconds is closed again;
+release_camera() closes it at once, e.g. before launching a game that needs
+the device. No camera is opened while a camera_broker serves it.
+"""
+import importlib
+import threading
+import time
+
+# Frames read and thrown away after opening, so exposure and white balance have settled
+PRIME_FRAMES = 5
+
+_lock = threading.Lock()
+_camera = None  # (source, FrameGrabber, opened at)
+_thread = None
+_requested = None  # (module, confidence, source) of the last start()
+_keep_open = 60.0
+status = {"pose": None, "camera": None, "error": None}
+
+
+def start(exercise=None, source=0, keep_open=60.0):
+    """
+    Warm up for ``exercise`` (an exercise_registry name; None warms the
+    default Pose only) reading from ``source``. Cheap to call on every
+    Streamlit rerun: a warm-up already done or running for the same
+    exercise and source is not repeated.
+    """
+    global _thread, _requested, _keep_open
+    from exercise_registry import find_exercise
+
+    found = find_exercise(exercise) if exercise else None
+    request = (found.module if found else None, found.confidence if found else 0.5, source)
+    with _lock:
+        _keep_open = keep_open
+        running = _thread is not None and _thread.is_alive()
+        done = status["error"] is None and (not isinstance(source, int) or _camera is not None)
+        if request == _requested and (running or done):
+            return
+        _requested = request
+        _thread = threading.Thread(target=_warm, args=request, daemon=True)
+        _thread.start()
+
+
+def _warm(module, confidence, source):
+    try:
+        if module is not None:
+            importlib.import_module(module)
+        import camera_broker
+        import pose_engine
+
+        started = time.perf_counter()
+        pose_engine.warm_up(min_detection_confidence=confidence, min_tracking_confidence=confidence)
+        status["pose"] = time.perf_counter() - started
+        if isinstance(source, int) and not camera_broker.running(source):  # a broker already has it open
+            _open_camera(source)
+        status["error"] = None
+    except Exception as e:  # warm-up is only a head start; the workout opens everything itself if this failed
+        status["error"] = str(e)
+
+
+def _open_camera(source):
+    global _camera
+    from capture import FrameGrabber
+
+    with _lock:
+        if _camera is not None and _camera[0] == source and _camera[1].isOpened():
+            _camera = (source, _camera[1], time.monotonic())
+            return
+    started = time.perf_counter()
+    grabber = FrameGrabber(source)
+    for _ in range(PRIME_FRAMES):
+        if not grabber.cap.read()[0]:
+            break
+    status["camera"] = time.perf_counter() - started
+    with _lock:
+        previous, _camera = _camera, (source, grabber, time.monotonic())
+    if previous is not None:
+        previous[1].release()
+    _expire_later(grabber)
+
+
+def _expire_later(grabber):
+    timer = threading.Timer(_keep_open, _expire, args=(grabber,))
+    timer.daemon = True
+    timer.start()
+
+
+def _expire(grabber):
+    global _camera
+    with _lock:
+        if _camera is None or _camera[1] is not grabber:
+            return
+        if time.monotonic() - _camera[2] < _keep_open:  # warmed again since; check back later
+            _expire_later(grabber)
+            return
+        _camera = None
+    grabber.release()
+
+
+def wait(timeout=None):
+    """Block until the running warm-up (if any) has finished; True if it has."""
+    thread = _thread
+    if thread is not None:
+        thread.join(timeout)
+        return not thread.is_alive()
+    return True
+
+
+def take_camera(source, timer=None):
+    """The warmed-up FrameGrabber for ``source``, now owned by the caller, or None."""
+    global _camera, _requested
+    if _requested is not None and _requested[2] == source:
+        wait()  # still warming up: finishing that is quicker than opening the device again
+    with _lock:
+        if _camera is None or _camera[0] != source:
+            return None
+        grabber = _camera[1]
+        _camera = None
+        _requested = None  # the next start() warms a camera again
+    if not grabber.isOpened():
+        grabber.release()
+        return None
+    grabber.timer = timer
+    return grabber
+
+
+def release_camera():
+    """Close a warmed-up camera nobody has taken, so another process can open the device."""
+    global _camera
+    with _lock:
+        camera, _camera = _camera, None
+    if camera is not None:
+        camera[1].release()